@@ -2,107 +2,715 @@
 AI Service Module - Handles integration with Google Gemini AI
 This provides intelligent, contextual responses for STEM education
 """
+import asyncio
+import concurrent.futures
+import contextvars
+import functools
 import os
+import random
+import re
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional
-import google.generativeai as genai
+from typing import AsyncIterator, Optional
 from dotenv import load_dotenv
 
+from backend import call_budget, deadlines
+from backend.call_budget import CallBudgetExhausted
+from backend.circuit_breaker import CircuitBreaker
+from backend.content_pack import ContentPack
+from backend.deadlines import DeadlineExceeded
+from backend.metrics import (
+    LLM_CALL_SECONDS,
+    LLM_HEDGES,
+    LLM_RETRIES,
+    PARSE_FAILURES,
+    RESPONSES,
+    STRUCTURED_PARSES,
+    record_usage,
+)
+from backend.model_providers import ModelProvider, create_model_provider
+from backend.model_registry import ModelRegistry
+from backend.model_router import ModelRouter, model_tier
+from backend.prompts import STRUCTURED_OUTPUT, Prompt, quiz_batch_prompt, quiz_prompt, tutor_prompt
+from backend.question_bank import QuestionBank
+from backend.response_cache import TTLCache, normalize_text
+from backend.retries import backoff_delay, error_code, is_retryable, retry_reason
+from backend.schemas import BatchQuizOutput, QuizOutput, TutorResponse, UnparseableOutput, parse_structured
+from backend.scheduler import (
+    PRIORITY_BACKGROUND,
+    PRIORITY_INTERACTIVE,
+    PRIORITY_QUIZ,
+    LLMScheduler,
+    SchedulerOverloaded,
+)
+from backend.session_tracker import TOPIC_CLASSIFIER
+from backend.single_flight import SingleFlight
+from backend.streaming import TutorStreamParser
+
 # Load environment variables from backend/.env
 backend_dir = Path(__file__).parent
 env_path = backend_dir / '.env'
 load_dotenv(dotenv_path=env_path)
 
-# Configure Gemini
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-print(f"🔍 Debug: API Key loaded: {GEMINI_API_KEY[:10]}..." if GEMINI_API_KEY else "⚠️ Debug: No API key found")
+# Where the last working model is remembered between cold starts
+MODEL_REGISTRY_PATH = Path(os.getenv(
+    "MODEL_REGISTRY_PATH",
+    str(Path(tempfile.gettempdir()) / "edumentor_model_registry.json"),
+))
+
+# Circuit breaker: consecutive failures before a model is skipped, seconds
+# before it gets a trial request, and how slow a call may be before it
+# counts as a failure
+GEMINI_BREAKER_FAILURES = int(os.getenv("GEMINI_BREAKER_FAILURES", "5"))
+GEMINI_BREAKER_RESET = float(os.getenv("GEMINI_BREAKER_RESET", "30"))
+GEMINI_SLOW_CALL_SECONDS = float(os.getenv("GEMINI_SLOW_CALL_SECONDS", "30"))
+
+# Longest a single model call may take (less if the request's deadline is nearer)
+GEMINI_CALL_TIMEOUT = float(os.getenv("GEMINI_CALL_TIMEOUT", "30"))
+
+# Retries after transient errors (429/5xx/timeouts): how many, and the
+# backoff base and cap in seconds (full jitter, doubling per retry)
+GEMINI_MAX_RETRIES = int(os.getenv("GEMINI_MAX_RETRIES", "2"))
+GEMINI_RETRY_BASE_DELAY = float(os.getenv("GEMINI_RETRY_BASE_DELAY", "0.25"))
+GEMINI_RETRY_MAX_DELAY = float(os.getenv("GEMINI_RETRY_MAX_DELAY", "4"))
+
+# Hedged requests: send a second identical call when the first hasn't
+# answered by the model tier's recent p95 latency (but no sooner than
+# MIN_DELAY), for at most MAX_RATIO of calls and only if a slot is free
+GEMINI_HEDGE = os.getenv("GEMINI_HEDGE", "0") == "1"
+GEMINI_HEDGE_MIN_DELAY = float(os.getenv("GEMINI_HEDGE_MIN_DELAY", "1"))
+GEMINI_HEDGE_MAX_RATIO = float(os.getenv("GEMINI_HEDGE_MAX_RATIO", "0.1"))
+
+# Maximum number of Gemini completions in flight at once (per instance)
+GEMINI_MAX_CONCURRENCY = max(1, int(os.getenv("GEMINI_MAX_CONCURRENCY", "8")))
+
+# Admission control: Gemini quota (requests per minute and burst), how many
+# requests may wait for a slot, and how long each priority class may wait
+GEMINI_RATE_LIMIT_RPM = float(os.getenv("GEMINI_RATE_LIMIT_RPM", "600"))
+GEMINI_RATE_BURST = int(os.getenv("GEMINI_RATE_BURST", "20"))
+GEMINI_MAX_QUEUE = int(os.getenv("GEMINI_MAX_QUEUE", "100"))
+QUEUE_TIMEOUTS = {
+    PRIORITY_INTERACTIVE: float(os.getenv("TUTOR_QUEUE_TIMEOUT", "10")),
+    PRIORITY_QUIZ: float(os.getenv("QUIZ_QUEUE_TIMEOUT", "20")),
+    PRIORITY_BACKGROUND: float(os.getenv("BACKGROUND_QUEUE_TIMEOUT", "60")),
+}
+
+# Large quizzes: the most questions one quiz may ask for, and how many
+# questions each concurrently generated chunk covers
+MAX_QUIZ_QUESTIONS = int(os.getenv("MAX_QUIZ_QUESTIONS", "30"))
+QUIZ_CHUNK_SIZE = max(1, int(os.getenv("QUIZ_CHUNK_SIZE", "5")))
+
+# Batch quizzes: output tokens one batched prompt may ask for, and a rough
+# estimate of the tokens one question/answer/explanation triple takes
+BATCH_QUIZ_MAX_OUTPUT_TOKENS = int(os.getenv("BATCH_QUIZ_MAX_OUTPUT_TOKENS", "4096"))
+QUIZ_TOKENS_PER_QUESTION = 90
+# Section header separating topics in a batched quiz response
+TOPIC_MARKER = re.compile(r"^[#*\s]*TOPIC\s*(\d+)\s*:", re.IGNORECASE)
+# Qn:/An:/En: lines of a text-format quiz (not just any line starting with Q or A)
+QUIZ_MARKER = re.compile(r"^[#*\s]*([QAE])\s*(\d+)\s*[:.)]\s*(.*)$", re.IGNORECASE)
+# The ANSWER: line of a text-format tutor reply
+ANSWER_MARKER = re.compile(r"^\s*ANSWER:", re.MULTILINE)
+
+# Corrective calls allowed when structured output fails to validate
+STRUCTURED_MAX_RETRIES = int(os.getenv("STRUCTURED_MAX_RETRIES", "1"))
+
+# Tutor answer cache: number of normalized questions kept and their lifetime
+TUTOR_CACHE_SIZE = int(os.getenv("TUTOR_CACHE_SIZE", "2048"))
+TUTOR_CACHE_TTL = float(os.getenv("TUTOR_CACHE_TTL", "86400"))
+
+# Where a quiz came from; only bank and model quizzes are worth caching
+QUIZ_FROM_BANK = "bank"
+QUIZ_FROM_MODEL = "model"
+QUIZ_FALLBACK = "fallback"
+
+# Question bank: pool size below which a topic is topped up, and how long
+# a pool may go without new questions before it is considered stale
+QUIZ_BANK_MIN_POOL = int(os.getenv("QUIZ_BANK_MIN_POOL", "12"))
+QUIZ_BANK_STALE_AFTER = float(os.getenv("QUIZ_BANK_STALE_AFTER", "21600"))
 
 class AIService:
-    def __init__(self):
+    def __init__(
+        self,
+        max_concurrency: int = GEMINI_MAX_CONCURRENCY,
+        provider: Optional[ModelProvider] = None,
+    ):
+        # Gemini unless MODEL_PROVIDER selects the stub or a cassette
+        self.provider = provider or create_model_provider()
         self.model = None
+        self.model_name = None
+        self.model_names = []
         self.is_configured = False
         self._initialization_attempted = False
+        self._init_lock = threading.Lock()
+        self._model_lock = threading.Lock()
+        self._models = {}
+        self._breakers = {}
+        self.registry = ModelRegistry(MODEL_REGISTRY_PATH)
+        # The Gemini SDK is synchronous, so blocking calls run on a bounded
+        # thread pool instead of the event loop. The pool size caps how many
+        # completions are in flight at once.
+        self.max_concurrency = max_concurrency
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_concurrency,
+            thread_name_prefix="gemini",
+        )
+        # Admission control in front of every outbound Gemini call
+        self.scheduler = LLMScheduler(
+            max_concurrent=max_concurrency,
+            rate_per_minute=GEMINI_RATE_LIMIT_RPM,
+            burst=GEMINI_RATE_BURST,
+            max_queue=GEMINI_MAX_QUEUE,
+        )
+        # Fast or strong model tier per request, by complexity and load
+        self.router = ModelRouter(load=self.scheduler.queue_depth)
+        # Model calls made and hedges sent, for the hedge budget
+        self._calls = 0
+        self._hedges = 0
+        # Parsed tutor answers keyed by normalized question
+        self.tutor_cache = TTLCache(max_size=TUTOR_CACHE_SIZE, ttl_seconds=TUTOR_CACHE_TTL)
+        # Generated quiz questions, sampled for repeat topics
+        self.question_bank = QuestionBank(
+            min_pool_size=QUIZ_BANK_MIN_POOL,
+            stale_after_seconds=QUIZ_BANK_STALE_AFTER,
+        )
+        self._bank_refreshing = set()
+        self._background_tasks = set()
+        # Identical concurrent requests share one in-flight completion
+        self._inflight = SingleFlight()
+        # Precomputed answers and quizzes per topic for when the model can't answer
+        self.content_pack = ContentPack()
+
+    async def _run_blocking(self, func, *args):
+        """Run a blocking SDK call on the Gemini thread pool"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+
+    async def _ensure_model(self):
+        """Initialize the model off the event loop on first use"""
+        if not self._initialization_attempted:
+            await self._run_blocking(self._initialize_model)
+
+    async def _generate(
+        self, prompt: Prompt, priority: int = PRIORITY_INTERACTIVE, tier: Optional[str] = None
+    ):
+        """
+        Send a prompt to Gemini once admitted by the scheduler, retrying
+        transient errors with jittered exponential backoff while the
+        request's deadline allows
+        """
+        for attempt in range(GEMINI_MAX_RETRIES + 1):
+            # One admission covers failover attempts: each model has its own quota
+            async with self.scheduler.slot(priority, deadlines.budget(QUEUE_TIMEOUTS[priority])):
+                try:
+                    return await self._generate_with_failover(prompt, tier)
+                except Exception as e:
+                    error = e
+            if attempt == GEMINI_MAX_RETRIES or not is_retryable(error):
+                break
+            delay = backoff_delay(attempt, GEMINI_RETRY_BASE_DELAY, GEMINI_RETRY_MAX_DELAY)
+            left = deadlines.remaining()
+            if left is not None and left <= delay:
+                break  # No time left for another attempt
+            LLM_RETRIES.labels(retry_reason(error)).inc()
+            await asyncio.sleep(delay)
+        raise error
+
+    async def _generate_with_failover(self, prompt: Prompt, tier: Optional[str] = None):
+        """Send a prompt to Gemini, failing over between models"""
+        last_error = None
+        candidates = self._candidate_models(tier)
+        for name in candidates:
+            breaker = self._breaker(name)
+            # Before claiming the breaker: an expired deadline must not strand a half-open trial
+            timeout = deadlines.budget(GEMINI_CALL_TIMEOUT)
+            if not breaker.allow_request():
+                continue
+            started = time.monotonic()
+            try:
+                response = await self._call_model(name, prompt, timeout)
+            except (asyncio.CancelledError, CallBudgetExhausted):
+                breaker.release()
+                raise
+            except Exception as e:
+                self._record_failure(breaker, e, timeout)
+                LLM_CALL_SECONDS.labels(name or "default", "error").observe(time.monotonic() - started)
+                if isinstance(e, TimeoutError) and not str(e):
+                    e = TimeoutError(f"No answer within {timeout:.1f}s")
+                last_error = e
+                print(f"⚠️ Model {name} failed: {str(e)[:80]}...")
+                continue
+            elapsed = time.monotonic() - started
+            self._record_call(name, elapsed, candidates[0])
+            LLM_CALL_SECONDS.labels(name or "default", "success").observe(elapsed)
+            record_usage(name, response, prompt)
+            return response
+        raise last_error or RuntimeError("All Gemini models are unavailable")
+
+    async def _call_model(self, name: str, prompt: Prompt, timeout: float):
+        """
+        One call to a model, bounded by `timeout`. With hedging on, a second
+        identical call goes out if the first hasn't answered by the tier's
+        p95 latency; whichever answers first wins. A call given up on keeps
+        its scheduler slot until its pool thread is free again.
+        """
+        call = functools.partial(
+            self._get_model(name).generate_content, prompt.text, timeout=timeout, **prompt.options()
+        )
+        call_budget.spend()
+        self._calls += 1
+        pending_call = self._executor.submit(call)
+        try:
+            return await self._await_hedged(name, call, asyncio.wrap_future(pending_call), timeout)
+        finally:
+            if not pending_call.done():
+                self._hold_slot_until_done(pending_call)
+
+    async def _await_hedged(self, name: str, call, first: asyncio.Future, timeout: float):
+        """Wait for `first`, sending a hedge for it if it's slow"""
+        loop = asyncio.get_running_loop()
+        delay = self._hedge_delay(name)
+        if delay is None or delay >= timeout:
+            return await asyncio.wait_for(first, timeout)
+
+        done, _ = await asyncio.wait({first}, timeout=delay)
+        # Hedges are optional: skip them when the scheduler has no free slot
+        if done or not self.scheduler.try_acquire():
+            return await asyncio.wait_for(first, timeout - delay)
+        if not call_budget.try_spend():
+            self.scheduler.release()
+            return await asyncio.wait_for(first, timeout - delay)
+        self._hedges += 1
+        second = loop.run_in_executor(self._executor, call)
+        second.add_done_callback(lambda _: self.scheduler.release())
+        for future in (first, second):
+            # The loser may still fail after we've returned; don't log it as unhandled
+            future.add_done_callback(lambda f: f.cancelled() or f.exception())
+
+        pending, error = {first, second}, None
+        ends_at = loop.time() + timeout - delay
+        while pending:
+            done, pending = await asyncio.wait(
+                pending, timeout=max(0.0, ends_at - loop.time()), return_when=asyncio.FIRST_COMPLETED
+            )
+            if not done:
+                break
+            for future in done:
+                if future.exception() is None:
+                    LLM_HEDGES.labels("hedge" if future is second else "primary").inc()
+                    return future.result()
+                error = error or future.exception()
+        LLM_HEDGES.labels("failed").inc()
+        raise error or asyncio.TimeoutError()
+
+    def _hold_slot_until_done(self, pending_call: concurrent.futures.Future):
+        """
+        Keep a scheduler slot taken while a call we stopped waiting for still
+        blocks a pool thread, so admitted calls never queue for a thread
+        """
+        loop = asyncio.get_running_loop()
+        self.scheduler.hold()
+
+        def release(_):
+            try:
+                loop.call_soon_threadsafe(self.scheduler.release)
+            except RuntimeError:
+                pass  # Event loop already closed
+
+        pending_call.add_done_callback(release)
+
+    def _hedge_delay(self, name: str) -> Optional[float]:
+        """Seconds to wait before hedging a call to `name`, or None not to hedge"""
+        if not GEMINI_HEDGE or self._hedges >= self._calls * GEMINI_HEDGE_MAX_RATIO:
+            return None
+        p95 = self.router.p95(name)
+        return None if p95 is None else max(p95, GEMINI_HEDGE_MIN_DELAY)
+
+    async def _generate_parsed(
+        self, prompt: Prompt, schema, convert, salvage, priority: int, tier: Optional[str] = None
+    ):
+        """
+        Generate and parse a completion. JSON output is validated into
+        `schema` (repairing common breakage first) and passed to `convert`.
+        Output that isn't valid JSON is offered to `salvage(text)`, the
+        text-format parser, which returns (result, usable); if it isn't
+        usable either, the model is asked again with the validation error,
+        at most STRUCTURED_MAX_RETRIES times. Raises UnparseableOutput if
+        every attempt fails. `tier` is the routed model tier.
+        """
+        for attempt in range(STRUCTURED_MAX_RETRIES + 1):
+            response = await self._generate(prompt, priority, tier)
+            text = response.text
+            if prompt.response_schema is None:
+                if not text or not text.strip():
+                    raise UnparseableOutput(f"Empty {prompt.kind} output")
+                return salvage(text)[0]
+            parsed, outcome = parse_structured(text, schema)
+            if parsed is not None:
+                STRUCTURED_PARSES.labels(prompt.kind, "retried" if attempt else outcome).inc()
+                return convert(parsed)
+            result, usable = salvage(text)
+            if usable:
+                STRUCTURED_PARSES.labels(prompt.kind, "text").inc()
+                return result
+            print(f"⚠️ Unparseable {prompt.kind} output ({outcome}), attempt {attempt + 1}")
+            prompt = prompt.with_correction(outcome)
+        STRUCTURED_PARSES.labels(prompt.kind, "failed").inc()
+        raise UnparseableOutput(f"No usable {prompt.kind} output after {attempt + 1} attempts ({outcome})")
+
+    async def _generate_stream(self, prompt: Prompt, tier: Optional[str] = None) -> AsyncIterator[str]:
+        """Yield response text chunks as Gemini streams them"""
+        priority = PRIORITY_INTERACTIVE
+        async with self.scheduler.slot(priority, deadlines.budget(QUEUE_TIMEOUTS[priority])):
+            async for chunk in self._stream_from_model(prompt, tier):
+                yield chunk
+
+    async def _stream_from_model(self, prompt: Prompt, tier: Optional[str] = None) -> AsyncIterator[str]:
+        """Stream from the first model whose breaker allows it"""
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        stop = threading.Event()
+        finished = object()
+
+        def put(item):
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, item)
+            except RuntimeError:
+                stop.set()  # Event loop already closed
+
+        timeout = deadlines.budget(GEMINI_CALL_TIMEOUT)
+        candidates = self._candidate_models(tier)
+        for name in candidates:
+            if self._breaker(name).allow_request():
+                break
+        else:
+            raise RuntimeError("All Gemini models are unavailable")
+        try:
+            call_budget.spend()
+            model = self._get_model(name)
+        except BaseException:
+            self._breaker(name).release()
+            raise
+
+        def produce():
+            started = time.monotonic()
+            chunk = None
+            try:
+                stream = model.generate_content(prompt.text, stream=True, timeout=timeout, **prompt.options())
+                for chunk in stream:
+                    if stop.is_set():
+                        break
+                    if chunk.text:
+                        put(chunk.text)
+                elapsed = time.monotonic() - started
+                self._record_call(name, elapsed, candidates[0])
+                LLM_CALL_SECONDS.labels(name or "default", "success").observe(elapsed)
+                # Usage metadata arrives with the final chunk
+                record_usage(name, chunk, prompt)
+            except Exception as e:
+                self._record_failure(self._breaker(name), e, timeout)
+                LLM_CALL_SECONDS.labels(name or "default", "error").observe(time.monotonic() - started)
+                put(e)
+            finally:
+                put(finished)
+
+        producing = self._executor.submit(produce)
+        try:
+            while True:
+                # Each chunk must arrive within the call timeout and the request's deadline
+                item = await asyncio.wait_for(queue.get(), deadlines.budget(timeout))
+                if item is finished:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            # Lets the worker thread stop early if the client went away
+            stop.set()
+            if not producing.done():
+                self._hold_slot_until_done(producing)
         
     def _initialize_model(self):
         """Lazy initialization - only configure model when first needed"""
-        if self._initialization_attempted:
+        with self._init_lock:
+            if self._initialization_attempted:
+                return
+            try:
+                self._configure_model()
+            finally:
+                # Only mark as attempted once setup is done, so concurrent
+                # first requests wait on the lock instead of seeing a
+                # half-initialized service.
+                self._initialization_attempted = True
+
+    def _configure_model(self):
+        """Set up the model provider without any network calls on the request path"""
+        if not self.provider.configure():
             return
-            
-        self._initialization_attempted = True
-        
-        if GEMINI_API_KEY and GEMINI_API_KEY != "your_gemini_api_key_here":
-            # Try multiple model names - use full paths with models/ prefix
-            models_to_try = [
-                'models/gemini-2.5-flash',  # Latest fast model
-                'models/gemini-2.5-pro',     # Latest powerful model
-                'models/gemini-2.0-flash',   # Stable 2.0
-                'models/gemini-flash-latest', # Generic latest
-                'models/gemini-pro-latest'    # Generic latest pro
-            ]
-            
-            for model_name in models_to_try:
-                try:
-                    genai.configure(api_key=GEMINI_API_KEY)
-                    self.model = genai.GenerativeModel(model_name)
-                    # Test if model works with a simple prompt
-                    test_response = self.model.generate_content("Say hello")
-                    self.is_configured = True
-                    print(f"✅ Gemini AI configured successfully with {model_name}")
-                    break
-                except Exception as e:
-                    print(f"⚠️ Model {model_name} failed: {str(e)[:80]}...")
-                    continue
-            
-            if not self.is_configured:
-                print("❌ All Gemini models failed. Using fallback responses.")
+        names = self.provider.model_names()
+        # Start with the model that last worked, then the usual order
+        remembered = self.registry.last_working_model() if self.provider.verify_models else None
+        self.model_names = [remembered] if remembered in names else []
+        self.model_names += [name for name in names if name not in self.model_names]
+        self._select_model(self.model_names[0])
+        self.router.configure(self.model_names)
+        self.is_configured = True
+        print(f"✅ {self.provider.name} model provider configured with {self.model_name}")
+
+        if self.provider.verify_models and not self.registry.is_fresh():
+            # Verify models in the background instead of on a user request
+            threading.Thread(
+                target=self._probe_models, name="gemini-probe", daemon=True
+            ).start()
+
+    def _probe_models(self):
+        """Find a working model with a test prompt and remember it"""
+        for name in self.model_names:
+            breaker = self._breaker(name)
+            if not breaker.allow_request():
+                continue
+            try:
+                self._get_model(name).generate_content("Say hello")
+            except Exception as e:
+                breaker.record_failure()
+                print(f"⚠️ Model {name} failed: {str(e)[:80]}...")
+                continue
+            breaker.record_success()
+            self._select_model(name)
+            self.registry.record(name)
+            print(f"✅ Gemini model {name} verified")
+            return
+        print("❌ All Gemini models failed. Requests will fail over or use fallback responses.")
+
+    def _candidate_models(self, tier: Optional[str] = None) -> list:
+        """Model names to try, current model first; with a tier, that tier's models first"""
+        names = [self.model_name] + [name for name in self.model_names if name != self.model_name]
+        if tier is None:
+            return names
+        return [name for name in names if model_tier(name) == tier] + [
+            name for name in names if model_tier(name) != tier
+        ]
+
+    def _get_model(self, name: str):
+        """Return the (cached) GenerativeModel for a model name"""
+        with self._model_lock:
+            if name == self.model_name and self.model is not None:
+                return self.model
+            model = self._models.get(name)
+            if model is None:
+                model = self._models[name] = self.provider.get_model(name)
+            return model
+
+    def _breaker(self, name: str) -> CircuitBreaker:
+        """Return the circuit breaker for a model"""
+        breaker = self._breakers.get(name)
+        if breaker is None:
+            breaker = self._breakers.setdefault(name, CircuitBreaker(
+                failure_threshold=GEMINI_BREAKER_FAILURES,
+                reset_timeout=GEMINI_BREAKER_RESET,
+            ))
+        return breaker
+
+    def _select_model(self, name: str):
+        """Make a model the first choice for new requests"""
+        with self._model_lock:
+            if name == self.model_name:
+                return
+            if self.model is not None and self.model_name is not None:
+                self._models[self.model_name] = self.model
+            self.model = self._models.get(name) or self.provider.get_model(name)
+            self._models[name] = self.model
+            previous, self.model_name = self.model_name, name
+        if previous is not None:
+            print(f"🔀 Switched Gemini model from {previous} to {name}")
+
+    @staticmethod
+    def _record_failure(breaker: CircuitBreaker, error: BaseException, timeout: float):
+        """
+        Count a failed call against its model, unless it only timed out
+        because the request's deadline cut its timeout short
+        """
+        timed_out = isinstance(error, TimeoutError) or error_code(error) == 504
+        if timed_out and timeout < GEMINI_CALL_TIMEOUT:
+            breaker.release()  # Says nothing about the model's health
         else:
-            print("⚠️ Gemini API key not found. Using fallback responses.")
+            breaker.record_failure()
+
+    def _record_call(self, name: str, elapsed: float, preferred: Optional[str] = None):
+        """Update breaker, router and registry after a call to `preferred` (or a failover) returned"""
+        breaker = self._breaker(name)
+        if elapsed > GEMINI_SLOW_CALL_SECONDS:
+            # Calls that take too long count against the model
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+        self.router.observe(name, elapsed)
+        # Only a failover changes the current model, not routing to another tier
+        if name != (preferred or self.model_name):
+            self._select_model(name)
+            if self.provider.verify_models:
+                self.registry.record(name)
+        elif name == self.model_name and name is not None and self.provider.verify_models \
+                and not self.registry.is_fresh():
+            self.registry.record(name)
+
+    def model_status(self) -> dict:
+        """Selected model, breaker state per model and routing stats"""
+        return {
+            "model": self.model_name,
+            "breakers": {name: breaker.snapshot() for name, breaker in self._breakers.items()},
+            "routing": self.router.stats(),
+        }
     
     async def generate_tutor_response(self, question: str) -> dict:
         """
         Generate an AI tutoring response with African context
         """
+        cache_key = normalize_text(question)
+        cached = self.tutor_cache.get(cache_key)
+        if cached is not None:
+            RESPONSES.labels("tutor", "cache").inc()
+            return self._copy_result(cached)
+
+        try:
+            result = await self._inflight.do(
+                ("tutor", cache_key),
+                lambda: self._answer_question(question, cache_key),
+            )
+        except DeadlineExceeded as e:
+            # This request's own deadline ran out; the shared call carries on for the others
+            print(f"⏳ Shedding tutor request: {e}")
+            RESPONSES.labels("tutor", "fallback").inc()
+            return self._fallback_response(question)
+        return self._copy_result(result)
+
+    async def _answer_question(
+        self, question: str, cache_key: str, priority: int = PRIORITY_INTERACTIVE
+    ) -> dict:
+        """Ask the model for a tutoring answer and cache the parsed result"""
         # Lazy initialization
-        self._initialize_model()
+        await self._ensure_model()
         
         if not self.is_configured:
+            RESPONSES.labels("tutor", "fallback").inc()
             return self._fallback_response(question)
         
         try:
-            # Create a detailed prompt for African-contextualized STEM education
-            prompt = f"""You are EduMentor, an AI tutor for African students.
-
-CORE REQUIREMENT: You MUST integrate African examples throughout your explanation, not just at the end.
-
-Student Question: {question}
-
-Instructions:
-1. Keep your answer brief and engaging (3-5 short sentences or bullet points)
-2. START with a relatable African context or example that connects to the concept
-3. Explain the science clearly using simple language
-4. Include 1-2 more African examples WITHIN the explanation (boda-bodas, matatus, cassava farms, Lake Victoria, solar panels in villages, M-Pesa, etc.)
-5. End with a practical application relevant to African communities
-6. Provide 2 short follow-up questions
-
-African Context Examples to Use:
-- Transportation: boda-bodas, matatus, tuk-tuks
-- Agriculture: cassava, maize farming, irrigation
-- Technology: M-Pesa, solar panels, mobile networks
-- Geography: Lake Victoria, Mount Kilimanjaro, Sahara Desert
-- Daily life: marketplaces, water wells, community gatherings
-
-Format your response as:
-ANSWER: [Start with African example, explain the science briefly using 2-3 more African examples integrated throughout, end with practical application]
-FOLLOW_UP_1: [first follow-up question]
-FOLLOW_UP_2: [second follow-up question]
-"""
-            response = self.model.generate_content(prompt)
-            return self._parse_response(response.text, question)
-            
+            result = await self._request_tutor(question, priority)
+            self.tutor_cache.set(cache_key, self._copy_result(result))
+            RESPONSES.labels("tutor", "success").inc()
+            return result
+
+        except (SchedulerOverloaded, DeadlineExceeded, CallBudgetExhausted) as e:
+            print(f"⏳ Shedding tutor request: {e}")
+            RESPONSES.labels("tutor", "fallback").inc()
+            return self._fallback_response(question)
         except Exception as e:
             print(f"AI generation error: {e}")
+            RESPONSES.labels("tutor", "error").inc()
             return self._fallback_response(question)
     
+    async def _request_tutor(self, question: str, priority: int = PRIORITY_INTERACTIVE) -> dict:
+        """Ask the model for a tutoring answer and parse it"""
+
+        def salvage(text: str) -> tuple:
+            return self._parse_response(text, question), bool(ANSWER_MARKER.search(text))
+
+        return await self._generate_parsed(
+            self._tutor_prompt(question),
+            TutorResponse,
+            lambda parsed: {
+                "answer": parsed.answer,
+                # Same defaults as the text format, so replies look alike either way
+                "follow_up_suggestions": (
+                    [text for text in parsed.follow_up_suggestions if text.strip()]
+                    or self._default_follow_ups(question)
+                )[:3],
+            },
+            salvage,
+            priority,
+            self.router.route("tutor", question),
+        )
+
+    async def warm_tutor_answer(self, question: str) -> bool:
+        """Cache an answer at background priority; True if one is cached now"""
+        cache_key = normalize_text(question)
+        if cache_key in self.tutor_cache:
+            return True
+        # Its own key: a student must not join a call that may queue or be shed
+        await self._inflight.do(
+            ("tutor", cache_key, PRIORITY_BACKGROUND),
+            lambda: self._answer_question(question, cache_key, PRIORITY_BACKGROUND),
+            # The caller's context: the warm-up's call budget must follow the call
+            contextvars.copy_context(),
+        )
+        return cache_key in self.tutor_cache
+
+    def _tutor_prompt(self, question: str, structured: bool = STRUCTURED_OUTPUT) -> Prompt:
+        """Build the tutoring prompt for a student question"""
+        # The persona and African context list go in the shared system instruction
+        return tutor_prompt(question, structured)
+
+    async def stream_tutor_response(self, question: str) -> AsyncIterator[tuple]:
+        """
+        Stream a tutoring response as ("token", text) events followed by a
+        final ("done", {"answer", "follow_up_suggestions"}) event
+        """
+        cache_key = normalize_text(question)
+        cached = self.tutor_cache.get(cache_key)
+        if cached is not None:
+            RESPONSES.labels("tutor_stream", "cache").inc()
+            yield "token", cached["answer"]
+            yield "done", self._copy_result(cached)
+            return
+
+        await self._ensure_model()
+
+        if not self.is_configured:
+            RESPONSES.labels("tutor_stream", "fallback").inc()
+            result = self._fallback_response(question)
+            yield "token", result["answer"]
+            yield "done", result
+            return
+
+        parser = TutorStreamParser()
+        try:
+            # Streamed tokens go straight to the student, so use the text format
+            prompt = self._tutor_prompt(question, structured=False)
+            async for chunk in self._generate_stream(prompt, self.router.route("tutor_stream", question)):
+                text = parser.feed(chunk)
+                if text:
+                    yield "token", text
+            text = parser.close()
+            if text:
+                yield "token", text
+        except Exception as e:
+            print(f"AI streaming error: {e}")
+            RESPONSES.labels("tutor_stream", "error").inc()
+            if not parser.text:
+                result = self._fallback_response(question)
+                yield "token", result["answer"]
+                yield "done", result
+                return
+            # Keep what already reached the student, but don't cache it
+            yield "done", self._parse_response(parser.text, question)
+            return
+
+        result = self._parse_response(parser.text, question)
+        self.tutor_cache.set(cache_key, self._copy_result(result))
+        RESPONSES.labels("tutor_stream", "success").inc()
+        yield "done", result
+
+    @staticmethod
+    def _copy_result(result: dict) -> dict:
+        """Copy a tutor result so cached entries can't be mutated by callers"""
+        return {
+            "answer": result["answer"],
+            "follow_up_suggestions": list(result["follow_up_suggestions"]),
+        }
+
     def _parse_response(self, text: str, question: str) -> dict:
         """Parse the AI response into structured format"""
         try:
@@ -123,15 +731,12 @@ FOLLOW_UP_2: [second follow-up question]
             
             answer = ' '.join(answer_lines).strip()
             if not answer:
+                PARSE_FAILURES.labels("tutor").inc()
                 answer = text  # Use full response if parsing fails
             
             # Ensure we have follow-ups
             if not follow_ups:
-                follow_ups = [
-                    f"Can you explain more about {question.split()[-2] if len(question.split()) > 1 else 'this topic'}?",
-                    "How is this applied in real life?",
-                    "What are common misconceptions about this?"
-                ]
+                follow_ups = self._default_follow_ups(question)
             
             return {
                 "answer": answer,
@@ -139,13 +744,33 @@ FOLLOW_UP_2: [second follow-up question]
             }
         except Exception as e:
             print(f"Parse error: {e}")
+            PARSE_FAILURES.labels("tutor").inc()
             return {
                 "answer": text,
                 "follow_up_suggestions": []
             }
     
+    @staticmethod
+    def _default_follow_ups(question: str) -> list:
+        """Follow-up suggestions for a reply that came without any"""
+        return [
+            f"Can you explain more about {question.split()[-2] if len(question.split()) > 1 else 'this topic'}?",
+            "How is this applied in real life?",
+            "What are common misconceptions about this?"
+        ]
+
     def _fallback_response(self, question: str) -> dict:
-        """Fallback when AI is not available"""
+        """Fallback when AI is not available: the content pack entry for the question's topic"""
+        topic = TOPIC_CLASSIFIER.classify(question)
+        entry = self.content_pack.get(topic)
+        if entry is not None:
+            return {
+                "answer": (
+                    f"The live tutor is unavailable right now, so here is an overview of "
+                    f"{topic} instead. {entry['answer']}"
+                ),
+                "follow_up_suggestions": list(entry["follow_up_suggestions"]),
+            }
         return {
             "answer": (
                 f"I received your question about '{question}'. "
@@ -165,74 +790,310 @@ FOLLOW_UP_2: [second follow-up question]
         """
         Generate quiz questions on a given topic
         """
+        questions, _ = await self.generate_quiz_with_source(topic, num_questions)
+        return questions
+
+    async def generate_quiz_with_source(self, topic: str, num_questions: int = 3) -> tuple:
+        """
+        Quiz questions plus where they came from: QUIZ_FROM_BANK,
+        QUIZ_FROM_MODEL, or QUIZ_FALLBACK for placeholder and short quizzes
+        served while the model is unavailable
+        """
+        # Serve popular topics straight from the question bank
+        banked = self.question_bank.sample(topic, num_questions)
+        if banked is not None:
+            RESPONSES.labels("quiz", "bank").inc()
+            if self.question_bank.needs_refresh(topic):
+                self._schedule_bank_refresh(topic, num_questions)
+            return banked, QUIZ_FROM_BANK
+
+        try:
+            questions, source = await self._inflight.do(
+                ("quiz", normalize_text(topic), num_questions),
+                lambda: self._build_quiz(topic, num_questions),
+            )
+        except DeadlineExceeded as e:
+            print(f"⏳ Shedding quiz request: {e}")
+            return self._shed_quiz(topic, num_questions)
+        return [dict(question) for question in questions], source
+
+    async def _build_quiz(self, topic: str, num_questions: int) -> tuple:
+        """Generate a quiz in the foreground and bank its questions; returns (questions, source)"""
         # Lazy initialization
-        self._initialize_model()
+        await self._ensure_model()
         
         if not self.is_configured:
-            return self._fallback_quiz(topic, num_questions)
+            RESPONSES.labels("quiz", "fallback").inc()
+            return self._fallback_quiz(topic, num_questions), QUIZ_FALLBACK
         
         try:
-            prompt = f"""You are creating a STEM quiz on: {topic}
+            questions = await self._request_quiz_chunked(topic, num_questions, PRIORITY_QUIZ)
+        except (SchedulerOverloaded, DeadlineExceeded) as e:
+            print(f"⏳ Shedding quiz request: {e}")
+            return self._shed_quiz(topic, num_questions)
+        except Exception as e:
+            print(f"Quiz generation error: {e}")
+            RESPONSES.labels("quiz", "error").inc()
+            return self._fallback_quiz(topic, num_questions), QUIZ_FALLBACK
 
-Instructions for questions:
-- Create {num_questions} clear multiple-choice or short-answer questions that focus on core concepts.
-- DO NOT include region-specific or African context in the question text. Keep questions neutral.
+        self.question_bank.add(topic, questions)
+        RESPONSES.labels("quiz", "success").inc()
+        return questions, QUIZ_FROM_MODEL
 
-Instructions for answers/explanations:
-- For each question include the correct answer and a one-sentence explanation that includes a brief African example or application.
+    def _shed_quiz(self, topic: str, num_questions: int) -> tuple:
+        """(questions, QUIZ_FALLBACK) for a request the model can't serve in time"""
+        # Whatever the bank has beats a placeholder quiz
+        available = self.question_bank.size(topic)
+        if available:
+            RESPONSES.labels("quiz", "bank").inc()
+            return self.question_bank.sample(topic, min(available, num_questions)), QUIZ_FALLBACK
+        RESPONSES.labels("quiz", "fallback").inc()
+        return self._fallback_quiz(topic, num_questions), QUIZ_FALLBACK
 
-Output format exactly as:
-Q1: [Question text]
-A1: [Correct answer]
-E1: [One-sentence explanation that includes a short African example]
+    async def warm_quiz(self, topic: str, num_questions: int) -> int:
+        """Bank enough questions to serve a quiz; returns how many were added"""
+        if self.question_bank.size(topic) >= num_questions:
+            return 0
+        questions = await self._request_quiz_chunked(topic, num_questions, PRIORITY_BACKGROUND)
+        return self.question_bank.add(topic, questions)
 
-Example:
-Q1: What is acceleration?
-A1: 3 m/s^2
-E1: Using a = (v-u)/t; Example: a boda-boda accelerating from 0 to 15 m/s in 5 s gives 3 m/s^2.
-"""
+    def _schedule_bank_refresh(self, topic: str, num_questions: int):
+        """Grow a topic's question pool in the background"""
+        key = normalize_text(topic)
+        if key in self._bank_refreshing:
+            return
+        self._bank_refreshing.add(key)
+        # A fresh context, so the refresh isn't bound by this request's deadline
+        task = asyncio.create_task(
+            self._refresh_bank(topic, num_questions, key), context=contextvars.Context()
+        )
+        # Keep a reference so the task isn't garbage collected mid-flight
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
 
-            response = self.model.generate_content(prompt)
-            return self._parse_quiz(response.text)
-            
+    async def _refresh_bank(self, topic: str, num_questions: int, key: str):
+        """Generate fresh questions for a topic and add them to the bank"""
+        try:
+            questions = await self._request_quiz_chunked(topic, num_questions, PRIORITY_BACKGROUND)
+            added = self.question_bank.add(topic, questions)
+            print(f"📚 Question bank: +{added} questions for '{topic}'")
         except Exception as e:
-            print(f"Quiz generation error: {e}")
-            return self._fallback_quiz(topic, num_questions)
+            print(f"Question bank refresh error: {e}")
+        finally:
+            self._bank_refreshing.discard(key)
+
+    async def _request_quiz_chunked(
+        self, topic: str, num_questions: int, priority: int = PRIORITY_QUIZ
+    ) -> list:
+        """Generate a large quiz as concurrent chunks and merge them"""
+        if num_questions <= QUIZ_CHUNK_SIZE:
+            return await self._request_quiz(topic, num_questions, priority)
+
+        sizes = [QUIZ_CHUNK_SIZE] * (num_questions // QUIZ_CHUNK_SIZE)
+        if num_questions % QUIZ_CHUNK_SIZE:
+            sizes.append(num_questions % QUIZ_CHUNK_SIZE)
+        chunks = await asyncio.gather(
+            *(
+                self._request_quiz(topic, size, priority, part=(n, len(sizes)))
+                for n, size in enumerate(sizes, start=1)
+            ),
+            return_exceptions=True,
+        )
+
+        succeeded = [chunk for chunk in chunks if not isinstance(chunk, BaseException)]
+        if not succeeded:
+            raise chunks[0]
+
+        # Chunks are generated independently, so drop repeated questions
+        merged, seen = [], set()
+        self._merge_unique(merged, seen, succeeded)
+
+        # One top-up round if duplicates or failed chunks left us short
+        missing = num_questions - len(merged)
+        if missing > 0:
+            try:
+                extra = await self._request_quiz(
+                    topic, min(missing + 2, QUIZ_CHUNK_SIZE), priority,
+                    part=(len(sizes) + 1, len(sizes) + 1),
+                )
+                self._merge_unique(merged, seen, [extra])
+            except Exception as e:
+                print(f"Quiz top-up error: {e}")
+        return merged[:num_questions]
+
+    @staticmethod
+    def _answered(questions: list) -> list:
+        """Question dicts from structured output, minus any the model left unanswered"""
+        return [q.model_dump() for q in questions if q.answer and q.answer.strip()]
+
+    @staticmethod
+    def _merge_unique(merged: list, seen: set, chunks: list):
+        """Append questions whose normalized prompt hasn't been seen yet"""
+        for chunk in chunks:
+            for question in chunk:
+                key = normalize_text(question["prompt"])
+                if key and key not in seen:
+                    seen.add(key)
+                    merged.append(question)
+
+    async def _request_quiz(
+        self,
+        topic: str,
+        num_questions: int,
+        priority: int = PRIORITY_QUIZ,
+        part: Optional[tuple] = None,
+    ) -> list:
+        """Ask the model for a quiz and parse it"""
+        def salvage(text: str) -> tuple:
+            questions = self._parse_quiz(text, limit=num_questions)
+            return questions, bool(questions)
+
+        questions = await self._generate_parsed(
+            quiz_prompt(topic, num_questions, part),
+            QuizOutput,
+            lambda parsed: self._answered(parsed.questions)[:num_questions],
+            salvage,
+            priority,
+            self.router.route("quiz", topic),
+        )
+        if len(questions) < num_questions:
+            PARSE_FAILURES.labels("quiz").inc()
+        if not questions:
+            raise UnparseableOutput(f"No quiz questions parsed for '{topic}'")
+        return questions
     
-    def _parse_quiz(self, text: str) -> list:
-        """Parse quiz response into structured format"""
+    async def generate_quiz_batch(self, requests: list) -> list:
+        """
+        Generate quizzes for several (topic, num_questions) pairs, packing
+        topics the question bank can't serve into as few prompts as the
+        output token budget allows
+        """
+        results = [None] * len(requests)
+        pending = []
+        for index, (topic, num_questions) in enumerate(requests):
+            banked = self.question_bank.sample(topic, num_questions)
+            if banked is not None:
+                RESPONSES.labels("quiz_batch", "bank").inc()
+                if self.question_bank.needs_refresh(topic):
+                    self._schedule_bank_refresh(topic, num_questions)
+                results[index] = banked
+            else:
+                pending.append((index, topic, num_questions))
+
+        if pending:
+            await self._ensure_model()
+
+        if pending and self.is_configured:
+            groups = self._pack_quiz_batches(pending)
+            batches = await asyncio.gather(
+                *(self._request_quiz_batch(group) for group in groups),
+                return_exceptions=True,
+            )
+            for group, batch in zip(groups, batches):
+                if isinstance(batch, Exception):
+                    print(f"Batch quiz generation error: {batch}")
+                    continue
+                for (index, topic, num_questions), questions in zip(group, batch):
+                    if questions:
+                        self.question_bank.add(topic, questions)
+                        results[index] = questions[:num_questions]
+                        RESPONSES.labels("quiz_batch", "success").inc()
+
+        # Topics the batch missed go through the single-topic path
+        missing = [i for i, questions in enumerate(results) if questions is None]
+        retried = await asyncio.gather(
+            *(self.generate_quiz(*requests[i]) for i in missing)
+        )
+        for index, questions in zip(missing, retried):
+            results[index] = questions
+        return results
+
+    def _pack_quiz_batches(self, pending: list) -> list:
+        """Group topics greedily so each prompt stays within the token budget"""
+        groups, current, budget = [], [], 0
+        for item in pending:
+            cost = item[2] * QUIZ_TOKENS_PER_QUESTION
+            if current and budget + cost > BATCH_QUIZ_MAX_OUTPUT_TOKENS:
+                groups.append(current)
+                current, budget = [], 0
+            current.append(item)
+            budget += cost
+        if current:
+            groups.append(current)
+        return groups
+
+    async def _request_quiz_batch(self, group: list) -> list:
+        """Ask for several topics' quizzes in one prompt; one list per topic"""
+        def convert(parsed: BatchQuizOutput) -> list:
+            sections = [[] for _ in group]
+            for entry in parsed.topics:
+                if 1 <= entry.topic_number <= len(group):
+                    sections[entry.topic_number - 1] = self._answered(entry.questions)
+            return sections
+
+        def salvage(text: str) -> tuple:
+            sections = self._parse_quiz_batch(text, len(group))
+            return sections, any(sections)
+
+        # _pack_quiz_batches keeps each group's answers within this budget
+        sections = await self._generate_parsed(
+            quiz_batch_prompt(group, BATCH_QUIZ_MAX_OUTPUT_TOKENS),
+            BatchQuizOutput,
+            convert,
+            salvage,
+            PRIORITY_QUIZ,
+            self.router.route("quiz_batch", *(topic for _, topic, _ in group)),
+        )
+        PARSE_FAILURES.labels("quiz_batch").inc(sum(1 for questions in sections if not questions))
+        return sections
+
+    def _parse_quiz_batch(self, text: str, num_topics: int) -> list:
+        """Split a batched quiz response by TOPIC n: markers and parse each"""
+        sections = [[] for _ in range(num_topics)]
+        current = None
+        for line in text.strip().split('\n'):
+            match = TOPIC_MARKER.match(line)
+            if match:
+                number = int(match.group(1))
+                current = number - 1 if 1 <= number <= num_topics else None
+            elif current is not None:
+                sections[current].append(line)
+        return [self._parse_quiz('\n'.join(lines), limit=None) for lines in sections]
+
+    def _parse_quiz(self, text: str, limit: Optional[int] = 3) -> list:
+        """Parse a text-format quiz (Qn:/An:/En: lines) into question dicts"""
         questions = []
-        lines = text.strip().split('\n')
-        
-        current_q = None
-        current_a = None
-        
-        for line in lines:
+        current = None
+        field = None
+
+        for line in text.strip().split('\n'):
             line = line.strip()
-            if line.startswith('Q'):
-                if current_q and current_a:
-                    questions.append({
-                        "prompt": current_q,
-                        "answer": current_a,
-                        "choices": None
-                    })
-                current_q = line.split(':', 1)[1].strip() if ':' in line else line
-                current_a = None
-            elif line.startswith('A'):
-                current_a = line.split(':', 1)[1].strip() if ':' in line else line
-        
-        # Add the last question
-        if current_q and current_a:
-            questions.append({
-                "prompt": current_q,
-                "answer": current_a,
-                "choices": None
-            })
-        
-        return questions[:3]  # Return up to 3 questions
+            match = QUIZ_MARKER.match(line)
+            if match:
+                marker, body = match.group(1).upper(), match.group(3).strip("* ")
+                if marker == 'Q':
+                    current = {"prompt": body, "choices": None, "answer": None, "explanation": None}
+                    questions.append(current)
+                    field = "prompt"
+                elif current is not None:
+                    field = "answer" if marker == 'A' else "explanation"
+                    current[field] = body
+            elif line and current is not None:
+                # A wrapped line continues whichever field came last
+                current[field] = f"{current[field]} {line}" if current[field] else line
+
+        questions = [q for q in questions if q["prompt"] and q["answer"]]
+        return questions[:limit]  # Return up to `limit` questions (all if None)
     
     def _fallback_quiz(self, topic: str, num_questions: int) -> list:
-        """Fallback quiz when AI is not available"""
+        """Fallback quiz when AI is not available: items from the content pack"""
+        entry = self.content_pack.get(TOPIC_CLASSIFIER.classify(topic))
+        if entry is not None and entry["quiz"]:
+            items = random.sample(entry["quiz"], min(num_questions, len(entry["quiz"])))
+            return [
+                {"prompt": item["prompt"], "choices": None, "answer": item["answer"], "explanation": None}
+                for item in items
+            ]
         return [
             {
                 "prompt": f"To generate intelligent quizzes on '{topic}', please configure the Gemini API.",
@@ -0,0 +1,229 @@
+"""
+ASGI Bridge - Serve the FastAPI app from a WSGI server (Cloud Functions)
+Requests run on one long-lived event loop; response bodies stream back as produced
+"""
+import asyncio
+import queue
+import sys
+import threading
+from http import HTTPStatus
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+
+# Bytes read from wsgi.input per http.request message
+BODY_CHUNK_SIZE = 64 * 1024
+# Seconds the first request waits for the app's startup hooks
+LIFESPAN_STARTUP_TIMEOUT = 10.0
+
+_DONE = object()  # Sentinel: the app sent its last body chunk
+
+
+class _Exchange:
+    """State shared by the WSGI thread and the app running on the loop"""
+
+    __slots__ = ("messages", "status", "headers", "disconnected")
+
+    def __init__(self):
+        # Body chunks, _DONE, or an exception, in the order the app sent them
+        self.messages: "queue.SimpleQueue" = queue.SimpleQueue()
+        self.status: Optional[int] = None
+        self.headers: List[Tuple[bytes, bytes]] = []
+        self.disconnected = asyncio.Event()  # The WSGI side stopped reading
+
+
+class ASGIBridge:
+    """
+    WSGI callable that runs an ASGI app on a background event loop.
+
+    The loop lives for the whole process, so each request costs one
+    cross-thread hand-off each way rather than a fresh portal, and state
+    bound to the loop (the LLM scheduler, SingleFlight) is shared by every
+    request. The request body is read from wsgi.input in chunks, and
+    response chunks are yielded to the WSGI server as the app sends them,
+    without being joined or copied. When the loop starts, the app gets an
+    ASGI lifespan startup, so its startup hooks run as under uvicorn.
+    """
+
+    def __init__(self, app: Callable, chunk_size: int = BODY_CHUNK_SIZE, lifespan: bool = True):
+        self.app = app
+        self.chunk_size = chunk_size
+        self.lifespan = lifespan
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = threading.Lock()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """The bridge's event loop, started on first use"""
+        if self._loop is None:
+            with self._lock:
+                if self._loop is None:
+                    loop = asyncio.new_event_loop()
+                    threading.Thread(target=loop.run_forever, name="asgi-bridge", daemon=True).start()
+                    if self.lifespan:
+                        started = threading.Event()
+                        asyncio.run_coroutine_threadsafe(self._lifespan(started), loop)
+                        started.wait(LIFESPAN_STARTUP_TIMEOUT)
+                    self._loop = loop
+        return self._loop
+
+    async def _lifespan(self, started: threading.Event):
+        """Send lifespan.startup; Cloud Functions never announce shutdown"""
+        sent = False
+
+        async def receive() -> dict:
+            nonlocal sent
+            if not sent:
+                sent = True
+                return {"type": "lifespan.startup"}
+            await asyncio.Event().wait()  # Stays up until the process exits
+
+        async def send(message: dict):
+            if message["type"] == "lifespan.startup.failed":
+                print(f"⚠️ ASGI app startup failed: {message.get('message', '')}", file=sys.stderr)
+            if message["type"].startswith("lifespan.startup."):
+                started.set()
+
+        scope = {"type": "lifespan", "asgi": {"version": "3.0", "spec_version": "2.0"}, "state": {}}
+        try:
+            await self.app(scope, receive, send)
+        except Exception as e:  # Apps without lifespan support just serve requests
+            print(f"⚠️ ASGI lifespan not supported: {e!r}", file=sys.stderr)
+        finally:
+            started.set()
+
+    def __call__(self, environ: dict, start_response: Callable) -> Iterable[bytes]:
+        exchange = _Exchange()
+        future = asyncio.run_coroutine_threadsafe(
+            self._run(self.build_scope(environ), environ, exchange), self.loop
+        )
+
+        # Wait for the first chunk so status, headers and body leave together
+        first = exchange.messages.get()
+        if isinstance(first, BaseException):
+            print(f"⚠️ ASGI app failed: {first!r}", file=sys.stderr)
+            start_response(
+                "500 Internal Server Error",
+                [("Content-Type", "text/plain; charset=utf-8")],
+                (type(first), first, first.__traceback__),
+            )
+            return [b"Internal Server Error"]
+
+        start_response(
+            _status_line(exchange.status),
+            [(name.decode("latin-1"), value.decode("latin-1")) for name, value in exchange.headers],
+        )
+        return self._body(first, exchange, future)
+
+    def _body(self, message, exchange: _Exchange, future) -> Iterator[bytes]:
+        """Yield body chunks until the last one; tell the app if abandoned"""
+        try:
+            while message is not _DONE:
+                if isinstance(message, BaseException):
+                    raise message
+                yield message
+                message = exchange.messages.get()
+        finally:
+            # Runs on normal completion too; only an unfinished app cares
+            self.loop.call_soon_threadsafe(exchange.disconnected.set)
+            if message is not _DONE and not future.done():
+                self.loop.call_soon_threadsafe(future.cancel)
+
+    async def _run(self, scope: dict, environ: dict, exchange: _Exchange):
+        loop = asyncio.get_running_loop()
+        body = environ["wsgi.input"]
+        remaining = _content_length(environ)
+        body_done = False
+        started = finished = False
+
+        async def receive() -> dict:
+            nonlocal remaining, body_done
+            if body_done:
+                await exchange.disconnected.wait()
+                return {"type": "http.disconnect"}
+            size = self.chunk_size if remaining is None else min(self.chunk_size, remaining)
+            # wsgi.input may block on the socket, so read it off the loop
+            chunk = await loop.run_in_executor(None, body.read, size) if size else b""
+            if remaining is not None:
+                remaining -= len(chunk)
+            body_done = not chunk or remaining == 0
+            return {"type": "http.request", "body": chunk, "more_body": not body_done}
+
+        async def send(message: dict):
+            nonlocal started, finished
+            if message["type"] == "http.response.start":
+                exchange.status = message["status"]
+                exchange.headers = list(message.get("headers", []))
+                started = True
+            elif message["type"] == "http.response.body" and not finished:
+                if not started:
+                    raise RuntimeError("Response body sent before http.response.start")
+                chunk = message.get("body", b"")
+                if chunk:
+                    exchange.messages.put(chunk)
+                if not message.get("more_body", False):
+                    finished = True
+                    exchange.messages.put(_DONE)
+
+        try:
+            await self.app(scope, receive, send)
+            if not finished:
+                raise RuntimeError("ASGI app returned without completing the response")
+        except asyncio.CancelledError:
+            pass  # The client went away
+        except Exception as e:
+            if finished:
+                # Already delivered (e.g. a background task failed)
+                print(f"⚠️ ASGI app failed after responding: {e!r}", file=sys.stderr)
+            else:
+                exchange.messages.put(e)
+
+    @staticmethod
+    def build_scope(environ: dict) -> dict:
+        """Translate a WSGI environ into an ASGI HTTP scope"""
+        headers = []
+        for key, value in environ.items():
+            if key.startswith("HTTP_"):
+                name = key[5:].replace("_", "-").lower()
+            elif key in ("CONTENT_TYPE", "CONTENT_LENGTH") and value:
+                name = key.replace("_", "-").lower()
+            else:
+                continue
+            headers.append((name.encode("latin-1"), value.encode("latin-1")))
+
+        # PEP 3333 passes the path as latin-1 decoded bytes
+        raw_path = environ.get("PATH_INFO", "").encode("latin-1")
+        server_port = environ.get("SERVER_PORT")
+        remote_addr = environ.get("REMOTE_ADDR")
+        return {
+            "type": "http",
+            "asgi": {"version": "3.0", "spec_version": "2.3"},
+            "http_version": environ.get("SERVER_PROTOCOL", "HTTP/1.1").split("/")[-1],
+            "method": environ["REQUEST_METHOD"].upper(),
+            "scheme": environ.get("wsgi.url_scheme", "http"),
+            "path": raw_path.decode("utf-8", "replace"),
+            "raw_path": raw_path,
+            "root_path": environ.get("SCRIPT_NAME", "").encode("latin-1").decode("utf-8", "replace"),
+            "query_string": environ.get("QUERY_STRING", "").encode("latin-1"),
+            "headers": headers,
+            "server": (environ.get("SERVER_NAME", "localhost"), int(server_port)) if server_port else None,
+            "client": (remote_addr, int(environ.get("REMOTE_PORT") or 0)) if remote_addr else None,
+        }
+
+
+def _content_length(environ: dict) -> Optional[int]:
+    """Declared body size; None means read until EOF"""
+    value = environ.get("CONTENT_LENGTH")
+    if value:
+        try:
+            return max(0, int(value))
+        except ValueError:
+            return None
+    if environ.get("HTTP_TRANSFER_ENCODING", "").lower() == "chunked":
+        return None
+    return 0
+
+
+def _status_line(status: int) -> str:
+    try:
+        return f"{status} {HTTPStatus(status).phrase}"
+    except ValueError:
+        return f"{status} Unknown"
@@ -0,0 +1,280 @@
+"""
+Cache Warmer - Pre-generate popular tutor answers and quizzes on startup
+New instances fill their caches from topic popularity before students ask
+"""
+import asyncio
+import json
+import math
+import os
+import tempfile
+import threading
+import time
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from backend import call_budget
+from backend.ai_service import QUIZ_CHUNK_SIZE, ai_service
+from backend.call_budget import CallBudget
+from backend.response_cache import normalize_text
+from backend.session_tracker import trackers
+
+# Warm up at all, seconds to wait after startup, and the most model calls
+# warm-up may spend. Every real call counts (retries and repairs too); the
+# plan assumes one call per tutor answer and per QUIZ_CHUNK_SIZE questions.
+WARMUP_ENABLED = os.getenv("WARMUP_ENABLED", "1") != "0"
+WARMUP_DELAY = float(os.getenv("WARMUP_DELAY", "5"))
+WARMUP_MAX_CALLS = int(os.getenv("WARMUP_MAX_CALLS", "30"))
+# How much to warm: most popular topics, their most asked questions, the
+# quiz size banked per topic, and warm-up calls run side by side
+WARMUP_TOP_TOPICS = int(os.getenv("WARMUP_TOP_TOPICS", "5"))
+WARMUP_QUESTIONS_PER_TOPIC = int(os.getenv("WARMUP_QUESTIONS_PER_TOPIC", "3"))
+WARMUP_QUIZ_QUESTIONS = int(os.getenv("WARMUP_QUIZ_QUESTIONS", "5"))
+WARMUP_CONCURRENCY = max(1, int(os.getenv("WARMUP_CONCURRENCY", "2")))
+
+# Popularity snapshot shared across restarts (point it at shared storage to
+# share it across instances) and how often it is rewritten
+POPULARITY_SNAPSHOT_PATH = Path(os.getenv(
+    "POPULARITY_SNAPSHOT_PATH",
+    str(Path(tempfile.gettempdir()) / "edumentor_topic_popularity.json"),
+))
+POPULARITY_SNAPSHOT_INTERVAL = float(os.getenv("POPULARITY_SNAPSHOT_INTERVAL", "300"))
+
+# Most asked questions remembered per topic in the snapshot
+SNAPSHOT_QUESTIONS_PER_TOPIC = 10
+
+
+class TopicPopularity:
+    """Topic, quiz-topic and per-topic question counts, mergeable and JSON-friendly"""
+
+    def __init__(self, topics=None, quiz_topics=None, questions=None):
+        self.topics = Counter(topics or {})
+        self.quiz_topics = Counter(quiz_topics or {})
+        # topic -> {question text: count}
+        self.questions: Dict[str, Counter] = defaultdict(Counter)
+        for topic, counts in (questions or {}).items():
+            self.questions[topic].update(counts)
+
+    @classmethod
+    def from_trackers(cls, trackers) -> "TopicPopularity":
+        """Sum the counters of every learner currently in memory"""
+        popularity = cls()
+        for _, tracker in trackers:
+            with tracker.lock:
+                popularity.topics.update(tracker.topics_covered)
+                popularity.quiz_topics.update(tracker.quiz_topics)
+                for question, topic, _ in tracker.question_log:
+                    popularity.questions[topic][question] += 1
+        return popularity
+
+    def merged(self, other: "TopicPopularity") -> "TopicPopularity":
+        merged = TopicPopularity(self.topics, self.quiz_topics, self.questions)
+        merged.topics.update(other.topics)
+        merged.quiz_topics.update(other.quiz_topics)
+        for topic, counts in other.questions.items():
+            merged.questions[topic].update(counts)
+        return merged
+
+    def top_topics(self, n: int) -> List[str]:
+        return [topic for topic, _ in self.topics.most_common(n)]
+
+    def top_quiz_topics(self, n: int) -> List[str]:
+        return [topic for topic, _ in self.quiz_topics.most_common(n)]
+
+    def top_questions(self, topic: str, n: int) -> List[str]:
+        """Most asked questions for a topic, one per normalized form"""
+        by_key: Dict[str, Tuple[str, int]] = {}
+        for question, count in self.questions.get(topic, {}).items():
+            key = normalize_text(question)
+            text, total = by_key.get(key, (question, 0))
+            by_key[key] = (text, total + count)
+        ranked = sorted(by_key.values(), key=lambda item: -item[1])
+        return [text for text, _ in ranked[:n]]
+
+    def __bool__(self) -> bool:
+        return bool(self.topics)
+
+    def to_dict(self) -> dict:
+        return {
+            "topics": dict(self.topics),
+            "quiz_topics": dict(self.quiz_topics),
+            "questions": {
+                topic: dict(counts.most_common(SNAPSHOT_QUESTIONS_PER_TOPIC))
+                for topic, counts in self.questions.items() if counts
+            },
+        }
+
+
+class PopularitySnapshot:
+    """TopicPopularity persisted to a JSON file so new instances start informed"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+
+    def load(self) -> TopicPopularity:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return TopicPopularity(data.get("topics"), data.get("quiz_topics"), data.get("questions"))
+        except (OSError, ValueError, AttributeError, TypeError):
+            return TopicPopularity()
+
+    def save(self, popularity: TopicPopularity):
+        data = dict(popularity.to_dict(), saved_at=time.time())
+        with self._lock:
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                # Write to a temp file first so readers never see a partial file
+                fd, tmp_path = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp")
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump(data, f)
+                os.replace(tmp_path, self.path)
+            except OSError as e:
+                print(f"⚠️ Could not persist topic popularity: {e}")
+
+
+class CacheWarmer:
+    """
+    Background job that warms the tutor cache and question bank for the most
+    popular topics. Popularity comes from the snapshot left by earlier
+    instances plus whatever this instance has tracked so far. Work runs at
+    background scheduler priority, so it never delays student requests, and
+    stops once `max_calls` model calls have actually been made.
+    """
+
+    def __init__(
+        self,
+        service,
+        trackers,
+        snapshot: Optional[PopularitySnapshot] = None,
+        top_topics: int = WARMUP_TOP_TOPICS,
+        questions_per_topic: int = WARMUP_QUESTIONS_PER_TOPIC,
+        quiz_questions: int = WARMUP_QUIZ_QUESTIONS,
+        max_calls: int = WARMUP_MAX_CALLS,
+        concurrency: int = WARMUP_CONCURRENCY,
+    ):
+        self.service = service
+        self.trackers = trackers
+        self.snapshot = snapshot or PopularitySnapshot(POPULARITY_SNAPSHOT_PATH)
+        self.top_topics = top_topics
+        self.questions_per_topic = questions_per_topic
+        self.quiz_questions = quiz_questions
+        self.max_calls = max_calls
+        self.concurrency = concurrency
+        # Counts from before this process started; live counts are added on top
+        self._baseline = self.snapshot.load()
+        self._task: Optional[asyncio.Task] = None
+        # Counts every model call made while warming, across passes
+        self.budget = CallBudget(max_calls)
+        self.warmed = Counter()  # "tutor" / "quiz" -> items warmed
+        self.skipped = 0  # Items left out because the budget ran out
+
+    def popularity(self) -> TopicPopularity:
+        return self._baseline.merged(TopicPopularity.from_trackers(self.trackers))
+
+    def plan(self, popularity: TopicPopularity) -> List[Tuple[str, str, int]]:
+        """(kind, question or topic, model calls) for the top topics, most popular first"""
+        quiz_cost = math.ceil(self.quiz_questions / QUIZ_CHUNK_SIZE)
+        topics = popularity.top_topics(self.top_topics)
+        # Quizzes are banked under the topic students typed, so prefer those
+        quiz_topics = popularity.top_quiz_topics(self.top_topics) or topics
+        items = []
+        for rank in range(max(len(topics), len(quiz_topics))):
+            if rank < len(topics):
+                for question in popularity.top_questions(topics[rank], self.questions_per_topic):
+                    items.append(("tutor", question, 1))
+            if rank < len(quiz_topics) and self.quiz_questions:
+                items.append(("quiz", quiz_topics[rank], quiz_cost))
+        return items
+
+    async def warm(self, popularity: Optional[TopicPopularity] = None) -> dict:
+        """Warm the caches once; returns stats"""
+        service = self.service
+        await service._ensure_model()
+        if not service.is_configured:
+            return self.stats()
+
+        # Spend the budget on the most popular items first
+        selected, planned = [], 0
+        for item in self.plan(popularity or self.popularity()):
+            if self._is_warm(item[0], item[1]):
+                continue
+            if planned + item[2] > self.budget.remaining():
+                self.skipped += 1
+                continue
+            planned += item[2]
+            selected.append(item)
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def run(kind: str, subject: str):
+            async with semaphore:
+                if not self.budget.remaining():
+                    self.skipped += 1  # Retries elsewhere used up the budget
+                    return
+                try:
+                    if kind == "tutor":
+                        if await service.warm_tutor_answer(subject):
+                            self.warmed["tutor"] += 1
+                    elif await service.warm_quiz(subject, self.quiz_questions):
+                        self.warmed["quiz"] += 1
+                except Exception as e:
+                    print(f"Cache warm-up error ({kind} '{subject}'): {e}")
+
+        with call_budget.limited(self.budget):
+            await asyncio.gather(*(run(kind, subject) for kind, subject, _ in selected))
+        print(f"🔥 Cache warm-up: {dict(self.warmed)} in {self.calls} model calls")
+        return self.stats()
+
+    @property
+    def calls(self) -> int:
+        """Model calls made by warm-up so far"""
+        return self.budget.calls
+
+    def _is_warm(self, kind: str, subject: str) -> bool:
+        if kind == "tutor":
+            return normalize_text(subject) in self.service.tutor_cache
+        return self.service.question_bank.size(subject) >= self.quiz_questions
+
+    async def run(self, delay: float = WARMUP_DELAY, interval: float = POPULARITY_SNAPSHOT_INTERVAL):
+        """Warm once after `delay`, then keep the popularity snapshot fresh"""
+        await asyncio.sleep(delay)
+        await self.warm()
+        while True:
+            await asyncio.sleep(interval)
+            self.save_snapshot()
+
+    def save_snapshot(self):
+        popularity = self.popularity()
+        if popularity:
+            self.snapshot.save(popularity)
+
+    def start(self):
+        """Start the background job on the running loop (once)"""
+        if WARMUP_ENABLED and self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self.run())
+
+    async def stop(self):
+        """Cancel the job and persist popularity for the next instance"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._task = None
+        self.save_snapshot()
+
+    def stats(self) -> dict:
+        return {
+            "calls": self.calls,
+            "budget": self.max_calls,
+            "tutor": self.warmed["tutor"],
+            "quiz": self.warmed["quiz"],
+            "skipped": self.skipped,
+        }
+
+
+# Global warmer for the shared AIService and learner trackers
+cache_warmer = CacheWarmer(ai_service, trackers)
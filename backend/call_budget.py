@@ -0,0 +1,67 @@
+"""
+Call Budget - Caps the model calls a piece of background work may make
+Counted at every real model call, so retries, repairs, failover and hedges all count
+"""
+import contextvars
+import threading
+from contextlib import contextmanager
+from typing import Optional
+
+
+class CallBudgetExhausted(RuntimeError):
+    """The work has already made every model call its budget allows"""
+
+
+class CallBudget:
+    """Model calls made so far against a limit; shared by every task doing the work"""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def remaining(self) -> int:
+        with self._lock:
+            return max(0, self.limit - self.calls)
+
+    def spend(self):
+        """Count one call; raises once the limit has been reached"""
+        with self._lock:
+            if self.calls >= self.limit:
+                raise CallBudgetExhausted(f"Model call budget of {self.limit} used up")
+            self.calls += 1
+
+    def try_spend(self) -> bool:
+        """Count one optional call (e.g. a hedge) if the budget allows it"""
+        with self._lock:
+            if self.calls >= self.limit:
+                return False
+            self.calls += 1
+            return True
+
+
+# Budget the current work's model calls count against, if any
+_budget: contextvars.ContextVar[Optional[CallBudget]] = contextvars.ContextVar("call_budget", default=None)
+
+
+def spend():
+    """Count a model call against the current budget, if there is one"""
+    budget = _budget.get()
+    if budget is not None:
+        budget.spend()
+
+
+def try_spend() -> bool:
+    """Count an optional model call; False if the current budget has none left"""
+    budget = _budget.get()
+    return budget is None or budget.try_spend()
+
+
+@contextmanager
+def limited(budget: CallBudget):
+    """Count model calls made by the block (and tasks it starts) against `budget`"""
+    token = _budget.set(budget)
+    try:
+        yield budget
+    finally:
+        _budget.reset(token)
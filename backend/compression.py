@@ -0,0 +1,146 @@
+"""
+Compression - Brotli or gzip response bodies, whichever the client prefers
+Brotli needs the optional `brotli` package; without it clients get gzip
+"""
+import os
+import zlib
+from typing import Callable, Set
+
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import brotli
+except ImportError:  # Optional: gzip only
+    brotli = None
+
+# Bodies smaller than this go out uncompressed; the headers would eat the gain
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "500"))
+# Moderate levels: bodies are compressed per response, not ahead of time
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", "5"))
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", "6"))
+
+# compress(chunk, more_body) -> compressed bytes, flushed so each chunk can be sent
+Compress = Callable[[bytes, bool], bytes]
+
+
+def accepted_encodings(header: str) -> Set[str]:
+    """Codings an Accept-Encoding header allows (q=0 means refused)"""
+    accepted = set()
+    for part in header.lower().split(","):
+        coding, _, params = part.partition(";")
+        coding = coding.strip()
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if coding and quality > 0:
+            accepted.add(coding)
+    return accepted
+
+
+def gzip_compressor(level: int = GZIP_LEVEL) -> Compress:
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)  # gzip framing
+
+    def compress(body: bytes, more_body: bool) -> bytes:
+        data = compressor.compress(body)
+        # Flush each streamed chunk so it reaches the client right away
+        return data + compressor.flush(zlib.Z_SYNC_FLUSH if more_body else zlib.Z_FINISH)
+
+    return compress
+
+
+def brotli_compressor(quality: int = BROTLI_QUALITY) -> Compress:
+    compressor = brotli.Compressor(quality=quality)
+
+    def compress(body: bytes, more_body: bool) -> bytes:
+        data = compressor.process(body)
+        return data + (compressor.flush() if more_body else compressor.finish())
+
+    return compress
+
+
+class CompressionResponder:
+    """
+    Wraps `send` for one response. The start message is held back until the
+    first body chunk shows whether compressing is worth it; streams
+    (text/event-stream), already-encoded and small single-chunk responses
+    go out untouched.
+    """
+
+    def __init__(self, app, encoding: str, compress: Compress, minimum_size: int):
+        self.app = app
+        self.encoding = encoding
+        self.compress = compress
+        self.minimum_size = minimum_size
+        self.send = None
+        self.start_message = None
+        self.compressing = False
+
+    async def __call__(self, scope, receive, send):
+        self.send = send
+        await self.app(scope, receive, self.send_compressed)
+
+    async def send_compressed(self, message):
+        if message["type"] == "http.response.start":
+            headers = Headers(raw=message["headers"])
+            if "content-encoding" in headers or headers.get("content-type", "").startswith("text/event-stream"):
+                await self.send(message)
+            else:
+                self.start_message = message
+            return
+
+        if self.start_message is not None:
+            start, self.start_message = self.start_message, None
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if message["type"] == "http.response.body" and (more_body or len(body) >= self.minimum_size):
+                headers = MutableHeaders(raw=start["headers"])
+                headers["Content-Encoding"] = self.encoding
+                headers.add_vary_header("Accept-Encoding")
+                if "content-length" in headers:
+                    del headers["Content-Length"]
+                self.compressing = True
+            await self.send(start)
+
+        if self.compressing and message["type"] == "http.response.body":
+            more_body = message.get("more_body", False)
+            message = {
+                "type": "http.response.body",
+                "body": self.compress(message.get("body", b""), more_body),
+                "more_body": more_body,
+            }
+        await self.send(message)
+
+
+class CompressionMiddleware:
+    """
+    Compresses HTTP responses with brotli when the client accepts it and the
+    package is installed, otherwise with gzip. Streams (text/event-stream),
+    already-encoded and small responses pass through untouched; compressed
+    responses carry Vary: Accept-Encoding so caches keep one copy per coding.
+    Only Starlette's public Headers classes are used, so upgrades can't
+    break it.
+    """
+
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        accepted = accepted_encodings(Headers(scope=scope).get("accept-encoding", ""))
+        if brotli is not None and "br" in accepted:
+            responder = CompressionResponder(self.app, "br", brotli_compressor(), self.minimum_size)
+        elif "gzip" in accepted:
+            responder = CompressionResponder(self.app, "gzip", gzip_compressor(), self.minimum_size)
+        else:
+            await self.app(scope, receive, send)
+            return
+        await responder(scope, receive, send)
@@ -0,0 +1,177 @@
+"""
+Content Pack - Precomputed tutor answers and quiz items for offline fallbacks
+A memory-mapped file keyed by topic, served when Gemini is down or overloaded
+
+Rebuild from the JSON source:  python -m backend.content_pack build --from-json
+Regenerate with the model:     python -m backend.content_pack build
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import mmap
+import os
+import struct
+import tempfile
+import zlib
+from pathlib import Path
+from typing import Dict, Optional
+
+from backend.response_cache import normalize_text
+
+backend_dir = Path(__file__).parent
+
+# The packed file served at runtime and the JSON it is built from
+CONTENT_PACK_PATH = Path(os.getenv("CONTENT_PACK_PATH", str(backend_dir / "content_pack.bin")))
+CONTENT_PACK_SOURCE = backend_dir / "content_pack.json"
+
+MAGIC = b"EDUPACK1"
+VERSION = 1
+# Magic, format version, number of topics
+HEADER = struct.Struct("<8sII")
+# Topic key hash, payload offset, payload length; sorted by hash
+INDEX_ENTRY = struct.Struct("<QII")
+
+
+def topic_key(topic: str) -> int:
+    """64-bit hash of a normalized topic name"""
+    digest = hashlib.blake2b(normalize_text(topic).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+class ContentPack:
+    """
+    Read-only topic -> content lookup over a memory-mapped pack file.
+
+    The file is a fixed-size sorted index followed by zlib-compressed JSON
+    records. Lookups binary-search the index in place and decode a single
+    record, so only the pages actually touched become resident.
+    """
+
+    def __init__(self, path: Path = CONTENT_PACK_PATH):
+        self.path = Path(path)
+        self._mmap = None
+        self._count = 0
+        try:
+            with open(self.path, "rb") as f:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, version, count = HEADER.unpack_from(self._mmap, 0)
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f"unsupported content pack format {magic!r} v{version}")
+            self._count = count
+        except (OSError, ValueError, struct.error) as e:
+            print(f"⚠️ Content pack unavailable ({self.path}): {e}")
+            self.close()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def get(self, topic: str) -> Optional[dict]:
+        """The record for a topic: answer, follow_up_suggestions and quiz"""
+        if not self._count:
+            return None
+        key = topic_key(topic)
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            entry_key, offset, length = INDEX_ENTRY.unpack_from(
+                self._mmap, HEADER.size + middle * INDEX_ENTRY.size
+            )
+            if entry_key < key:
+                low = middle + 1
+            elif entry_key > key:
+                high = middle
+            else:
+                return json.loads(zlib.decompress(self._mmap[offset:offset + length]))
+        return None
+
+    def close(self):
+        if self._mmap is not None:
+            self._mmap.close()
+        self._mmap = None
+        self._count = 0
+
+
+def write_pack(path: Path, records: Dict[str, dict]):
+    """Pack topic -> record into `path`, replacing it atomically"""
+    payloads = []
+    for topic, record in records.items():
+        data = json.dumps(dict(record, topic=topic), ensure_ascii=False, separators=(",", ":"))
+        payloads.append((topic_key(topic), zlib.compress(data.encode("utf-8"), 9)))
+    payloads.sort()
+    keys = [key for key, _ in payloads]
+    if len(set(keys)) != len(keys):
+        raise ValueError("Two topics normalize to the same key")
+
+    offset = HEADER.size + INDEX_ENTRY.size * len(payloads)
+    index, body = [], []
+    for key, payload in payloads:
+        index.append(INDEX_ENTRY.pack(key, offset, len(payload)))
+        body.append(payload)
+        offset += len(payload)
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # A running instance may have the old file mapped; never write over it
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    with os.fdopen(fd, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(payloads)))
+        f.write(b"".join(index))
+        f.write(b"".join(body))
+    os.chmod(tmp_path, 0o644)  # mkstemp creates owner-only files
+    os.replace(tmp_path, path)
+
+
+async def generate_records(service, topics, num_questions: int) -> Dict[str, dict]:
+    """Ask the model for an overview answer and a quiz on each topic"""
+    from backend.scheduler import PRIORITY_BACKGROUND
+
+    await service._ensure_model()
+    if not service.is_configured:
+        raise RuntimeError("No model configured; set GEMINI_API_KEY or MODEL_PROVIDER")
+
+    records = {}
+    for topic in topics:
+        # Call the model directly: the normal paths would fall back to this pack
+        answer = await service._request_tutor(f"Give a short overview of {topic}.", PRIORITY_BACKGROUND)
+        quiz = await service._request_quiz_chunked(topic, num_questions, PRIORITY_BACKGROUND)
+        records[topic] = {
+            "answer": answer["answer"],
+            "follow_up_suggestions": answer["follow_up_suggestions"],
+            "quiz": [{"prompt": q["prompt"], "answer": q["answer"]} for q in quiz],
+        }
+        print(f"  {topic}: {len(quiz)} quiz items")
+    return records
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="write the pack file")
+    build.add_argument("--from-json", action="store_true",
+                       help=f"pack {CONTENT_PACK_SOURCE.name} instead of asking the model")
+    build.add_argument("--questions", type=int, default=6, help="quiz items per topic")
+    build.add_argument("--source", type=Path, default=CONTENT_PACK_SOURCE)
+    build.add_argument("--output", type=Path, default=CONTENT_PACK_PATH)
+    args = parser.parse_args()
+
+    if args.from_json:
+        with open(args.source, "r", encoding="utf-8") as f:
+            records = json.load(f)
+    else:
+        from backend.ai_service import AIService
+        from backend.session_tracker import TOPIC_CLASSIFIER, TOPIC_KEYWORDS
+
+        topics = list(TOPIC_KEYWORDS) + [TOPIC_CLASSIFIER.default]
+        records = asyncio.run(generate_records(AIService(), topics, args.questions))
+        # Keep the reviewable JSON source in step with the pack
+        with open(args.source, "w", encoding="utf-8") as f:
+            json.dump(records, f, indent=2, ensure_ascii=False)
+            f.write("\n")
+
+    write_pack(args.output, records)
+    print(f"Packed {len(records)} topics into {args.output} ({args.output.stat().st_size} bytes)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Deadlines - Per-request time budgets carried down to every model call
+Set from the incoming HTTP request; queueing, model calls and retries stop when it runs out
+"""
+import contextvars
+import os
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+# Time budget for one API request, below the platform's request timeout so
+# students get a fallback answer instead of a killed request
+REQUEST_DEADLINE_SECONDS = float(os.getenv("REQUEST_DEADLINE_SECONDS", "25"))
+# Clients may ask for a shorter budget (in seconds) with this header
+DEADLINE_HEADER = b"x-request-timeout"
+
+# Monotonic time the current request must finish by, if any
+_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar("deadline", default=None)
+
+
+class DeadlineExceeded(TimeoutError):
+    """The request's time budget ran out before the model answered"""
+
+
+def remaining() -> Optional[float]:
+    """Seconds the current request has left, or None without a deadline"""
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def budget(limit: float) -> float:
+    """`limit` cut down to the time the request has left; raises once none is left"""
+    left = remaining()
+    if left is None:
+        return limit
+    if left <= 0:
+        raise DeadlineExceeded("Request deadline exceeded")
+    return min(limit, left)
+
+
+@contextmanager
+def deadline(seconds: float):
+    """Run the block with at most `seconds` left; an earlier outer deadline still wins"""
+    new = time.monotonic() + seconds
+    current = _deadline.get()
+    token = _deadline.set(new if current is None else min(current, new))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+class DeadlineMiddleware:
+    """
+    ASGI middleware giving each HTTP request a deadline: `seconds`, or less
+    if the client sends a smaller X-Request-Timeout. Work the request awaits
+    inherits the deadline; shared in-flight calls and background refreshes
+    run in a fresh context without it.
+    """
+
+    def __init__(self, app, seconds: float = REQUEST_DEADLINE_SECONDS):
+        self.app = app
+        self.seconds = seconds
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        seconds = self.seconds
+        for name, value in scope.get("headers", ()):
+            if name == DEADLINE_HEADER:
+                try:
+                    seconds = min(seconds, max(0.0, float(value.decode("latin-1"))))
+                except ValueError:
+                    pass
+        with deadline(seconds):
+            await self.app(scope, receive, send)
@@ -0,0 +1,84 @@
+"""
+Event Log - Compact, bounded storage for a learner's recent questions
+Column arrays and interned topic ids keep memory per learner predictable
+"""
+import threading
+from array import array
+from datetime import datetime
+from typing import Dict, Iterator, List, Tuple
+
+# Longest question text kept in the recent-question log
+MAX_QUESTION_CHARS = 200
+
+_topic_ids: Dict[str, int] = {}
+_topic_names: List[str] = []
+_topic_lock = threading.Lock()
+
+
+def intern_topic(topic: str) -> int:
+    """Return a small integer id for a topic name, shared by every learner"""
+    topic_id = _topic_ids.get(topic)
+    if topic_id is None:
+        with _topic_lock:
+            topic_id = _topic_ids.get(topic)
+            if topic_id is None:
+                topic_id = len(_topic_names)
+                _topic_names.append(topic)
+                _topic_ids[topic] = topic_id
+    return topic_id
+
+
+def topic_name(topic_id: int) -> str:
+    """Topic name for an interned id"""
+    return _topic_names[topic_id]
+
+
+class QuestionLog:
+    """
+    Fixed-capacity ring buffer of recent questions. Timestamps (epoch
+    seconds) and topic ids live in typed arrays; only the (truncated)
+    question text is a Python object. Columns grow until they reach
+    capacity, then the oldest entries are overwritten.
+    """
+
+    __slots__ = ("capacity", "_timestamps", "_topics", "_texts", "_next")
+
+    def __init__(self, capacity: int = 200):
+        self.capacity = max(1, capacity)
+        self._timestamps = array("q")
+        self._topics = array("I")
+        self._texts: List[str] = []
+        self._next = 0  # Slot to overwrite once full
+
+    def append(self, question: str, topic: str, when: datetime):
+        """Record a question, evicting the oldest once full"""
+        text = question[:MAX_QUESTION_CHARS]
+        timestamp = int(when.timestamp())
+        topic_id = intern_topic(topic)
+        if len(self._texts) < self.capacity:
+            self._timestamps.append(timestamp)
+            self._topics.append(topic_id)
+            self._texts.append(text)
+            return
+        slot = self._next
+        self._timestamps[slot] = timestamp
+        self._topics[slot] = topic_id
+        self._texts[slot] = text
+        self._next = (slot + 1) % self.capacity
+
+    def __len__(self) -> int:
+        return len(self._texts)
+
+    def __iter__(self) -> Iterator[Tuple[str, str, int]]:
+        """Yield (question, topic, epoch seconds), oldest first"""
+        size = len(self._texts)
+        start = self._next if size == self.capacity else 0
+        for offset in range(size):
+            slot = (start + offset) % size
+            yield self._texts[slot], topic_name(self._topics[slot]), self._timestamps[slot]
+
+    def clear(self):
+        self._timestamps = array("q")
+        self._topics = array("I")
+        self._texts = []
+        self._next = 0
@@ -0,0 +1,44 @@
+"""
+HTTP Cache - ETag validation and Cache-Control policies for API responses
+Lets browsers revalidate unchanged data and the Firebase Hosting CDN absorb repeat GETs
+"""
+import os
+from typing import Optional
+
+# GET quizzes: seconds browsers and the CDN (s-maxage) may reuse a response,
+# and how long the CDN may keep serving it while it fetches a fresh one
+QUIZ_BROWSER_MAX_AGE = int(os.getenv("QUIZ_BROWSER_MAX_AGE", "300"))
+QUIZ_CDN_MAX_AGE = int(os.getenv("QUIZ_CDN_MAX_AGE", "3600"))
+QUIZ_STALE_WHILE_REVALIDATE = int(os.getenv("QUIZ_STALE_WHILE_REVALIDATE", "600"))
+
+# Per-learner data: browsers keep it but must revalidate it, shared caches never store it
+PRIVATE_REVALIDATE = "private, no-cache"
+# Answers that must not be reused at all, e.g. placeholder content while the model is down
+NO_STORE = "no-store"
+
+
+def shared_cache_control(
+    max_age: int = QUIZ_BROWSER_MAX_AGE,
+    s_maxage: int = QUIZ_CDN_MAX_AGE,
+    stale_while_revalidate: int = QUIZ_STALE_WHILE_REVALIDATE,
+) -> str:
+    """Cache-Control for responses that are the same for every learner"""
+    return (
+        f"public, max-age={max_age}, s-maxage={s_maxage}, "
+        f"stale-while-revalidate={stale_while_revalidate}"
+    )
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    True if an If-None-Match header lists `etag` (or is "*"). Comparison is
+    weak, as RFC 9110 asks for If-None-Match, so W/ prefixes are ignored.
+    """
+    if not if_none_match:
+        return False
+    wanted = etag.removeprefix("W/")
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == wanted:
+            return True
+    return False
@@ -1,12 +1,30 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from backend.routes import progress, quiz, tutor
+from backend.cache_warmer import cache_warmer
+from backend.compression import CompressionMiddleware
+from backend.deadlines import DeadlineMiddleware
+from backend.metrics import RequestMetricsMiddleware
+from backend.routes import metrics, progress, quiz, tutor
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Warm popular answers and quizzes in the background; don't delay startup
+    cache_warmer.start()
+    try:
+        yield
+    finally:
+        await cache_warmer.stop()
+
 
 app = FastAPI(
     title="EduMentor API",
     description="APIs for conversational tutoring, quiz generation, and progress tracking",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
 app.add_middleware(
@@ -16,10 +34,17 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Brotli/gzip for JSON bodies; event streams pass through unbuffered
+app.add_middleware(CompressionMiddleware)
+# Every request gets a time budget that model calls and retries respect
+app.add_middleware(DeadlineMiddleware)
+# Outermost, so timings include CORS handling and the full response body
+app.add_middleware(RequestMetricsMiddleware)
 
 app.include_router(tutor.router, prefix="/api")
 app.include_router(quiz.router, prefix="/api")
 app.include_router(progress.router, prefix="/api")
+app.include_router(metrics.router)
 
 
 @app.get("/", tags=["health"])
@@ -0,0 +1,361 @@
+"""
+Metrics - Lock-light Prometheus counters and histograms
+Hot-path updates touch only per-thread cells; /metrics sums them on scrape
+"""
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Seconds; covers cache hits (sub-millisecond) up to slow Gemini calls
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class _Cells:
+    """
+    Values split into one list per thread. Each thread only ever writes its
+    own list, so recording needs no lock; readers sum across lists and may
+    see a value a few microseconds stale, which scrapes don't care about.
+    """
+
+    __slots__ = ("size", "_local", "_all", "_lock")
+
+    def __init__(self, size: int):
+        self.size = size
+        self._local = threading.local()
+        self._all: List[list] = []
+        self._lock = threading.Lock()
+
+    def mine(self) -> list:
+        cell = getattr(self._local, "cell", None)
+        if cell is None:
+            # Once per thread
+            cell = self._local.cell = [0] * self.size
+            with self._lock:
+                self._all.append(cell)
+        return cell
+
+    def totals(self) -> list:
+        with self._lock:
+            cells = list(self._all)
+        totals = [0] * self.size
+        for cell in cells:
+            for i, value in enumerate(cell):
+                totals[i] += value
+        return totals
+
+
+class _Metric:
+    """A metric family: one child per distinct label combination"""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values: str):
+        """Child for a label combination; creating it is the only locked step"""
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}")
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def _label_text(self, values: Tuple[str, ...], extra: str = "") -> str:
+        pairs = [f'{name}="{_escape(value)}"' for name, value in zip(self.labelnames, values)]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    def expose(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} {self.kind}"
+        with self._lock:
+            children = list(self._children.items())
+        for values, child in sorted(children):
+            yield from self._expose_child(values, child)
+
+    def _expose_child(self, values, child) -> Iterable[str]:
+        raise NotImplementedError
+
+
+class _CounterChild:
+    __slots__ = ("_cells",)
+
+    def __init__(self):
+        self._cells = _Cells(1)
+
+    def inc(self, amount: float = 1):
+        self._cells.mine()[0] += amount
+
+    def value(self) -> float:
+        return self._cells.totals()[0]
+
+
+class Counter(_Metric):
+    """Monotonically increasing count"""
+
+    kind = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1):
+        """Increment the unlabelled counter"""
+        self.labels().inc(amount)
+
+    def _expose_child(self, values, child):
+        yield f"{self.name}{self._label_text(values)} {_format(child.value())}"
+
+
+class _HistogramChild:
+    __slots__ = ("bounds", "_cells")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        # One slot per bucket, one for +Inf, then the running sum
+        self._cells = _Cells(len(bounds) + 2)
+
+    def observe(self, value: float):
+        cell = self._cells.mine()
+        cell[bisect_left(self.bounds, value)] += 1
+        cell[-1] += value
+
+    def snapshot(self) -> Tuple[List[int], float]:
+        """Cumulative bucket counts (last is +Inf) and the sum"""
+        totals = self._cells.totals()
+        cumulative, running = [], 0
+        for count in totals[:-1]:
+            running += count
+            cumulative.append(running)
+        return cumulative, totals[-1]
+
+
+class Histogram(_Metric):
+    """Distribution of observed values in fixed buckets"""
+
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.bounds = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _HistogramChild(self.bounds)
+
+    def observe(self, value: float):
+        """Observe on the unlabelled histogram"""
+        self.labels().observe(value)
+
+    def _expose_child(self, values, child):
+        cumulative, total = child.snapshot()
+        for bound, count in zip(self.bounds + (float("inf"),), cumulative):
+            le = 'le="%s"' % ("+Inf" if bound == float("inf") else _format(bound))
+            yield f"{self.name}_bucket{self._label_text(values, le)} {count}"
+        yield f"{self.name}_count{self._label_text(values)} {cumulative[-1]}"
+        yield f"{self.name}_sum{self._label_text(values)} {_format(total)}"
+
+
+class Gauge(_Metric):
+    """
+    Values read at scrape time from a callback returning {label values: value}.
+    kind="counter" exposes totals another component already keeps.
+    """
+
+    kind = "gauge"
+
+    def __init__(
+        self, name, documentation, labelnames=(),
+        callback: Callable[[], dict] = None, kind: str = "gauge",
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.callback = callback
+        self.kind = kind
+
+    def expose(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} {self.kind}"
+        try:
+            values = self.callback() if self.callback else {}
+        except Exception as e:  # A broken gauge must not break the scrape
+            print(f"⚠️ Gauge {self.name} failed: {e}")
+            return
+        for labels, value in sorted(values.items()):
+            yield f"{self.name}{self._label_text(labels)} {_format(value)}"
+
+
+class MetricsRegistry:
+    """Named metric families rendered together in Prometheus text format"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(
+        self, name: str, documentation: str, labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def gauge(
+        self, name: str, documentation: str, labelnames: Sequence[str] = (),
+        callback: Optional[Callable[[], dict]] = None, kind: str = "gauge",
+    ) -> Gauge:
+        gauge = self._register(Gauge(name, documentation, labelnames, callback, kind))
+        if callback is not None:
+            gauge.callback = callback  # Re-registration replaces the source
+        return gauge
+
+    def render(self) -> str:
+        """All metrics in Prometheus text exposition format"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.expose())
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+# Process-wide registry and the metrics recorded by the app
+registry = MetricsRegistry()
+
+HTTP_REQUEST_SECONDS = registry.histogram(
+    "edumentor_http_request_duration_seconds",
+    "Time from request start to the last response byte, by route handler",
+    ("method", "handler", "status"),
+)
+LLM_CALL_SECONDS = registry.histogram(
+    "edumentor_llm_call_duration_seconds",
+    "Model call latency, by model and outcome",
+    ("model", "outcome"),
+)
+LLM_TOKENS = registry.counter(
+    "edumentor_llm_tokens_total",
+    "Tokens reported in model usage metadata",
+    ("model", "type"),
+)
+RESPONSES = registry.counter(
+    "edumentor_responses_total",
+    "Tutor and quiz results by where they came from",
+    ("kind", "outcome"),
+)
+LLM_TOKEN_ESTIMATE_RATIO = registry.histogram(
+    "edumentor_llm_token_estimate_ratio",
+    "Reported prompt tokens divided by our pre-call estimate, by prompt kind",
+    ("kind",),
+    buckets=(0.25, 0.5, 0.75, 0.9, 1.0, 1.1, 1.25, 1.5, 2.0, 4.0),
+)
+PARSE_FAILURES = registry.counter(
+    "edumentor_parse_failures_total",
+    "Model output that did not match the expected format",
+    ("kind",),
+)
+STRUCTURED_PARSES = registry.counter(
+    "edumentor_structured_parse_total",
+    "Structured (JSON) model output by parse result: ok, repaired, text, retried or failed",
+    ("kind", "outcome"),
+)
+LLM_RETRIES = registry.counter(
+    "edumentor_llm_retries_total",
+    "Model requests retried after a transient error, by status code or error type",
+    ("reason",),
+)
+LLM_HEDGES = registry.counter(
+    "edumentor_llm_hedged_requests_total",
+    "Model calls that sent a hedge request, by which one answered first: primary, hedge or failed",
+    ("outcome",),
+)
+MODEL_ROUTES = registry.counter(
+    "edumentor_model_routes_total",
+    "Model tier chosen per request kind, and why: simple, complex, slo or load",
+    ("kind", "tier", "reason"),
+)
+
+
+def record_usage(model: Optional[str], response, request=None) -> None:
+    """
+    Count prompt/completion tokens if the response carries usage metadata.
+    With the request's Prompt, also compare its token estimate to the
+    reported count, which shows when the budgeting estimate drifts.
+    """
+    usage = getattr(response, "usage_metadata", None)
+    if usage is None:
+        return
+    name = model or "default"
+    prompt = getattr(usage, "prompt_token_count", 0) or 0
+    completion = getattr(usage, "candidates_token_count", 0) or 0
+    if prompt:
+        LLM_TOKENS.labels(name, "prompt").inc(prompt)
+        estimated = request.estimated_tokens() if request is not None else 0
+        if estimated:
+            LLM_TOKENS.labels(name, "prompt_estimated").inc(estimated)
+            LLM_TOKEN_ESTIMATE_RATIO.labels(request.kind).observe(prompt / estimated)
+    if completion:
+        LLM_TOKENS.labels(name, "completion").inc(completion)
+
+
+class RequestMetricsMiddleware:
+    """
+    ASGI middleware timing each HTTP request until its last body chunk, so
+    streamed responses are measured in full. Requests are labelled by the
+    name of the matched route's handler (not the raw path), which keeps
+    label cardinality bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = [500]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            handler = getattr(scope.get("route"), "name", None) or "unmatched"
+            HTTP_REQUEST_SECONDS.labels(scope["method"], handler, str(status[0])).observe(
+                time.perf_counter() - start
+            )
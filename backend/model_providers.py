@@ -0,0 +1,508 @@
+"""
+Model Providers - Pluggable backends behind AIService
+Gemini for production, a local stub and a record/replay cassette for offline runs
+"""
+import hashlib
+import itertools
+import json
+import os
+import random
+import re
+import tempfile
+import threading
+import time
+from pathlib import Path
+from datetime import timedelta
+from typing import Iterator, List, Optional
+
+from backend.prompts import CHARS_PER_TOKEN, estimate_tokens
+
+# Gemini models in order of preference - use full paths with models/ prefix
+MODELS_TO_TRY = [
+    'models/gemini-2.5-flash',  # Latest fast model
+    'models/gemini-2.5-pro',     # Latest powerful model
+    'models/gemini-2.0-flash',   # Stable 2.0
+    'models/gemini-flash-latest', # Generic latest
+    'models/gemini-pro-latest'    # Generic latest pro
+]
+
+# "gemini" (default), "stub", "record" (Gemini, saving to the cassette) or
+# "replay" (answer from the cassette only)
+MODEL_PROVIDER = os.getenv("MODEL_PROVIDER", "gemini").lower()
+MODEL_CASSETTE = Path(os.getenv(
+    "MODEL_CASSETTE",
+    str(Path(tempfile.gettempdir()) / "edumentor_cassette.json"),
+))
+# Stub behaviour: seconds per call and fraction of calls that fail
+STUB_MODEL_LATENCY = float(os.getenv("STUB_MODEL_LATENCY", "0.05"))
+STUB_MODEL_ERROR_RATE = float(os.getenv("STUB_MODEL_ERROR_RATE", "0"))
+
+# Explicit Gemini context caching for system instructions at least this many
+# tokens long (smaller ones rely on the API's implicit prefix caching), and
+# how long each cache lives before it is recreated
+CONTEXT_CACHE_MIN_TOKENS = int(os.getenv("CONTEXT_CACHE_MIN_TOKENS", "1024"))
+CONTEXT_CACHE_TTL = float(os.getenv("CONTEXT_CACHE_TTL", "3600"))
+
+
+class _Usage:
+    """Token counts shaped like Gemini's usage_metadata"""
+
+    __slots__ = ("prompt_token_count", "candidates_token_count")
+
+    def __init__(self, prompt: str, completion: str):
+        # Roughly four characters per token
+        self.prompt_token_count = len(prompt) // CHARS_PER_TOKEN
+        self.candidates_token_count = len(completion) // CHARS_PER_TOKEN
+
+
+class _Response:
+    """Minimal stand-in for a Gemini response or stream chunk"""
+
+    __slots__ = ("text", "usage_metadata")
+
+    def __init__(self, text: str, usage_metadata: Optional[_Usage] = None):
+        self.text = text
+        self.usage_metadata = usage_metadata
+
+
+class ModelProvider:
+    """
+    Interface for LLM backends. Models returned by `get_model` behave like
+    genai.GenerativeModel: `generate_content(prompt)` returns an object with
+    `.text`, and `generate_content(prompt, stream=True)` an iterable of them.
+    They also accept `system_instruction`, `max_output_tokens`,
+    `response_schema` (JSON output matching the schema) and `timeout`
+    (seconds the call may take) keywords.
+    """
+
+    name = "none"
+    # Probe models in the background and remember the working one on disk
+    verify_models = False
+
+    def configure(self) -> bool:
+        """Prepare the backend; False means AIService should use fallbacks"""
+        return False
+
+    def model_names(self) -> List[str]:
+        """Models to try, in order of preference"""
+        return []
+
+    def get_model(self, name: str):
+        """Build the model object for a name"""
+        raise NotImplementedError
+
+
+class GeminiProvider(ModelProvider):
+    """Google Gemini through the google-generativeai SDK"""
+
+    name = "gemini"
+    verify_models = True
+
+    def __init__(self, api_key: Optional[str] = None, models: Optional[List[str]] = None):
+        self.api_key = api_key
+        self.models = list(models or MODELS_TO_TRY)
+        self._genai = None
+
+    def configure(self) -> bool:
+        # Read at configure time so .env files and tests can set it late
+        api_key = self.api_key or os.getenv("GEMINI_API_KEY")
+        if not api_key or api_key == "your_gemini_api_key_here":
+            print("⚠️ Gemini API key not found. Using fallback responses.")
+            return False
+        import google.generativeai as genai
+
+        genai.configure(api_key=api_key)
+        self._genai = genai
+        return True
+
+    def model_names(self) -> List[str]:
+        return list(self.models)
+
+    def get_model(self, name: str) -> "GeminiModel":
+        return GeminiModel(name, self._genai)
+
+
+class GeminiModel:
+    """
+    One Gemini model name. Keeps a GenerativeModel per system instruction so
+    the static prefix is sent as a system instruction rather than prompt
+    text; instructions long enough for explicit context caching are cached
+    server-side and recreated shortly before the cache expires.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        genai,
+        cache_min_tokens: int = CONTEXT_CACHE_MIN_TOKENS,
+        cache_ttl: float = CONTEXT_CACHE_TTL,
+    ):
+        self.name = name
+        self._genai = genai
+        self.cache_min_tokens = cache_min_tokens
+        self.cache_ttl = cache_ttl
+        self._lock = threading.Lock()
+        # system instruction -> (GenerativeModel, monotonic time to rebuild at)
+        self._variants = {}
+
+    def generate_content(
+        self,
+        prompt,
+        stream: bool = False,
+        system_instruction: Optional[str] = None,
+        max_output_tokens: Optional[int] = None,
+        response_schema: Optional[dict] = None,
+        timeout: Optional[float] = None,
+    ):
+        config = {}
+        if max_output_tokens:
+            config["max_output_tokens"] = max_output_tokens
+        if response_schema is not None:
+            config["response_mime_type"] = "application/json"
+            config["response_schema"] = response_schema
+        # The SDK abandons the HTTP call at the timeout, freeing our worker thread
+        extra = {"request_options": {"timeout": timeout}} if timeout else {}
+        return self._model_for(system_instruction).generate_content(
+            prompt, generation_config=config or None, stream=stream, **extra
+        )
+
+    def _model_for(self, system_instruction: Optional[str]):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._variants.get(system_instruction)
+            if entry is not None and now < entry[1]:
+                return entry[0]
+            model, expires = self._build(system_instruction, now)
+            self._variants[system_instruction] = (model, expires)
+            return model
+
+    def _build(self, system_instruction: Optional[str], now: float) -> tuple:
+        genai = self._genai
+        if not system_instruction:
+            return genai.GenerativeModel(self.name), float("inf")
+        if estimate_tokens(system_instruction) >= self.cache_min_tokens:
+            try:
+                cached = genai.caching.CachedContent.create(
+                    model=self.name,
+                    system_instruction=system_instruction,
+                    ttl=timedelta(seconds=self.cache_ttl),
+                )
+                # Rebuild a little early so no call lands on an expired cache
+                return genai.GenerativeModel.from_cached_content(cached), now + self.cache_ttl * 0.9
+            except Exception as e:
+                print(f"⚠️ Context cache for {self.name} unavailable: {str(e)[:80]}...")
+                # Send the instruction uncached; try caching again next TTL
+                model = genai.GenerativeModel(self.name, system_instruction=system_instruction)
+                return model, now + self.cache_ttl
+        return genai.GenerativeModel(self.name, system_instruction=system_instruction), float("inf")
+
+
+class StubModelError(RuntimeError):
+    """Error injected by the stub provider; transient, like Gemini's 503 overloaded"""
+
+    code = 503
+
+
+class StubModel:
+    """
+    Offline model that answers in the formats our prompts ask for. Calls
+    block like the real SDK; streams arrive in small chunks.
+    """
+
+    def __init__(self, name: str, provider: "StubProvider"):
+        self.name = name
+        self.provider = provider
+
+    def generate_content(
+        self,
+        prompt,
+        stream: bool = False,
+        system_instruction: Optional[str] = None,
+        max_output_tokens: Optional[int] = None,
+        response_schema: Optional[dict] = None,
+        timeout: Optional[float] = None,
+    ):
+        text = self.provider.respond(self.name, prompt, system_instruction, response_schema is not None)
+        if max_output_tokens:
+            # Like Gemini, stop once the output token limit is reached
+            text = text[:max_output_tokens * CHARS_PER_TOKEN]
+        full_prompt = (system_instruction or "") + prompt
+        if not stream:
+            return _Response(text, _Usage(full_prompt, text))
+        return self._stream(full_prompt, text)
+
+    def _stream(self, prompt: str, text: str) -> Iterator[_Response]:
+        size = self.provider.chunk_size
+        last = max(0, len(text) - 1) // size * size
+        for i in range(0, len(text), size):
+            if self.provider.chunk_delay:
+                time.sleep(self.provider.chunk_delay)
+            # Like Gemini, the final chunk carries the usage totals
+            yield _Response(text[i:i + size], _Usage(prompt, text) if i == last else None)
+
+
+class StubProvider(ModelProvider):
+    """
+    Local stand-in for Gemini with configurable latency, streaming and error
+    injection. Answers follow the tutor, quiz and batch-quiz output formats,
+    as text or as JSON when a response schema is given, so the parsers run
+    on the same shapes of output as in production.
+    """
+
+    name = "stub"
+
+    BATCH_TOPIC = re.compile(r"^TOPIC \d+: (.+) \((\d+) questions\)$", re.MULTILINE)
+    QUIZ_TOPIC = re.compile(r"quiz on: (.+)")
+    QUIZ_COUNT = re.compile(r"Number of questions: (\d+)")
+    QUESTION = re.compile(r"Student Question: (.+)")
+
+    def __init__(
+        self,
+        latency: float = STUB_MODEL_LATENCY,
+        jitter: float = 0.0,
+        error_rate: float = STUB_MODEL_ERROR_RATE,
+        failing_models: tuple = (),
+        models: tuple = ("stub-flash", "stub-pro"),
+        chunk_size: int = 16,
+        chunk_delay: float = 0.0,
+        seed: int = 0,
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.failing_models = set(failing_models)
+        self.models = list(models)
+        self.chunk_size = max(1, chunk_size)
+        self.chunk_delay = chunk_delay
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)  # Keeps generated quiz questions distinct
+        self.calls = 0
+
+    def configure(self) -> bool:
+        return True
+
+    def model_names(self) -> List[str]:
+        return list(self.models)
+
+    def get_model(self, name: str) -> StubModel:
+        return StubModel(name, self)
+
+    def respond(
+        self, model_name: str, prompt: str, system_instruction: Optional[str] = None, structured: bool = False
+    ) -> str:
+        """Sleep, maybe fail, then produce output in the format the prompt asks for"""
+        with self._lock:
+            self.calls += 1
+            delay = self.latency + self._random.uniform(-self.jitter, self.jitter)
+            fail = model_name in self.failing_models or self._random.random() < self.error_rate
+        if delay > 0:
+            time.sleep(delay)
+        if fail:
+            raise StubModelError(f"Injected failure from {model_name}")
+
+        batch = self.BATCH_TOPIC.findall(prompt)
+        if batch:
+            topics = [(topic, self._quiz_items(topic, int(count))) for topic, count in batch]
+            if structured:
+                return json.dumps({"topics": [
+                    {"topic_number": n, "questions": items}
+                    for n, (_, items) in enumerate(topics, start=1)
+                ]})
+            return "\n".join(
+                f"TOPIC {n}: {topic}\n{self._quiz_text(items)}"
+                for n, (topic, items) in enumerate(topics, start=1)
+            )
+        topic = self.QUIZ_TOPIC.search(prompt)
+        if topic:
+            count = self.QUIZ_COUNT.search(prompt)
+            items = self._quiz_items(topic.group(1).strip(), int(count.group(1)) if count else 3)
+            return json.dumps({"questions": items}) if structured else self._quiz_text(items)
+        question = self.QUESTION.search(prompt)
+        answer, follow_ups = self._tutor_answer(question.group(1).strip() if question else prompt[:80])
+        if structured:
+            return json.dumps({"answer": answer, "follow_up_suggestions": follow_ups})
+        return f"ANSWER: {answer}\nFOLLOW_UP_1: {follow_ups[0]}\nFOLLOW_UP_2: {follow_ups[1]}"
+
+    def _quiz_items(self, topic: str, count: int) -> List[dict]:
+        items = []
+        for _ in range(count):
+            n = next(self._ids)
+            answer = f"Core concept {n} of {topic}"
+            items.append({
+                "prompt": f"Which idea in {topic} does stub question {n} test?",
+                "choices": [answer, f"Distractor {n}a", f"Distractor {n}b"] if n % 2 else None,
+                "answer": answer,
+                "explanation": f"A cassava farmer near Lake Victoria sees concept {n} every day.",
+            })
+        return items
+
+    @staticmethod
+    def _quiz_text(items: List[dict]) -> str:
+        lines = []
+        for i, item in enumerate(items, start=1):
+            lines += [f"Q{i}: {item['prompt']}", f"A{i}: {item['answer']}", f"E{i}: {item['explanation']}"]
+        return "\n".join(lines)
+
+    @staticmethod
+    def _tutor_answer(question: str) -> tuple:
+        answer = (
+            f"Think of a boda-boda rider in Kampala to understand \"{question}\". "
+            "The science works the same way in every matatu, cassava farm and solar panel. "
+            "Try spotting it the next time you visit the market."
+        )
+        return answer, [
+            "Where else do you see this in your village?",
+            "How would this change on Mount Kilimanjaro?",
+        ]
+
+
+class CassetteMissError(LookupError):
+    """The cassette has no recorded response for a prompt"""
+
+
+class Cassette:
+    """
+    Prompt -> response pairs in a JSON file, keyed by a hash of the system
+    instruction and prompt
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._entries = self._load()
+
+    def _load(self) -> dict:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return {entry["key"]: entry for entry in data.get("interactions", [])}
+        except (OSError, ValueError, KeyError, TypeError):
+            return {}
+
+    @staticmethod
+    def key(prompt: str, system_instruction: Optional[str] = None) -> str:
+        text = f"{system_instruction}\0{prompt}" if system_instruction else prompt
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def get(self, prompt: str, system_instruction: Optional[str] = None) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(self.key(prompt, system_instruction))
+        return entry["response"] if entry else None
+
+    def put(
+        self, prompt: str, model_name: str, response: str,
+        system_instruction: Optional[str] = None,
+    ):
+        """Store one interaction and rewrite the file"""
+        key = self.key(prompt, system_instruction)
+        with self._lock:
+            self._entries[key] = {
+                "key": key,
+                "model": model_name,
+                "system_instruction": system_instruction,
+                "prompt": prompt,
+                "response": response,
+            }
+            data = {"interactions": list(self._entries.values())}
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            # Write to a temp file first so readers never see a partial file
+            fd, tmp_path = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+class _RecordingModel:
+    """Passes calls through to a real model and saves what comes back"""
+
+    def __init__(self, name: str, model, cassette: Cassette):
+        self.name = name
+        self.model = model
+        self.cassette = cassette
+
+    def generate_content(self, prompt, stream: bool = False, **options):
+        system_instruction = options.get("system_instruction")
+        if not stream:
+            response = self.model.generate_content(prompt, **options)
+            self.cassette.put(prompt, self.name, response.text, system_instruction)
+            return response
+        return self._stream(prompt, options)
+
+    def _stream(self, prompt, options: dict) -> Iterator:
+        parts = []
+        for chunk in self.model.generate_content(prompt, stream=True, **options):
+            parts.append(chunk.text or "")
+            yield chunk
+        # Only complete streams are worth replaying
+        self.cassette.put(prompt, self.name, "".join(parts), options.get("system_instruction"))
+
+
+class _ReplayModel:
+    """Serves recorded responses; unknown prompts raise CassetteMissError"""
+
+    def __init__(self, cassette: Cassette, chunk_size: int):
+        self.cassette = cassette
+        self.chunk_size = chunk_size
+
+    def generate_content(self, prompt, stream: bool = False, system_instruction=None, **options):
+        text = self.cassette.get(prompt, system_instruction)
+        if text is None:
+            key = Cassette.key(prompt, system_instruction)
+            raise CassetteMissError(f"No recorded response for prompt {key[:12]}")
+        if not stream:
+            return _Response(text)
+        size = self.chunk_size
+        return (_Response(text[i:i + size]) for i in range(0, len(text), size))
+
+
+class CassetteProvider(ModelProvider):
+    """
+    Record/replay provider. In "record" mode every call goes to the wrapped
+    provider and its response is saved to the cassette; in "replay" mode
+    responses come from the cassette alone, so runs are deterministic and
+    need no network.
+    """
+
+    def __init__(
+        self,
+        path: Path = MODEL_CASSETTE,
+        mode: str = "replay",
+        inner: Optional[ModelProvider] = None,
+        chunk_size: int = 16,
+    ):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        self.mode = mode
+        self.cassette = Cassette(path)
+        self.inner = inner or GeminiProvider()
+        self.chunk_size = chunk_size
+        self.name = mode
+
+    def configure(self) -> bool:
+        if self.mode == "record":
+            return self.inner.configure()
+        return True
+
+    def model_names(self) -> List[str]:
+        if self.mode == "record":
+            return self.inner.model_names()
+        return ["replay"]
+
+    def get_model(self, name: str):
+        if self.mode == "record":
+            return _RecordingModel(name, self.inner.get_model(name), self.cassette)
+        return _ReplayModel(self.cassette, self.chunk_size)
+
+
+def create_model_provider() -> ModelProvider:
+    """Build the provider selected by MODEL_PROVIDER"""
+    if MODEL_PROVIDER == "stub":
+        return StubProvider()
+    if MODEL_PROVIDER in ("record", "replay"):
+        return CassetteProvider(MODEL_CASSETTE, MODEL_PROVIDER)
+    return GeminiProvider()
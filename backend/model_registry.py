@@ -0,0 +1,59 @@
+"""
+Model Registry - Remembers which Gemini model last worked
+Persisted to a local file so new instances skip probing on cold start
+"""
+import json
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+
+class ModelRegistry:
+    """Small JSON-backed record of the last known working model"""
+
+    def __init__(self, path: Path, max_age_seconds: float = 24 * 3600):
+        self.path = Path(path)
+        self.max_age_seconds = max_age_seconds
+        self._lock = threading.Lock()
+        self._entry = self._load()
+
+    def _load(self) -> dict:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+            if isinstance(entry, dict) and isinstance(entry.get("model"), str):
+                return entry
+        except (OSError, ValueError):
+            pass
+        return {}
+
+    def last_working_model(self) -> Optional[str]:
+        """Name of the last model that answered successfully, if any"""
+        with self._lock:
+            return self._entry.get("model")
+
+    def is_fresh(self) -> bool:
+        """True if the remembered model was verified recently"""
+        with self._lock:
+            if not self._entry:
+                return False
+            verified_at = self._entry.get("verified_at", 0)
+        return time.time() - verified_at < self.max_age_seconds
+
+    def record(self, model_name: str):
+        """Remember a working model and persist it"""
+        with self._lock:
+            self._entry = {"model": model_name, "verified_at": time.time()}
+            entry = dict(self._entry)
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            # Write to a temp file first so readers never see a partial file
+            fd, tmp_path = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(entry, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"⚠️ Could not persist model registry: {e}")
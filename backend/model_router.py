@@ -0,0 +1,176 @@
+"""
+Model Router - Picks the fast or the strong model tier for each request
+Simple questions go to flash models; complex ones escalate to pro unless pro is slow or we're busy
+"""
+import os
+import re
+import threading
+import time
+from collections import Counter, deque
+from typing import Callable, Iterable, Optional
+
+from backend.metrics import MODEL_ROUTES
+from backend.session_tracker import TOPIC_CLASSIFIER
+
+FAST = "fast"
+STRONG = "strong"
+
+# Route by complexity at all, and the score at which a request escalates
+MODEL_ROUTER_ENABLED = os.getenv("MODEL_ROUTER_ENABLED", "1") != "0"
+MODEL_ROUTER_ESCALATE_SCORE = int(os.getenv("MODEL_ROUTER_ESCALATE_SCORE", "3"))
+# SLO guard: complex requests stay on the fast tier while the strong tier's
+# p95 latency over the last window exceeds the SLO, or while more than
+# MAX_QUEUE requests are waiting for a scheduler slot
+MODEL_ROUTER_LATENCY_SLO = float(os.getenv("MODEL_ROUTER_LATENCY_SLO", "8"))
+MODEL_ROUTER_LATENCY_WINDOW = float(os.getenv("MODEL_ROUTER_LATENCY_WINDOW", "120"))
+MODEL_ROUTER_MAX_QUEUE = int(os.getenv("MODEL_ROUTER_MAX_QUEUE", "8"))
+
+# Fewer recent samples than this and the tier counts as within its SLO
+MIN_LATENCY_SAMPLES = 5
+# Most latency samples kept per tier
+MAX_LATENCY_SAMPLES = 200
+# Every this many words of question text adds a point (at most two)
+WORDS_PER_POINT = 30
+
+# "-pro" models are the strong tier; everything else is fast
+STRONG_MODEL = re.compile(r"(?:^|[/-])pro(?:-|$)")
+# Calculations: arithmetic between numbers, formula symbols, math verbs
+MATH_MARKERS = re.compile(
+    r"\d\s*[-+*/^=×÷]\s*\d|[=^√∫∑π]|\b(?:calculate|compute|solve|derive|derivative|"
+    r"differentiat\w*|integrat\w*|integral|prove|simplify|factori[sz]e|"
+    r"how (?:much|many|long|fast|far|high))\b",
+    re.IGNORECASE,
+)
+# Multi-step requests: explicit steps, sub-parts and chained asks
+STEP_MARKERS = re.compile(
+    r"\b(?:step[- ]by[- ]step|show (?:that|how|your working)|explain why|compare|"
+    r"justify|and then|hence)\b|\([a-e]\)|^\s*\d+[.)]\s",
+    re.IGNORECASE | re.MULTILINE,
+)
+# Topics whose questions are usually quantitative
+QUANTITATIVE_TOPICS = {"Mathematics", "Physics", "Chemistry"}
+
+
+def model_tier(name: Optional[str]) -> str:
+    """FAST or STRONG, from the model name"""
+    return STRONG if name and STRONG_MODEL.search(name) else FAST
+
+
+def complexity(text: str) -> int:
+    """
+    Rough difficulty score for a question or quiz topic: length, math
+    markers, multi-step markers, several questions in one, and a point for
+    quantitative topics. "What is gravity?" scores 0.
+    """
+    score = min(2, len(text.split()) // WORDS_PER_POINT)
+    score += min(2, len(MATH_MARKERS.findall(text)))
+    score += min(2, len(STEP_MARKERS.findall(text)))
+    if text.count("?") > 1:
+        score += 1
+    if TOPIC_CLASSIFIER.classify(text) in QUANTITATIVE_TOPICS:
+        score += 1
+    return score
+
+
+class LatencyWindow:
+    """Call latencies from the last `window` seconds, for percentiles"""
+
+    def __init__(self, window: float):
+        self.window = window
+        self._samples = deque(maxlen=MAX_LATENCY_SAMPLES)  # (monotonic time, seconds)
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float):
+        with self._lock:
+            self._samples.append((time.monotonic(), seconds))
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        """Latency at `fraction` (0-1), or None with too few recent samples"""
+        cutoff = time.monotonic() - self.window
+        with self._lock:
+            while self._samples and self._samples[0][0] < cutoff:
+                self._samples.popleft()
+            values = sorted(seconds for _, seconds in self._samples)
+        if len(values) < MIN_LATENCY_SAMPLES:
+            return None
+        return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+class ModelRouter:
+    """
+    Chooses a model tier per request. Requests scoring at least
+    `escalate_score` go to the strong tier, the rest to the fast one. The
+    SLO guard keeps complex requests on the fast tier while the strong
+    tier's recent p95 latency is over `latency_slo` or `load()` (requests
+    queued for the model) is above `max_queue`. Old latency samples expire,
+    so the strong tier is tried again once things calm down.
+    """
+
+    def __init__(
+        self,
+        load: Callable[[], int] = lambda: 0,
+        enabled: bool = MODEL_ROUTER_ENABLED,
+        escalate_score: int = MODEL_ROUTER_ESCALATE_SCORE,
+        latency_slo: float = MODEL_ROUTER_LATENCY_SLO,
+        latency_window: float = MODEL_ROUTER_LATENCY_WINDOW,
+        max_queue: int = MODEL_ROUTER_MAX_QUEUE,
+    ):
+        self.load = load
+        self.enabled = enabled
+        self.escalate_score = escalate_score
+        self.latency_slo = latency_slo
+        self.max_queue = max_queue
+        self.active = False
+        self.latency = {FAST: LatencyWindow(latency_window), STRONG: LatencyWindow(latency_window)}
+        self._routes = Counter()  # (kind, tier, reason) -> requests
+        self._lock = threading.Lock()
+
+    def configure(self, model_names: Iterable[str]):
+        """Route only when both tiers have a model"""
+        tiers = {model_tier(name) for name in model_names}
+        self.active = self.enabled and tiers == {FAST, STRONG}
+
+    def route(self, kind: str, *texts: str) -> Optional[str]:
+        """Tier for a request about `texts` (the hardest one decides); None when not routing"""
+        if not self.active:
+            return None
+        if max(complexity(text) for text in texts) < self.escalate_score:
+            tier, reason = FAST, "simple"
+        elif self._over_slo():
+            tier, reason = FAST, "slo"
+        elif self.load() > self.max_queue:
+            tier, reason = FAST, "load"
+        else:
+            tier, reason = STRONG, "complex"
+        MODEL_ROUTES.labels(kind, tier, reason).inc()
+        with self._lock:
+            self._routes[kind, tier, reason] += 1
+        return tier
+
+    def _over_slo(self) -> bool:
+        p95 = self.latency[STRONG].percentile(0.95)
+        return p95 is not None and p95 > self.latency_slo
+
+    def observe(self, model_name: Optional[str], seconds: float):
+        """Record how long a successful call to a model took"""
+        self.latency[model_tier(model_name)].observe(seconds)
+
+    def p95(self, model_name: Optional[str]) -> Optional[float]:
+        """Recent p95 latency of a model's tier, or None with too few samples"""
+        return self.latency[model_tier(model_name)].percentile(0.95)
+
+    def stats(self) -> dict:
+        """Requests per kind by tier and reason, and each tier's recent p95 latency"""
+        with self._lock:
+            routes = dict(self._routes)
+        by_kind = {}
+        for (kind, tier, reason), count in sorted(routes.items()):
+            entry = by_kind.setdefault(kind, {FAST: 0, STRONG: 0, "reasons": {}})
+            entry[tier] += count
+            entry["reasons"][reason] = entry["reasons"].get(reason, 0) + count
+        return {
+            "active": self.active,
+            "latencySlo": self.latency_slo,
+            "p95": {tier: window.percentile(0.95) for tier, window in self.latency.items()},
+            "routes": by_kind,
+        }
@@ -0,0 +1,221 @@
+"""
+Progress Store - Pluggable persistence for SessionTracker events
+The SQLite backend keeps learner progress across instance restarts
+"""
+import atexit
+import contextlib
+import os
+import sqlite3
+import tempfile
+import threading
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+# "memory" keeps progress in process only; "sqlite" persists it
+PROGRESS_STORE = os.getenv("PROGRESS_STORE", "memory").lower()
+PROGRESS_DB_PATH = Path(os.getenv(
+    "PROGRESS_DB_PATH",
+    str(Path(tempfile.gettempdir()) / "edumentor_progress.db"),
+))
+# Write-behind: flush buffered events at least this often, or sooner once
+# this many are waiting
+PROGRESS_FLUSH_INTERVAL = float(os.getenv("PROGRESS_FLUSH_INTERVAL", "1.0"))
+PROGRESS_FLUSH_BATCH = int(os.getenv("PROGRESS_FLUSH_BATCH", "500"))
+
+# Event kinds as stored and replayed
+QUESTION = "question"
+QUIZ = "quiz"
+
+
+class ProgressStore:
+    """Interface for progress persistence - the default keeps nothing"""
+
+    # True if progress outlives the in-memory tracker (and the process)
+    durable = False
+
+    def record_question(self, learner_id: str, question: str, topic: str, when: datetime):
+        """Persist one tracked question"""
+
+    def record_quiz(self, learner_id: str, topic: str, when: datetime):
+        """Persist one tracked quiz"""
+
+    def load(self, learner_id: str) -> List[Tuple[str, str, Optional[str], datetime]]:
+        """Return a learner's events as (kind, text, topic, when), oldest first.
+        For quizzes, text is the quiz topic and topic is None."""
+        return []
+
+    def flush(self):
+        """Write out anything buffered"""
+
+    def close(self):
+        """Flush and release resources"""
+
+
+class SQLiteProgressStore(ProgressStore):
+    """
+    SQLite store in WAL mode with write-behind batching. Tracking calls only
+    append to an in-memory buffer; a background thread writes the buffer in
+    one transaction per batch, so the request path never waits on disk.
+    """
+
+    durable = True
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS question_events (
+            id INTEGER PRIMARY KEY,
+            learner_id TEXT NOT NULL,
+            question TEXT NOT NULL,
+            topic TEXT,
+            ts REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_question_events_learner
+            ON question_events (learner_id, ts);
+
+        CREATE TABLE IF NOT EXISTS quiz_events (
+            id INTEGER PRIMARY KEY,
+            learner_id TEXT NOT NULL,
+            topic TEXT NOT NULL,
+            ts REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_quiz_events_learner
+            ON quiz_events (learner_id, ts);
+
+        CREATE TABLE IF NOT EXISTS activity_days (
+            learner_id TEXT NOT NULL,
+            day TEXT NOT NULL,
+            PRIMARY KEY (learner_id, day)
+        ) WITHOUT ROWID;
+    """
+
+    def __init__(
+        self,
+        path: Path = PROGRESS_DB_PATH,
+        flush_interval: float = PROGRESS_FLUSH_INTERVAL,
+        flush_batch: int = PROGRESS_FLUSH_BATCH,
+    ):
+        self.path = Path(path)
+        self.flush_interval = flush_interval
+        self.flush_batch = flush_batch
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._writer = self._connect()
+        self._writer.executescript(self.SCHEMA)
+        self._reader = self._connect()
+        self._write_lock = threading.Lock()
+        self._read_lock = threading.Lock()
+
+        self._pending: deque = deque()
+        self._wakeup = threading.Event()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="progress-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def record_question(self, learner_id: str, question: str, topic: str, when: datetime):
+        self._buffer((QUESTION, learner_id, question, topic, when.timestamp()))
+
+    def record_quiz(self, learner_id: str, topic: str, when: datetime):
+        self._buffer((QUIZ, learner_id, None, topic, when.timestamp()))
+
+    def _buffer(self, event: tuple):
+        if self._closed:
+            # Nothing would ever flush it: fail loudly instead of losing the event
+            raise sqlite3.ProgrammingError("Progress store is closed")
+        self._pending.append(event)
+        if len(self._pending) >= self.flush_batch:
+            self._wakeup.set()
+
+    def _run(self):
+        while not self._closed:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except sqlite3.Error as e:
+                print(f"⚠️ Progress store flush failed: {e}")
+
+    def flush(self):
+        """Write every buffered event in a single transaction"""
+        with self._write_lock:
+            batch = []
+            while self._pending:
+                batch.append(self._pending.popleft())
+            if not batch:
+                return
+
+            questions, quizzes, days = [], [], set()
+            for kind, learner_id, text, topic, ts in batch:
+                if kind == QUESTION:
+                    questions.append((learner_id, text, topic, ts))
+                else:
+                    quizzes.append((learner_id, topic, ts))
+                days.add((learner_id, datetime.fromtimestamp(ts).date().isoformat()))
+
+            try:
+                self._writer.execute("BEGIN")
+                self._writer.executemany(
+                    "INSERT INTO question_events (learner_id, question, topic, ts) VALUES (?, ?, ?, ?)",
+                    questions,
+                )
+                self._writer.executemany(
+                    "INSERT INTO quiz_events (learner_id, topic, ts) VALUES (?, ?, ?)",
+                    quizzes,
+                )
+                self._writer.executemany(
+                    "INSERT OR IGNORE INTO activity_days (learner_id, day) VALUES (?, ?)",
+                    sorted(days),
+                )
+                self._writer.execute("COMMIT")
+            except sqlite3.Error:
+                # Only undo a transaction BEGIN opened, and never let a failed
+                # ROLLBACK hide the error that caused it
+                if self._writer.in_transaction:
+                    with contextlib.suppress(sqlite3.Error):
+                        self._writer.execute("ROLLBACK")
+                # Put the batch back so it is retried on the next flush
+                self._pending.extendleft(reversed(batch))
+                raise
+
+    def load(self, learner_id: str) -> List[Tuple[str, str, Optional[str], datetime]]:
+        """Replayable events for a learner, including ones not yet flushed"""
+        # Only runs when a learner is first seen on this instance
+        self.flush()
+        with self._read_lock:
+            rows = self._reader.execute(
+                """
+                SELECT 'question', question, topic, ts FROM question_events WHERE learner_id = ?
+                UNION ALL
+                SELECT 'quiz', topic, NULL, ts FROM quiz_events WHERE learner_id = ?
+                ORDER BY ts
+                """,
+                (learner_id, learner_id),
+            ).fetchall()
+        return [(kind, text, topic, datetime.fromtimestamp(ts)) for kind, text, topic, ts in rows]
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._wakeup.set()
+        self._thread.join(timeout=5)
+        try:
+            self.flush()
+        except sqlite3.Error as e:
+            print(f"⚠️ Progress store flush failed: {e}")
+        self._writer.close()
+        self._reader.close()
+
+
+def create_progress_store() -> ProgressStore:
+    """Build the store selected by PROGRESS_STORE"""
+    if PROGRESS_STORE == "sqlite":
+        return SQLiteProgressStore()
+    return ProgressStore()
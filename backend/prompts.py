@@ -0,0 +1,200 @@
+"""
+Prompts - Static system instructions and small per-request prompts
+The long instruction blocks are sent once as a system instruction (and context
+cached where the model supports it); each request only carries its own details
+"""
+import math
+import os
+from typing import Optional
+
+from backend.schemas import BATCH_QUIZ_RESPONSE_SCHEMA, QUIZ_RESPONSE_SCHEMA, TUTOR_RESPONSE_SCHEMA
+
+# Ask for JSON matching a response schema instead of the line-based text
+# format. Streaming tutor answers always use the text format.
+STRUCTURED_OUTPUT = os.getenv("STRUCTURED_OUTPUT", "1") != "0"
+
+# Output token ceilings per endpoint, for the visible answer
+TUTOR_MAX_OUTPUT_TOKENS = int(os.getenv("TUTOR_MAX_OUTPUT_TOKENS", "1024"))
+QUIZ_MAX_OUTPUT_TOKENS = int(os.getenv("QUIZ_MAX_OUTPUT_TOKENS", "2048"))
+# Gemini 2.5 models spend thinking tokens out of the same max_output_tokens
+# (the SDK can't cap them separately), so every ceiling sent to the model
+# gets this much on top; without it answers are routinely cut off mid-JSON
+THINKING_TOKEN_HEADROOM = int(os.getenv("THINKING_TOKEN_HEADROOM", "3072"))
+
+# Input length limits enforced by the routes
+TUTOR_MAX_QUESTION_CHARS = int(os.getenv("TUTOR_MAX_QUESTION_CHARS", "1000"))
+QUIZ_MAX_TOPIC_CHARS = int(os.getenv("QUIZ_MAX_TOPIC_CHARS", "120"))
+
+# Rough characters per token for English prompts
+CHARS_PER_TOKEN = 4
+
+
+_TUTOR_GUIDANCE = """You are EduMentor, an AI tutor for African students.
+
+CORE REQUIREMENT: You MUST integrate African examples throughout your explanation, not just at the end.
+
+Instructions:
+1. Keep your answer brief and engaging (3-5 short sentences or bullet points)
+2. START with a relatable African context or example that connects to the concept
+3. Explain the science clearly using simple language
+4. Include 1-2 more African examples WITHIN the explanation (boda-bodas, matatus, cassava farms, Lake Victoria, solar panels in villages, M-Pesa, etc.)
+5. End with a practical application relevant to African communities
+6. Provide 2 short follow-up questions
+
+African Context Examples to Use:
+- Transportation: boda-bodas, matatus, tuk-tuks
+- Agriculture: cassava, maize farming, irrigation
+- Technology: M-Pesa, solar panels, mobile networks
+- Geography: Lake Victoria, Mount Kilimanjaro, Sahara Desert
+- Daily life: marketplaces, water wells, community gatherings
+"""
+
+TUTOR_SYSTEM_INSTRUCTION = _TUTOR_GUIDANCE + """
+Format your response as:
+ANSWER: [Start with African example, explain the science briefly using 2-3 more African examples integrated throughout, end with practical application]
+FOLLOW_UP_1: [first follow-up question]
+FOLLOW_UP_2: [second follow-up question]
+"""
+
+TUTOR_JSON_SYSTEM_INSTRUCTION = _TUTOR_GUIDANCE + """
+Respond with a JSON object with these fields:
+- "answer": start with an African example, explain the science briefly using 2-3 more African examples integrated throughout, end with a practical application
+- "follow_up_suggestions": a list of two short follow-up questions
+"""
+
+_QUIZ_GUIDANCE = """Instructions for questions:
+- Create the requested number of clear multiple-choice or short-answer questions that focus on core concepts.
+- DO NOT include region-specific or African context in the question text. Keep questions neutral.
+
+Instructions for answers/explanations:
+- For each question include the correct answer and a one-sentence explanation that includes a brief African example or application.
+"""
+
+_JSON_QUESTION_FIELDS = """- "prompt": the question text
+- "choices": the options for a multiple-choice question, or null for a short-answer question
+- "answer": the correct answer
+- "explanation": one sentence that includes a short African example
+"""
+
+QUIZ_SYSTEM_INSTRUCTION = "You create STEM quizzes.\n\n" + _QUIZ_GUIDANCE + """
+Output format exactly as:
+Q1: [Question text]
+A1: [Correct answer]
+E1: [One-sentence explanation that includes a short African example]
+
+Example:
+Q1: What is acceleration?
+A1: 3 m/s^2
+E1: Using a = (v-u)/t; Example: a boda-boda accelerating from 0 to 15 m/s in 5 s gives 3 m/s^2.
+"""
+
+QUIZ_JSON_SYSTEM_INSTRUCTION = "You create STEM quizzes.\n\n" + _QUIZ_GUIDANCE + """
+Respond with a JSON object {"questions": [...]} where each question has:
+""" + _JSON_QUESTION_FIELDS
+
+QUIZ_BATCH_SYSTEM_INSTRUCTION = "You create STEM quizzes on several topics at once.\n\n" + _QUIZ_GUIDANCE + """
+Output format exactly as, starting each topic with its TOPIC line and restarting numbering at 1:
+TOPIC 1: [Topic]
+Q1: [Question text]
+A1: [Correct answer]
+E1: [One-sentence explanation that includes a short African example]
+
+Example:
+TOPIC 1: Acceleration
+Q1: What is acceleration?
+A1: 3 m/s^2
+E1: Using a = (v-u)/t; Example: a boda-boda accelerating from 0 to 15 m/s in 5 s gives 3 m/s^2.
+"""
+
+QUIZ_BATCH_JSON_SYSTEM_INSTRUCTION = "You create STEM quizzes on several topics at once.\n\n" + _QUIZ_GUIDANCE + """
+Respond with a JSON object {"topics": [{"topic_number": n, "questions": [...]}, ...]} with one
+entry per requested topic, numbered as in the request, where each question has:
+""" + _JSON_QUESTION_FIELDS
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate used for budgeting before a call"""
+    return math.ceil(len(text) / CHARS_PER_TOKEN) if text else 0
+
+
+class Prompt:
+    """
+    A model request: shared system instruction, per-request text and limits,
+    plus the JSON response schema when structured output is requested
+    """
+
+    __slots__ = ("kind", "system", "text", "max_output_tokens", "response_schema")
+
+    def __init__(
+        self,
+        kind: str,
+        system: Optional[str],
+        text: str,
+        max_output_tokens: Optional[int] = None,
+        response_schema: Optional[dict] = None,
+    ):
+        self.kind = kind
+        self.system = system
+        self.text = text
+        self.max_output_tokens = max_output_tokens
+        self.response_schema = response_schema
+
+    def estimated_tokens(self) -> int:
+        """Estimated input tokens, system instruction included"""
+        return estimate_tokens(self.system or "") + estimate_tokens(self.text)
+
+    def options(self) -> dict:
+        """Keyword arguments for a provider model's generate_content"""
+        max_output_tokens = self.max_output_tokens
+        if max_output_tokens:
+            max_output_tokens += THINKING_TOKEN_HEADROOM
+        options = {"system_instruction": self.system, "max_output_tokens": max_output_tokens}
+        if self.response_schema is not None:
+            options["response_schema"] = self.response_schema
+        return options
+
+    def with_correction(self, error: str) -> "Prompt":
+        """The same request again, telling the model what was wrong with its last reply"""
+        note = (
+            f"\n\nYour previous reply did not match the required JSON format ({error}). "
+            "Reply again with only the JSON object."
+        )
+        return Prompt(self.kind, self.system, self.text + note, self.max_output_tokens, self.response_schema)
+
+
+def tutor_prompt(question: str, structured: bool = STRUCTURED_OUTPUT) -> Prompt:
+    text = f"Student Question: {question}"
+    if structured:
+        return Prompt("tutor", TUTOR_JSON_SYSTEM_INSTRUCTION, text, TUTOR_MAX_OUTPUT_TOKENS, TUTOR_RESPONSE_SCHEMA)
+    return Prompt("tutor", TUTOR_SYSTEM_INSTRUCTION, text, TUTOR_MAX_OUTPUT_TOKENS)
+
+
+def quiz_prompt(
+    topic: str, num_questions: int, part: Optional[tuple] = None, structured: bool = STRUCTURED_OUTPUT
+) -> Prompt:
+    lines = [f"Create a STEM quiz on: {topic}", f"Number of questions: {num_questions}"]
+    if part:
+        # Parallel chunks each cover a different slice of the topic
+        lines.append(
+            f"This is question set {part[0]} of {part[1]} on this topic. "
+            "Cover different sub-topics and difficulty than the other sets."
+        )
+    if structured:
+        return Prompt(
+            "quiz", QUIZ_JSON_SYSTEM_INSTRUCTION, "\n".join(lines), QUIZ_MAX_OUTPUT_TOKENS, QUIZ_RESPONSE_SCHEMA
+        )
+    return Prompt("quiz", QUIZ_SYSTEM_INSTRUCTION, "\n".join(lines), QUIZ_MAX_OUTPUT_TOKENS)
+
+
+def quiz_batch_prompt(group: list, max_output_tokens: int, structured: bool = STRUCTURED_OUTPUT) -> Prompt:
+    """`group` holds (index, topic, num_questions) tuples"""
+    topic_lines = "\n".join(
+        f"TOPIC {n}: {topic} ({num_questions} questions)"
+        for n, (_, topic, num_questions) in enumerate(group, start=1)
+    )
+    text = f"Create STEM quizzes on these topics:\n{topic_lines}"
+    if structured:
+        return Prompt(
+            "quiz_batch", QUIZ_BATCH_JSON_SYSTEM_INSTRUCTION, text, max_output_tokens, BATCH_QUIZ_RESPONSE_SCHEMA
+        )
+    return Prompt("quiz_batch", QUIZ_BATCH_SYSTEM_INSTRUCTION, text, max_output_tokens)
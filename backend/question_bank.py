@@ -0,0 +1,116 @@
+"""
+Question Bank - Growing per-topic pool of generated quiz questions
+Popular topics are served by sampling the pool instead of calling Gemini
+"""
+import random
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from backend.response_cache import normalize_text
+
+
+class _TopicPool:
+    """Questions collected for one normalized topic"""
+
+    __slots__ = ("questions", "prompts", "refreshed_at")
+
+    def __init__(self):
+        self.questions: List[dict] = []
+        self.prompts = set()
+        self.refreshed_at = 0.0
+
+
+class QuestionBank:
+    """Thread-safe store of de-duplicated quiz questions keyed by topic"""
+
+    def __init__(
+        self,
+        min_pool_size: int = 12,
+        max_pool_size: int = 200,
+        max_topics: int = 1000,
+        stale_after_seconds: float = 6 * 3600,
+    ):
+        self.min_pool_size = min_pool_size
+        self.max_pool_size = max_pool_size
+        self.max_topics = max_topics
+        self.stale_after_seconds = stale_after_seconds
+        self._pools: "OrderedDict[str, _TopicPool]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, topic: str, questions: List[dict]) -> int:
+        """Add newly generated questions, skipping duplicates. Returns count added."""
+        key = normalize_text(topic)
+        if not key:
+            return 0
+
+        added = 0
+        with self._lock:
+            pool = self._pools.get(key)
+            if pool is None:
+                pool = self._pools[key] = _TopicPool()
+            self._pools.move_to_end(key)
+
+            for question in questions:
+                prompt_key = normalize_text(question.get("prompt") or "")
+                if not prompt_key or prompt_key in pool.prompts:
+                    continue
+                pool.prompts.add(prompt_key)
+                pool.questions.append(dict(question))
+                added += 1
+
+            # Keep the newest questions when a pool outgrows its cap
+            overflow = len(pool.questions) - self.max_pool_size
+            if overflow > 0:
+                for dropped in pool.questions[:overflow]:
+                    pool.prompts.discard(normalize_text(dropped["prompt"]))
+                del pool.questions[:overflow]
+
+            pool.refreshed_at = time.monotonic()
+
+            while len(self._pools) > self.max_topics:
+                self._pools.popitem(last=False)
+
+        return added
+
+    def sample(self, topic: str, count: int) -> Optional[List[dict]]:
+        """Return `count` random questions, or None if the pool is too small"""
+        key = normalize_text(topic)
+        with self._lock:
+            pool = self._pools.get(key)
+            if pool is None or len(pool.questions) < count:
+                return None
+            self._pools.move_to_end(key)
+            picked = random.sample(pool.questions, count)
+        return [dict(question) for question in picked]
+
+    def needs_refresh(self, topic: str) -> bool:
+        """True when a topic's pool is too small or has not grown recently"""
+        key = normalize_text(topic)
+        with self._lock:
+            pool = self._pools.get(key)
+            if pool is None:
+                return True
+            if len(pool.questions) < self.min_pool_size:
+                return True
+            return time.monotonic() - pool.refreshed_at > self.stale_after_seconds
+
+    def size(self, topic: str) -> int:
+        """Number of questions banked for a topic"""
+        with self._lock:
+            pool = self._pools.get(normalize_text(topic))
+            return len(pool.questions) if pool else 0
+
+    def stats(self) -> Dict[str, int]:
+        """Return topic and question totals"""
+        with self._lock:
+            return {
+                "topics": len(self._pools),
+                "questions": sum(len(pool.questions) for pool in self._pools.values()),
+            }
+
+    def clear(self):
+        """Drop every banked question"""
+        with self._lock:
+            self._pools.clear()
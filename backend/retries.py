@@ -0,0 +1,46 @@
+"""
+Retries - Which model errors are worth retrying, and how long to wait first
+Transient errors (rate limits, overload, timeouts) back off exponentially with full jitter
+"""
+import random
+from typing import Optional
+
+from backend.deadlines import DeadlineExceeded
+
+# HTTP statuses Gemini returns for transient conditions: request timeout,
+# quota (429), internal error, bad gateway, overloaded (503), deadline (504)
+RETRYABLE_STATUS = {408, 429, 500, 502, 503, 504}
+
+
+def error_code(error: BaseException) -> Optional[int]:
+    """HTTP status of a Gemini (google.api_core) or stub error, if it has one"""
+    try:
+        return int(getattr(error, "code", None))
+    except (TypeError, ValueError):
+        return None
+
+
+def is_retryable(error: BaseException) -> bool:
+    """True for errors a later attempt may not hit; bad requests and auth errors aren't"""
+    if isinstance(error, DeadlineExceeded):
+        return False
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+    return error_code(error) in RETRYABLE_STATUS
+
+
+def retry_reason(error: BaseException) -> str:
+    """Short metric label for a retried error"""
+    code = error_code(error)
+    if code is not None:
+        return str(code)
+    return "timeout" if isinstance(error, TimeoutError) else type(error).__name__
+
+
+def backoff_delay(attempt: int, base: float, cap: float, rng: random.Random = random) -> float:
+    """
+    Seconds to wait before retry number `attempt` (from 0): uniform over
+    [0, min(cap, base * 2**attempt)], so clients that failed together
+    don't all come back at the same moment
+    """
+    return rng.uniform(0, min(cap, base * 2 ** attempt))
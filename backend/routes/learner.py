@@ -0,0 +1,21 @@
+import re
+
+from fastapi import Depends, Header, HTTPException
+
+from backend.session_tracker import ANONYMOUS_LEARNER, SessionTracker, trackers
+
+_LEARNER_ID = re.compile(r"^[A-Za-z0-9_.:-]{1,64}$")
+
+
+def learner_id(x_learner_id: str | None = Header(default=None)) -> str:
+    """Identify the learner from the X-Learner-Id request header"""
+    if not x_learner_id:
+        return ANONYMOUS_LEARNER
+    if not _LEARNER_ID.match(x_learner_id):
+        raise HTTPException(status_code=400, detail="Invalid X-Learner-Id header.")
+    return x_learner_id
+
+
+def learner_tracker(learner: str = Depends(learner_id)) -> SessionTracker:
+    """Return the SessionTracker for the learner making the request"""
+    return trackers.get(learner)
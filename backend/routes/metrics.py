@@ -0,0 +1,109 @@
+from fastapi import APIRouter
+from fastapi.responses import Response
+
+from backend.ai_service import ai_service
+from backend.cache_warmer import cache_warmer
+from backend.circuit_breaker import CLOSED
+from backend.metrics import CONTENT_TYPE, registry
+from backend.session_tracker import trackers
+
+router = APIRouter(tags=["metrics"])
+
+
+def _tracker_sizes() -> dict:
+    """Learners in memory and what their trackers hold, summed"""
+    learners = questions = topics = days = 0
+    for _, tracker in trackers:
+        sizes = tracker.sizes()
+        learners += 1
+        questions += sizes["questions"]
+        topics += sizes["topics"]
+        days += sizes["activeDays"]
+    return {
+        ("learners",): learners,
+        ("questions",): questions,
+        ("topics",): topics,
+        ("active_days",): days,
+    }
+
+
+def _tutor_cache() -> dict:
+    stats = ai_service.tutor_cache.stats()
+    return {("hit",): stats["hits"], ("miss",): stats["misses"]}
+
+
+def _scheduler_load() -> dict:
+    stats = ai_service.scheduler.stats()
+    return {("active",): stats["active"], ("queued",): stats["queued"]}
+
+
+def _scheduler_admissions() -> dict:
+    stats = ai_service.scheduler.stats()
+    return {
+        ("admitted",): stats["admitted"],
+        ("shed",): stats["shed"],
+        ("timed_out",): stats["timedOut"],
+    }
+
+
+def _breakers_open() -> dict:
+    return {
+        (name or "default",): int(snapshot["state"] != CLOSED)
+        for name, snapshot in ai_service.model_status()["breakers"].items()
+    }
+
+
+def _tier_latency() -> dict:
+    p95 = ai_service.router.stats()["p95"]
+    return {(tier,): seconds for tier, seconds in p95.items() if seconds is not None}
+
+
+# Read from the components that already keep these numbers, at scrape time
+registry.gauge(
+    "edumentor_tracker_entries", "Learners in memory and the entries their trackers hold",
+    ("kind",), _tracker_sizes,
+)
+registry.gauge(
+    "edumentor_tutor_cache_entries", "Answers in the tutor cache", (),
+    lambda: {(): ai_service.tutor_cache.stats()["size"]},
+)
+registry.gauge(
+    "edumentor_tutor_cache_lookups_total", "Tutor cache lookups by result",
+    ("result",), _tutor_cache, kind="counter",
+)
+registry.gauge(
+    "edumentor_question_bank_questions", "Questions banked across all topics", (),
+    lambda: {(): ai_service.question_bank.stats()["questions"]},
+)
+registry.gauge(
+    "edumentor_llm_scheduler_requests", "Model calls running or waiting for a slot",
+    ("state",), _scheduler_load,
+)
+registry.gauge(
+    "edumentor_llm_admissions_total", "Scheduler admission decisions",
+    ("outcome",), _scheduler_admissions, kind="counter",
+)
+registry.gauge(
+    "edumentor_model_breaker_open", "1 while a model's circuit breaker is not closed",
+    ("model",), _breakers_open,
+)
+registry.gauge(
+    "edumentor_model_tier_latency_p95_seconds",
+    "Recent p95 model call latency per tier, as seen by the routing SLO guard",
+    ("tier",), _tier_latency,
+)
+
+registry.gauge(
+    "edumentor_cache_warmup_items", "Items pre-generated by the startup cache warm-up",
+    ("kind",), lambda: {("tutor",): cache_warmer.warmed["tutor"], ("quiz",): cache_warmer.warmed["quiz"]},
+)
+registry.gauge(
+    "edumentor_cache_warmup_calls", "Model calls spent by the cache warm-up", (),
+    lambda: {(): cache_warmer.calls},
+)
+
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics() -> Response:
+    """Prometheus scrape endpoint"""
+    return Response(registry.render(), media_type=CONTENT_TYPE)
@@ -1,12 +1,28 @@
-from fastapi import APIRouter
-from backend.session_tracker import tracker
+from fastapi import APIRouter, Depends, Request, Response
+from backend.http_cache import PRIVATE_REVALIDATE, etag_matches
+from backend.routes.learner import learner_tracker
+from backend.session_tracker import SessionTracker
 
 router = APIRouter(prefix="/progress", tags=["progress"])
 
 
 @router.get("/summary")
-async def progress_summary() -> dict:
+async def progress_summary(
+    request: Request,
+    response: Response,
+    tracker: SessionTracker = Depends(learner_tracker),
+) -> dict:
     """Return real-time learner analytics based on actual usage."""
+    # Read before the summary: an update landing in between leaves an older tag,
+    # which just costs the client a full response next time
+    etag = tracker.etag()
+    # Per learner: browsers revalidate with If-None-Match, the CDN never stores it
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = PRIVATE_REVALIDATE
+    response.headers["Vary"] = "X-Learner-Id"
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=dict(response.headers))
+
     summary = tracker.get_summary()
     
     # Provide helpful messages for empty states
@@ -1,27 +1,47 @@
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
-from backend.ai_service import ai_service
-from backend.session_tracker import tracker
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Response
+from pydantic import BaseModel, Field
+from backend.ai_service import MAX_QUIZ_QUESTIONS, QUIZ_FALLBACK, ai_service
+from backend.http_cache import NO_STORE, shared_cache_control
+from backend.prompts import QUIZ_MAX_TOPIC_CHARS
+from backend.routes.learner import learner_tracker
+from backend.schemas import QuizQuestion
+from backend.session_tracker import SessionTracker
 
 router = APIRouter(prefix="/quiz", tags=["quiz"])
 
 
 class QuizRequest(BaseModel):
-    topic: str
+    topic: str = Field(max_length=QUIZ_MAX_TOPIC_CHARS)
+    num_questions: int = Field(default=3, ge=1, le=MAX_QUIZ_QUESTIONS)
+
+
+class QuizResponse(BaseModel):
+    questions: list[QuizQuestion]
 
 
-class QuizQuestion(BaseModel):
-    prompt: str
-    choices: list[str] | None = None
-    answer: str | None = None
+class BatchQuizTopic(BaseModel):
+    topic: str = Field(max_length=QUIZ_MAX_TOPIC_CHARS)
+    num_questions: int = Field(default=3, ge=1, le=10)
 
 
-class QuizResponse(BaseModel):
+class BatchQuizRequest(BaseModel):
+    topics: list[BatchQuizTopic] = Field(max_length=10)
+
+
+class TopicQuiz(BaseModel):
+    topic: str
     questions: list[QuizQuestion]
 
 
+class BatchQuizResponse(BaseModel):
+    quizzes: list[TopicQuiz]
+
+
 @router.post("/generate", response_model=QuizResponse)
-async def generate_quiz(payload: QuizRequest) -> QuizResponse:
+async def generate_quiz(
+    payload: QuizRequest,
+    tracker: SessionTracker = Depends(learner_tracker),
+) -> QuizResponse:
     """AI-powered quiz generation using Gemini API with African context"""
     topic = payload.topic.strip()
     if not topic:
@@ -31,7 +51,51 @@ async def generate_quiz(payload: QuizRequest) -> QuizResponse:
     tracker.track_quiz(topic)
     
     # Use AI service to generate intelligent quiz
-    questions = await ai_service.generate_quiz(topic, num_questions=3)
+    questions = await ai_service.generate_quiz(topic, num_questions=payload.num_questions)
     
     return QuizResponse(questions=questions)
 
+
+@router.get("/topics/{topic}", response_model=QuizResponse)
+async def get_quiz(
+    response: Response,
+    topic: str = Path(max_length=QUIZ_MAX_TOPIC_CHARS),
+    num_questions: int = Query(default=3, ge=1, le=MAX_QUIZ_QUESTIONS),
+) -> QuizResponse:
+    """
+    Cacheable quiz for a topic. The same for every learner, so the CDN can
+    serve repeats; it doesn't record progress (use POST /generate for that).
+    """
+    topic = topic.strip()
+    if not topic:
+        raise HTTPException(status_code=400, detail="Topic cannot be empty.")
+
+    questions, source = await ai_service.generate_quiz_with_source(topic, num_questions=num_questions)
+
+    # Placeholder and short quizzes mustn't outlive the outage that caused them
+    if source == QUIZ_FALLBACK:
+        response.headers["Cache-Control"] = NO_STORE
+    else:
+        response.headers["Cache-Control"] = shared_cache_control()
+    return QuizResponse(questions=questions)
+
+
+@router.post("/generate-batch", response_model=BatchQuizResponse)
+async def generate_quiz_batch(
+    payload: BatchQuizRequest,
+    tracker: SessionTracker = Depends(learner_tracker),
+) -> BatchQuizResponse:
+    """Generate quizzes for several topics, sharing model calls between them"""
+    requests = [(item.topic.strip(), item.num_questions) for item in payload.topics]
+    if any(not topic for topic, _ in requests):
+        raise HTTPException(status_code=400, detail="Topic cannot be empty.")
+
+    for topic, _ in requests:
+        tracker.track_quiz(topic)
+
+    results = await ai_service.generate_quiz_batch(requests)
+
+    return BatchQuizResponse(quizzes=[
+        TopicQuiz(topic=topic, questions=questions)
+        for (topic, _), questions in zip(requests, results)
+    ])
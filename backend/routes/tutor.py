@@ -1,22 +1,25 @@
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
 from backend.ai_service import ai_service
-from backend.session_tracker import tracker
+from backend.prompts import TUTOR_MAX_QUESTION_CHARS
+from backend.routes.learner import learner_tracker
+from backend.schemas import TutorResponse
+from backend.session_tracker import SessionTracker
+from backend.streaming import sse_event
 
 router = APIRouter(prefix="/tutor", tags=["tutor"])
 
 
 class TutorRequest(BaseModel):
-    question: str
-
-
-class TutorResponse(BaseModel):
-    answer: str
-    follow_up_suggestions: list[str] = []
+    question: str = Field(max_length=TUTOR_MAX_QUESTION_CHARS)
 
 
 @router.post("/query", response_model=TutorResponse)
-async def ask_tutor(payload: TutorRequest) -> TutorResponse:
+async def ask_tutor(
+    payload: TutorRequest,
+    tracker: SessionTracker = Depends(learner_tracker),
+) -> TutorResponse:
     """AI-powered STEM tutoring with African context using Gemini API"""
     question = payload.question.strip()
     if not question:
@@ -32,3 +35,33 @@ async def ask_tutor(payload: TutorRequest) -> TutorResponse:
         answer=result["answer"],
         follow_up_suggestions=result["follow_up_suggestions"]
     )
+
+
+@router.post("/stream")
+async def stream_tutor(
+    payload: TutorRequest,
+    tracker: SessionTracker = Depends(learner_tracker),
+) -> StreamingResponse:
+    """Stream a tutoring answer as Server-Sent Events.
+
+    Emits `token` events with answer text as Gemini produces it, then one
+    `done` event carrying the full answer and follow-up suggestions.
+    """
+    question = payload.question.strip()
+    if not question:
+        raise HTTPException(status_code=400, detail="Question cannot be empty.")
+
+    tracker.track_question(question)
+
+    async def events():
+        async for event, data in ai_service.stream_tutor_response(question):
+            if event == "token":
+                yield sse_event("token", {"text": data})
+            else:
+                yield sse_event(event, data)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
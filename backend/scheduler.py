@@ -0,0 +1,230 @@
+"""
+LLM Scheduler - Admission control for outbound Gemini calls
+Rate limits to the Gemini quota, queues by priority and sheds load when full
+"""
+import asyncio
+import heapq
+import itertools
+import time
+from contextlib import asynccontextmanager
+from typing import List, Optional
+
+# Priority classes - lower numbers are served first
+PRIORITY_INTERACTIVE = 0  # Tutor questions a student is waiting on
+PRIORITY_QUIZ = 1         # Quiz generation
+PRIORITY_BACKGROUND = 2   # Question bank top-ups and cache warm-up
+
+PRIORITY_NAMES = {
+    PRIORITY_INTERACTIVE: "interactive",
+    PRIORITY_QUIZ: "quiz",
+    PRIORITY_BACKGROUND: "background",
+}
+
+
+class SchedulerOverloaded(Exception):
+    """The request was not admitted; callers should degrade gracefully"""
+
+
+class QueueFullError(SchedulerOverloaded):
+    """The wait queue is full"""
+
+
+class QueueTimeoutError(SchedulerOverloaded):
+    """The request waited longer than its deadline"""
+
+
+class TokenBucket:
+    """Classic token bucket refilled continuously at `rate` tokens per second"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def try_take(self) -> bool:
+        """Take one token if available"""
+        self._refill()
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+    def time_until_token(self) -> float:
+        """Seconds until the next token is available"""
+        self._refill()
+        if self.tokens >= 1 or self.rate <= 0:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class _Waiter:
+    __slots__ = ("priority", "seq", "future", "deadline")
+
+    def __init__(self, priority: int, seq: int, future: asyncio.Future, deadline: float):
+        self.priority = priority
+        self.seq = seq
+        self.future = future
+        self.deadline = deadline
+
+    def __lt__(self, other: "_Waiter") -> bool:
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+class LLMScheduler:
+    """
+    Admits Gemini calls subject to a concurrency cap and a token-bucket rate
+    limit. Requests that can't start immediately wait in a bounded priority
+    queue until a slot and a token are free, or until their deadline passes.
+    When the queue is full, the lowest-priority waiter is shed.
+
+    Meant to be used from the event loop thread only.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int = 8,
+        rate_per_minute: float = 600,
+        burst: int = 20,
+        max_queue: int = 100,
+    ):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.bucket = TokenBucket(rate_per_minute / 60.0, burst)
+        self.active = 0
+        self._waiters: List[_Waiter] = []
+        self._seq = itertools.count()
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._timer_loop: Optional[asyncio.AbstractEventLoop] = None
+        self.admitted = 0
+        self.shed = 0
+        self.timed_out = 0
+
+    @asynccontextmanager
+    async def slot(self, priority: int = PRIORITY_INTERACTIVE, timeout: Optional[float] = None):
+        """Hold an admission slot for the duration of the block"""
+        await self.acquire(priority, timeout)
+        try:
+            yield
+        finally:
+            self.release()
+
+    async def acquire(self, priority: int = PRIORITY_INTERACTIVE, timeout: Optional[float] = None):
+        """Wait for admission, raising SchedulerOverloaded if it can't be had"""
+        if not self._waiters and self.active < self.max_concurrent and self.bucket.try_take():
+            self.active += 1
+            self.admitted += 1
+            return
+
+        if self.queue_depth() >= self.max_queue and not self._shed_lower_than(priority):
+            self.shed += 1
+            raise QueueFullError("LLM queue is full")
+
+        loop = asyncio.get_running_loop()
+        deadline = time.monotonic() + timeout if timeout is not None else float("inf")
+        waiter = _Waiter(priority, next(self._seq), loop.create_future(), deadline)
+        heapq.heappush(self._waiters, waiter)
+        self._dispatch()
+
+        try:
+            await asyncio.wait_for(waiter.future, timeout)
+        except asyncio.TimeoutError:
+            self._abandon(waiter)
+            self.timed_out += 1
+            raise QueueTimeoutError(f"Waited more than {timeout}s for an LLM slot")
+        except BaseException:
+            self._abandon(waiter)
+            raise
+
+    def try_acquire(self) -> bool:
+        """Take a slot only if one is free right now, without queueing (for optional calls)"""
+        if self._waiters or self.active >= self.max_concurrent or not self.bucket.try_take():
+            return False
+        self.active += 1
+        self.admitted += 1
+        return True
+
+    def hold(self):
+        """Take a slot past the limit for work that already uses capacity; pair with release()"""
+        self.active += 1
+
+    def release(self):
+        """Return a slot and admit the next waiter"""
+        self.active -= 1
+        self._dispatch()
+
+    def _abandon(self, waiter: _Waiter):
+        """Clean up after a waiter that stopped waiting"""
+        future = waiter.future
+        if future.done() and not future.cancelled() and future.exception() is None:
+            # Admitted just as it gave up - hand the slot back
+            self.release()
+        elif not future.done():
+            future.cancel()
+
+    def _shed_lower_than(self, priority: int) -> bool:
+        """Reject the lowest-priority, newest waiter if it ranks below `priority`"""
+        live = [w for w in self._waiters if not w.future.done()]
+        if not live:
+            return True
+        victim = max(live)
+        if victim.priority <= priority:
+            return False
+        victim.future.set_exception(QueueFullError("Shed for a higher-priority request"))
+        self._waiters.remove(victim)
+        heapq.heapify(self._waiters)
+        self.shed += 1
+        return True
+
+    def _dispatch(self):
+        """Admit waiters while there is both a free slot and a rate token"""
+        now = time.monotonic()
+        while self._waiters and self.active < self.max_concurrent:
+            waiter = self._waiters[0]
+            if waiter.future.done():
+                heapq.heappop(self._waiters)
+                continue
+            if waiter.deadline <= now:
+                heapq.heappop(self._waiters)
+                continue  # Its own wait_for raises the timeout
+            if not self.bucket.try_take():
+                self._schedule_retry()
+                return
+            heapq.heappop(self._waiters)
+            if waiter.future.get_loop().is_closed():
+                continue  # Left behind by an event loop that has shut down
+            self.active += 1
+            self.admitted += 1
+            waiter.future.set_result(True)
+
+    def _schedule_retry(self):
+        """Run dispatch again once the bucket has refilled"""
+        loop = asyncio.get_running_loop()
+        if self._timer is not None and self._timer_loop is loop:
+            return
+
+        def fire():
+            self._timer = None
+            self._dispatch()
+
+        self._timer = loop.call_later(self.bucket.time_until_token(), fire)
+        self._timer_loop = loop
+
+    def queue_depth(self) -> int:
+        """Number of requests waiting for admission"""
+        return sum(1 for w in self._waiters if not w.future.done())
+
+    def stats(self) -> dict:
+        """Admission counters and current load"""
+        return {
+            "active": self.active,
+            "queued": self.queue_depth(),
+            "admitted": self.admitted,
+            "shed": self.shed,
+            "timedOut": self.timed_out,
+        }
@@ -0,0 +1,122 @@
+"""
+Schemas - Pydantic models for API responses and structured model output
+Gemini is asked for JSON matching these shapes, validated straight into the models
+"""
+import re
+from typing import Optional, Tuple, Type, TypeVar
+
+from pydantic import BaseModel, Field, ValidationError
+
+
+class TutorResponse(BaseModel):
+    answer: str = Field(min_length=1)
+    follow_up_suggestions: list[str] = []
+
+
+class QuizQuestion(BaseModel):
+    prompt: str = Field(min_length=1)
+    choices: list[str] | None = None
+    answer: str | None = None
+    explanation: str | None = None
+
+
+class QuizOutput(BaseModel):
+    """A quiz as the model returns it"""
+
+    questions: list[QuizQuestion]
+
+
+class TopicQuestions(BaseModel):
+    topic_number: int
+    questions: list[QuizQuestion]
+
+
+class BatchQuizOutput(BaseModel):
+    """Several topics' quizzes, numbered as in the prompt"""
+
+    topics: list[TopicQuestions]
+
+
+# The same shapes in the OpenAPI subset Gemini's response_schema accepts
+_QUESTION_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "prompt": {"type": "string"},
+        "choices": {"type": "array", "items": {"type": "string"}, "nullable": True},
+        "answer": {"type": "string"},
+        "explanation": {"type": "string"},
+    },
+    "required": ["prompt", "answer", "explanation"],
+}
+
+TUTOR_RESPONSE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "answer": {"type": "string"},
+        "follow_up_suggestions": {"type": "array", "items": {"type": "string"}},
+    },
+    "required": ["answer", "follow_up_suggestions"],
+}
+
+QUIZ_RESPONSE_SCHEMA = {
+    "type": "object",
+    "properties": {"questions": {"type": "array", "items": _QUESTION_SCHEMA}},
+    "required": ["questions"],
+}
+
+BATCH_QUIZ_RESPONSE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "topics": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "topic_number": {"type": "integer"},
+                    "questions": {"type": "array", "items": _QUESTION_SCHEMA},
+                },
+                "required": ["topic_number", "questions"],
+            },
+        },
+    },
+    "required": ["topics"],
+}
+
+
+_FENCE = re.compile(r"^\s*```(?:json)?\s*|\s*```\s*$", re.IGNORECASE)
+_TRAILING_COMMA = re.compile(r",\s*([}\]])")
+
+Model = TypeVar("Model", bound=BaseModel)
+
+
+class UnparseableOutput(ValueError):
+    """Model output that neither validates nor salvages into a usable result"""
+
+
+def repair_json(text: str) -> str:
+    """Undo the usual ways JSON output goes wrong: code fences, chatter, trailing commas"""
+    text = _FENCE.sub("", text.strip())
+    start, end = text.find("{"), text.rfind("}")
+    if start != -1 and end > start:
+        text = text[start:end + 1]
+    return _TRAILING_COMMA.sub(r"\1", text)
+
+
+def parse_structured(text: str, model: Type[Model]) -> Tuple[Optional[Model], str]:
+    """
+    Validate JSON output into `model`. Returns (instance, "ok" or "repaired")
+    on success and (None, short error) when even the repaired text fails.
+    """
+    try:
+        return model.model_validate_json(text), "ok"
+    except ValidationError as e:
+        error = e
+    repaired = repair_json(text)
+    if repaired != text:
+        try:
+            return model.model_validate_json(repaired), "repaired"
+        except ValidationError as e:
+            error = e
+    first = error.errors()[0]
+    location = ".".join(str(part) for part in first["loc"]) or "output"
+    return None, f"{location}: {first['msg']}"
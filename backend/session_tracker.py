@@ -2,158 +2,339 @@
 Session Tracker - Tracks user learning sessions and progress
 This provides real-time analytics based on actual usage
 """
-from datetime import datetime, timedelta
-from typing import Dict, List
-from collections import defaultdict, Counter
+from bisect import bisect_left, insort
+from datetime import date, datetime
+from typing import Dict, List, Optional
+from collections import defaultdict, Counter, OrderedDict
+import os
 import re
+import threading
+import time
+import zlib
+
+from backend.event_log import QuestionLog
+from backend.progress_store import QUESTION, ProgressStore, create_progress_store
+from backend.topic_classifier import TopicClassifier
+
+# Learners idle for longer than this are dropped from memory (a durable
+# store reloads them on their next request)
+LEARNER_IDLE_SECONDS = float(os.getenv("LEARNER_IDLE_SECONDS", "3600"))
+# Without a durable store, dropping a learner loses their progress, so
+# only learners gone for far longer are dropped
+MEMORY_LEARNER_IDLE_SECONDS = float(os.getenv("MEMORY_LEARNER_IDLE_SECONDS", "604800"))
+# Most seconds between idle sweeps of a shard
+EVICTION_SWEEP_INTERVAL = 60.0
+# Number of independently locked shards in the learner map
+TRACKER_SHARDS = max(1, int(os.getenv("TRACKER_SHARDS", "64")))
+# Learner id used when a request doesn't identify the learner
+ANONYMOUS_LEARNER = "anonymous"
+
+# Recent questions kept per learner; older ones only live on in the counters
+QUESTION_HISTORY_SIZE = int(os.getenv("QUESTION_HISTORY_SIZE", "200"))
+
+# Interactions needed before a topic counts as mastered
+MASTERY_THRESHOLD = 3
+
+# Common STEM topics for categorization - earlier topics win ties
+TOPIC_KEYWORDS = {
+    "Photosynthesis": ["photosynthesis", "chlorophyll", "plant", "farming", "crop"],
+    "Newton's Laws": ["newton", "force", "motion", "inertia", "momentum"],
+    "Gravity": ["gravity", "weight", "mass", "fall"],
+    "Electricity": ["electric", "current", "voltage", "solar", "power", "energy"],
+    "Cell Biology": ["cell", "nucleus", "mitochondria", "membrane", "biology"],
+    "Water Cycle": ["water cycle", "evaporation", "condensation", "rain", "precipitation"],
+    "Chemistry": ["atom", "molecule", "element", "chemical", "reaction"],
+    "Energy": ["energy", "kinetic", "potential", "thermal"],
+    "Evolution": ["evolution", "natural selection", "species", "darwin"],
+    "Mathematics": ["equation", "algebra", "geometry", "calculus", "function"],
+    "Physics": ["physics", "velocity", "acceleration", "trajectory"],
+    "Astronomy": ["planet", "star", "solar system", "space", "universe"],
+}
+
+# Built once; matching cost doesn't grow with the keyword vocabulary
+TOPIC_CLASSIFIER = TopicClassifier(TOPIC_KEYWORDS)
+
 
 class SessionTracker:
     """Track user learning sessions and generate real-time analytics"""
     
-    def __init__(self):
-        self.sessions = []  # List of session data
-        self.questions_asked = []  # All questions asked
-        self.topics_covered = Counter()  # Topic frequency counter
-        self.quiz_topics = Counter()  # Quiz topics
-        self.session_dates = []  # Dates of activity
+    def __init__(self, learner_id: str = None, store: ProgressStore = None):
+        self.learner_id = learner_id
+        self.store = store or ProgressStore()
+        self.lock = threading.RLock()  # Guards updates from concurrent requests
+        # Bumped on every change (never reset), so it identifies a summary;
+        # the epoch keeps versions from different tracker objects apart
+        self.version = 0
+        self._epoch = os.urandom(4).hex()
+        self._reset_state()
         
         # Common STEM topics for categorization
-        self.topic_keywords = {
-            "Photosynthesis": ["photosynthesis", "chlorophyll", "plant", "farming", "crop"],
-            "Newton's Laws": ["newton", "force", "motion", "inertia", "momentum"],
-            "Gravity": ["gravity", "weight", "mass", "fall"],
-            "Electricity": ["electric", "current", "voltage", "solar", "power", "energy"],
-            "Cell Biology": ["cell", "nucleus", "mitochondria", "membrane", "biology"],
-            "Water Cycle": ["water cycle", "evaporation", "condensation", "rain", "precipitation"],
-            "Chemistry": ["atom", "molecule", "element", "chemical", "reaction"],
-            "Energy": ["energy", "kinetic", "potential", "thermal"],
-            "Evolution": ["evolution", "natural selection", "species", "darwin"],
-            "Mathematics": ["equation", "algebra", "geometry", "calculus", "function"],
-            "Physics": ["physics", "velocity", "acceleration", "trajectory"],
-            "Astronomy": ["planet", "star", "solar system", "space", "universe"],
-        }
+        self.topic_keywords = TOPIC_KEYWORDS
+        self._classifier = TOPIC_CLASSIFIER
     
+    def _reset_state(self):
+        self.sessions = []  # List of session data
+        self.question_log = QuestionLog(QUESTION_HISTORY_SIZE)  # Recent questions
+        self.topics_covered = Counter()  # Topic frequency counter
+        self.quiz_topics = Counter()  # Quiz topics
+
+        # Summary inputs maintained as events arrive, so get_summary is O(1)
+        self._question_count = 0
+        self._quiz_count = 0
+        self._active_days = set()  # Date ordinals with any activity
+        self._latest_day = None
+        self._streak = 0
+        self._mastered = []  # Sorted topics with MASTERY_THRESHOLD+ interactions
+        self._review = []    # Sorted topics with fewer interactions
+
+    def _count_topic(self, topic: str, weight: int):
+        """Bump a topic's interaction count and move it between lists"""
+        before = self.topics_covered[topic]
+        after = before + weight
+        self.topics_covered[topic] = after
+        if before == 0 and after < MASTERY_THRESHOLD:
+            insort(self._review, topic)
+        elif before < MASTERY_THRESHOLD <= after:
+            if before:
+                del self._review[bisect_left(self._review, topic)]
+            insort(self._mastered, topic)
+
+    def _count_day(self, day: date):
+        """Record an active day and extend the streak if it connects"""
+        day = day.toordinal()
+        if day in self._active_days:
+            return
+        self._active_days.add(day)
+
+        if self._latest_day is None or day > self._latest_day:
+            connected = self._latest_day is not None and day - self._latest_day == 1
+            self._streak = self._streak + 1 if connected else 1
+            self._latest_day = day
+        elif day == self._latest_day - self._streak:
+            # Fills the day just before the current run (out-of-order replay)
+            while self._latest_day - self._streak in self._active_days:
+                self._streak += 1
+
+    @property
+    def session_dates(self) -> List[date]:
+        """Dates with any activity, oldest first"""
+        return [date.fromordinal(day) for day in sorted(self._active_days)]
+
+    @property
+    def questions_asked(self) -> List[dict]:
+        """Recent questions (up to QUESTION_HISTORY_SIZE), oldest first"""
+        return [
+            {
+                "question": question,
+                "timestamp": datetime.fromtimestamp(timestamp),
+                "detected_topic": topic,
+            }
+            for question, topic, timestamp in self.question_log
+        ]
+
     def track_question(self, question: str, topic: str = None):
         """Track a question asked by the user"""
-        self.questions_asked.append({
-            "question": question,
-            "timestamp": datetime.now(),
-            "detected_topic": topic or self._detect_topic(question)
-        })
+        now = datetime.now()
+        with self.lock:
+            detected_topic = self._track_question(question, topic, now)
+        self.store.record_question(self.learner_id, question, detected_topic, now)
+
+    def _track_question(self, question: str, topic: str, when: datetime) -> str:
+        detected_topic = topic or self._detect_topic(question)
+        self.question_log.append(question, detected_topic, when)
+        self.version += 1
         
+        self._question_count += 1
+
         # Update topic counter
-        detected_topic = topic or self._detect_topic(question)
         if detected_topic:
-            self.topics_covered[detected_topic] += 1
+            self._count_topic(detected_topic, 1)
         
         # Track session date
-        today = datetime.now().date()
-        if today not in self.session_dates:
-            self.session_dates.append(today)
+        self._count_day(when.date())
+        return detected_topic
     
     def track_quiz(self, topic: str):
         """Track a quiz generation"""
+        now = datetime.now()
+        with self.lock:
+            self._track_quiz(topic, now)
+        self.store.record_quiz(self.learner_id, topic, now)
+
+    def _track_quiz(self, topic: str, when: datetime):
         self.quiz_topics[topic.title()] += 1
+        self._quiz_count += 1
+        self.version += 1
         # Quizzes count as mastery practice
-        self.topics_covered[topic.title()] += 2  # Weight quizzes higher
+        self._count_topic(topic.title(), 2)  # Weight quizzes higher
         
-        today = datetime.now().date()
-        if today not in self.session_dates:
-            self.session_dates.append(today)
+        self._count_day(when.date())
+
+    def replay(self, events: list):
+        """Rebuild state from stored events without recording them again"""
+        with self.lock:
+            for kind, text, topic, when in events:
+                if kind == QUESTION:
+                    self._track_question(text, topic, when)
+                else:
+                    self._track_quiz(text, when)
     
     def _detect_topic(self, question: str) -> str:
         """Detect the topic from a question using keyword matching"""
-        question_lower = question.lower()
-        
-        for topic, keywords in self.topic_keywords.items():
-            for keyword in keywords:
-                if keyword in question_lower:
-                    return topic
-        
-        return "General STEM"
+        return self._classifier.classify(question)
     
     def get_streak_days(self) -> int:
-        """Calculate consecutive days of learning"""
-        if not self.session_dates:
-            return 0
-        
-        # Sort dates
-        sorted_dates = sorted(self.session_dates, reverse=True)
-        
-        # Count consecutive days from most recent
-        streak = 1
-        current_date = sorted_dates[0]
-        
-        for i in range(1, len(sorted_dates)):
-            expected_date = current_date - timedelta(days=1)
-            if sorted_dates[i] == expected_date:
-                streak += 1
-                current_date = sorted_dates[i]
-            else:
-                break
-        
-        return streak
+        """Consecutive days of learning, counted back from the latest active day"""
+        return self._streak
     
     def get_engagement_score(self) -> int:
         """Calculate engagement score based on activity"""
-        if not self.questions_asked and not self.quiz_topics:
+        if not self._question_count and not self._quiz_count:
             return 0
         
-        # Factors for engagement
-        questions_count = len(self.questions_asked)
-        quiz_count = sum(self.quiz_topics.values())
-        topic_diversity = len(self.topics_covered)
-        streak = self.get_streak_days()
-        
         # Calculate score (0-100)
         score = min(100, (
-            min(questions_count * 5, 40) +  # Up to 40 points for questions
-            min(quiz_count * 10, 30) +      # Up to 30 points for quizzes
-            min(topic_diversity * 5, 20) +   # Up to 20 points for diversity
-            min(streak * 2, 10)              # Up to 10 points for streak
+            min(self._question_count * 5, 40) +    # Up to 40 points for questions
+            min(self._quiz_count * 10, 30) +       # Up to 30 points for quizzes
+            min(len(self.topics_covered) * 5, 20) + # Up to 20 points for diversity
+            min(self._streak * 2, 10)              # Up to 10 points for streak
         ))
         
         return score
     
     def get_mastered_topics(self) -> List[str]:
         """Get topics the user has engaged with frequently (mastered)"""
-        if not self.topics_covered:
-            return []
-        
-        # Topics with 3+ interactions are considered "mastered"
-        mastered = [topic for topic, count in self.topics_covered.items() if count >= 3]
-        
-        return sorted(mastered)[:5]  # Return top 5
+        return self._mastered[:5]  # Return top 5
     
     def get_review_topics(self) -> List[str]:
         """Get topics that need review (engaged 1-2 times)"""
-        if not self.topics_covered:
-            return []
-        
-        # Topics with 1-2 interactions need review
-        review = [topic for topic, count in self.topics_covered.items() if 1 <= count < 3]
-        
-        return sorted(review)[:3]  # Return top 3
+        return self._review[:3]  # Return top 3
     
     def get_summary(self) -> dict:
-        """Get complete learning summary"""
-        return {
-            "streakDays": self.get_streak_days(),
-            "engagementScore": self.get_engagement_score(),
-            "masteredTopics": self.get_mastered_topics(),
-            "reviewTopics": self.get_review_topics(),
-            "totalQuestions": len(self.questions_asked),
-            "totalQuizzes": sum(self.quiz_topics.values()),
-            "topicsExplored": len(self.topics_covered),
-        }
+        """Get complete learning summary from precomputed values"""
+        with self.lock:
+            return {
+                "streakDays": self._streak,
+                "engagementScore": self.get_engagement_score(),
+                "masteredTopics": self._mastered[:5],
+                "reviewTopics": self._review[:3],
+                "totalQuestions": self._question_count,
+                "totalQuizzes": self._quiz_count,
+                "topicsExplored": len(self.topics_covered),
+            }
     
+    def sizes(self) -> dict:
+        """Entries held in memory, for monitoring"""
+        with self.lock:
+            return {
+                "questions": len(self.question_log),
+                "topics": len(self.topics_covered),
+                "activeDays": len(self._active_days),
+            }
+
+    def etag(self) -> str:
+        """Entity tag for the current summary; changes whenever tracked state does"""
+        return f'"{self._epoch}-{self.version}"'
+
     def reset(self):
         """Reset all tracking data (for new session/user)"""
-        self.sessions = []
-        self.questions_asked = []
-        self.topics_covered = Counter()
-        self.quiz_topics = Counter()
-        self.session_dates = []
-
-# Global tracker instance
-tracker = SessionTracker()
+        with self.lock:
+            self._reset_state()
+            self.version += 1
+
+
+class _Shard:
+    """One lock-protected slice of the learner map"""
+
+    __slots__ = ("lock", "learners", "next_sweep")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        # learner id -> (tracker, last seen); oldest access first
+        self.learners: "OrderedDict[str, list]" = OrderedDict()
+        self.next_sweep = 0.0
+
+
+class LearnerTrackers:
+    """
+    Per-learner SessionTrackers in a sharded map. Each shard has its own
+    lock, so concurrent requests for different learners rarely contend, and
+    lookups stay O(1) however many learners are active. Any access to a
+    shard sweeps it for learners idle longer than `idle_seconds`, at most
+    once per sweep interval. The default idle time is LEARNER_IDLE_SECONDS
+    with a durable store and the much longer MEMORY_LEARNER_IDLE_SECONDS
+    without one, since eviction then loses the learner's progress.
+    """
+
+    def __init__(
+        self,
+        num_shards: int = TRACKER_SHARDS,
+        idle_seconds: Optional[float] = None,
+        store: ProgressStore = None,
+    ):
+        self.store = store or ProgressStore()
+        if idle_seconds is None:
+            idle_seconds = LEARNER_IDLE_SECONDS if self.store.durable else MEMORY_LEARNER_IDLE_SECONDS
+        self.idle_seconds = idle_seconds
+        self.sweep_interval = min(EVICTION_SWEEP_INTERVAL, idle_seconds / 10)
+        self._shards = [_Shard() for _ in range(num_shards)]
+
+    def _shard(self, learner_id: str) -> _Shard:
+        # crc32 is stable across processes, unlike hash() on str
+        return self._shards[zlib.crc32(learner_id.encode("utf-8")) % len(self._shards)]
+
+    def get(self, learner_id: str = ANONYMOUS_LEARNER) -> SessionTracker:
+        """Return the learner's tracker, creating it on first use"""
+        shard = self._shard(learner_id)
+        with shard.lock:
+            entry = shard.learners.get(learner_id)
+            if entry is not None:
+                now = time.monotonic()
+                entry[1] = now
+                shard.learners.move_to_end(learner_id)
+                self._evict_idle(shard, now)
+                return entry[0]
+
+        # First time on this instance: rebuild from storage outside the lock
+        tracker = SessionTracker(learner_id, self.store)
+        tracker.replay(self.store.load(learner_id))
+
+        with shard.lock:
+            now = time.monotonic()
+            entry = shard.learners.setdefault(learner_id, [tracker, now])
+            entry[1] = now
+            shard.learners.move_to_end(learner_id)
+            self._evict_idle(shard, now)
+            return entry[0]
+
+    def _evict_idle(self, shard: _Shard, now: float):
+        """Drop learners at the cold end of the shard that have gone idle (throttled)"""
+        if now < shard.next_sweep:
+            return
+        shard.next_sweep = now + self.sweep_interval
+        cutoff = now - self.idle_seconds
+        while shard.learners:
+            learner_id, (_, last_seen) = next(iter(shard.learners.items()))
+            if last_seen > cutoff:
+                break
+            del shard.learners[learner_id]
+
+    def __len__(self) -> int:
+        return sum(len(shard.learners) for shard in self._shards)
+
+    def __iter__(self):
+        """Iterate over (learner id, tracker) pairs currently in memory"""
+        for shard in self._shards:
+            with shard.lock:
+                items = [(learner_id, entry[0]) for learner_id, entry in shard.learners.items()]
+            yield from items
+
+    def reset(self):
+        """Forget every learner"""
+        for shard in self._shards:
+            with shard.lock:
+                shard.learners.clear()
+
+
+# Global per-learner tracker map, persisted by the configured store
+trackers = LearnerTrackers(store=create_progress_store())
@@ -0,0 +1,91 @@
+"""
+Single Flight - Coalesce identical concurrent requests into one call
+A classroom asking the same question at once shares a single Gemini completion
+"""
+import asyncio
+import contextvars
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+from backend import deadlines
+from backend.deadlines import DeadlineExceeded
+
+
+class _Call:
+    """One shared in-flight call and the number of requests waiting on it"""
+
+    __slots__ = ("task", "loop", "waiters")
+
+    def __init__(self, task: asyncio.Task, loop: asyncio.AbstractEventLoop):
+        self.task = task
+        self.loop = loop
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Run at most one call per key at a time; concurrent callers with the same
+    key await the same result. Exceptions reach every waiter. A waiter that
+    is cancelled (e.g. the client disconnected) leaves the others running,
+    and the shared call is only cancelled once nobody is waiting for it.
+    The shared call runs in a fresh context (or the one given), free of the
+    first caller's deadline; each caller waits only as long as its own
+    deadline allows.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, _Call] = {}
+        self.started = 0
+        self.coalesced = 0
+
+    async def do(
+        self,
+        key: Hashable,
+        func: Callable[[], Awaitable[Any]],
+        context: Optional[contextvars.Context] = None,
+    ) -> Any:
+        """Await func() or join an identical call that is already running"""
+        loop = asyncio.get_running_loop()
+        call = self._calls.get(key)
+        # A call that is done or being cancelled can't be joined
+        if call is None or call.loop is not loop or call.task.done() or call.task.cancelling():
+            call = _Call(loop.create_task(func(), context=context or contextvars.Context()), loop)
+            self._calls[key] = call
+            call.task.add_done_callback(lambda _task, c=call: self._forget(key, c))
+            self.started += 1
+        else:
+            self.coalesced += 1
+
+        call.waiters += 1
+        try:
+            # Shield so one cancelled waiter doesn't cancel everyone's result
+            left = deadlines.remaining()
+            if left is None:
+                return await asyncio.shield(call.task)
+            try:
+                return await asyncio.wait_for(asyncio.shield(call.task), max(0.0, left))
+            except TimeoutError:
+                if call.task.done():
+                    raise  # The shared call itself timed out
+                raise DeadlineExceeded("Request deadline exceeded while waiting for a shared call") from None
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                call.task.cancel()
+                # Forget it now, so a caller arriving before it unwinds starts afresh
+                self._forget(key, call)
+
+    def _forget(self, key: Hashable, call: _Call):
+        if self._calls.get(key) is call:
+            del self._calls[key]
+
+    def in_flight(self) -> int:
+        """Number of distinct calls currently running"""
+        return len(self._calls)
+
+    def stats(self) -> dict:
+        """Return started and coalesced call counters"""
+        return {
+            "inFlight": len(self._calls),
+            "started": self.started,
+            "coalesced": self.coalesced,
+        }
@@ -0,0 +1,106 @@
+"""
+Streaming Helpers - Incremental parsing of tutor answers and SSE framing
+Lets answer text reach the student while Gemini is still generating
+"""
+import json
+from typing import List, Optional
+
+ANSWER_MARKER = "ANSWER:"
+FOLLOW_UP_MARKER = "FOLLOW_UP_"
+
+
+def sse_event(event: str, data: dict) -> str:
+    """Format one Server-Sent Events message"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+class TutorStreamParser:
+    """
+    Incremental version of AIService._parse_response.
+
+    `feed` takes raw model chunks and returns the answer text that is safe to
+    show so far. Markers can be split across chunks, so the start of a line
+    is held back while it could still become `ANSWER:` or `FOLLOW_UP_n:`.
+    Trailing whitespace is also held until more text arrives, so the emitted
+    text joins lines exactly like `_parse_response` does.
+    """
+
+    def __init__(self):
+        self.section: Optional[str] = None  # Becomes "answer" after ANSWER:
+        self.follow_ups: List[str] = []
+        self.text = ""  # Raw response received so far
+        self._emitted_any = False
+        self._reset_line("")
+
+    def _reset_line(self, line: str):
+        self._line = line
+        self._mode: Optional[str] = None  # None (undecided), "answer" or "skip"
+        self._sent = 0  # Index into the line up to which text was emitted
+        self._line_started = False
+
+    def feed(self, chunk: str) -> str:
+        """Consume a chunk and return newly available answer text"""
+        self.text += chunk
+        self._line += chunk
+        out = []
+        while "\n" in self._line:
+            line, rest = self._line.split("\n", 1)
+            self._line = line
+            out.append(self._advance(final=True))
+            self._reset_line(rest)
+        out.append(self._advance(final=False))
+        return "".join(out)
+
+    def close(self) -> str:
+        """Flush the last line and return any remaining answer text"""
+        out = self._advance(final=True)
+        self._reset_line("")
+        if not self._emitted_any and self.text.strip():
+            # No usable ANSWER: section - the whole response is the answer
+            out += self.text.strip()
+            self._emitted_any = True
+        return out
+
+    def _classify(self, final: bool):
+        """Decide what the current line is, once enough of it has arrived"""
+        stripped = self._line.lstrip()
+        lead = len(self._line) - len(stripped)
+        if stripped.startswith(ANSWER_MARKER):
+            self.section = "answer"
+            self._mode = "answer"
+            self._sent = lead + len(ANSWER_MARKER)
+        elif stripped.startswith(FOLLOW_UP_MARKER):
+            # Follow-ups are only useful whole, so wait for the end of line
+            if final:
+                if ":" in stripped:
+                    self.follow_ups.append(stripped.split(":", 1)[1].strip())
+                self._mode = "skip"
+        elif not final and (ANSWER_MARKER.startswith(stripped) or FOLLOW_UP_MARKER.startswith(stripped)):
+            pass  # Still could turn into a marker
+        elif self.section == "answer":
+            self._mode = "answer"
+            self._sent = lead
+        else:
+            self._mode = "skip"
+
+    def _advance(self, final: bool) -> str:
+        """Emit whatever answer text on the current line is now settled"""
+        if self._mode is None:
+            self._classify(final)
+        if self._mode != "answer":
+            return ""
+
+        pending = self._line[self._sent:]
+        if not self._line_started:
+            stripped = pending.lstrip()
+            self._sent += len(pending) - len(stripped)
+            pending = stripped
+        pending = pending.rstrip()
+        if not pending:
+            return ""
+
+        prefix = " " if self._emitted_any and not self._line_started else ""
+        self._sent += len(pending)
+        self._line_started = True
+        self._emitted_any = True
+        return prefix + pending
@@ -0,0 +1,76 @@
+"""
+Topic Classifier - Single-pass keyword matcher for question topics
+Compiles every topic keyword into one trie-shaped regex, built once
+"""
+import re
+from typing import Dict, List, Optional
+
+DEFAULT_TOPIC = "General STEM"
+
+
+def _trie_pattern(node: dict) -> str:
+    """Render a character trie as a regex that prefers the longest keyword"""
+    terminal = "" in node
+    branches = [re.escape(char) + _trie_pattern(child) for char, child in sorted(node.items()) if char]
+    if not branches:
+        return ""
+    body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+    if terminal:
+        # The keyword may also end here; greedy ? tries the longer one first
+        return "(?:" + body + ")?"
+    return body
+
+
+class TopicClassifier:
+    """
+    Maps a question to the first topic (in `topic_keywords` order) that has a
+    keyword starting at a word boundary anywhere in the question.
+
+    All keywords are merged into one trie-shaped regex, so the regex engine
+    only walks as deep as the text matches, whatever the vocabulary size. A
+    lookahead makes it report the longest keyword at every word start in a
+    single scan; shorter keywords at the same position are prefixes of that
+    match and are found with dictionary lookups.
+    """
+
+    def __init__(self, topic_keywords: Dict[str, List[str]], default: str = DEFAULT_TOPIC):
+        self.default = default
+        self.topics = list(topic_keywords)
+        # Keyword -> index of the first topic that lists it (lower wins)
+        self._priority: Dict[str, int] = {}
+        for index, keywords in enumerate(topic_keywords.values()):
+            for keyword in keywords:
+                keyword = keyword.lower()
+                if keyword and keyword not in self._priority:
+                    self._priority[keyword] = index
+
+        trie: dict = {}
+        for keyword in self._priority:
+            node = trie
+            for char in keyword:
+                node = node.setdefault(char, {})
+            node[""] = True
+
+        self._pattern = re.compile(r"\b(?=(" + _trie_pattern(trie) + "))") if trie else None
+
+    def classify(self, text: str) -> str:
+        """Return the highest-priority topic mentioned in the text"""
+        index = self.best_index(text)
+        return self.topics[index] if index is not None else self.default
+
+    def best_index(self, text: str) -> Optional[int]:
+        """Index of the highest-priority matching topic, or None"""
+        if self._pattern is None:
+            return None
+        priority = self._priority
+        best = None
+        for match in self._pattern.finditer(text.lower()):
+            found = match.group(1)
+            # Shorter keywords starting here are prefixes of the longest match
+            for end in range(len(found), 0, -1):
+                index = priority.get(found[:end])
+                if index is not None and (best is None or index < best):
+                    best = index
+            if best == 0:
+                break
+        return best
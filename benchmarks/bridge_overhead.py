@@ -0,0 +1,88 @@
+"""
+Bridge Overhead - Per-request cost of the Cloud Functions adapter
+Compares the old TestClient proxy with ASGIBridge on endpoints that never call Gemini
+
+Run from the repo root:  python -m benchmarks.bridge_overhead --requests 2000
+"""
+import argparse
+import io
+import json
+import time
+from wsgiref.util import setup_testing_defaults
+
+from fastapi.testclient import TestClient
+
+from backend.asgi_bridge import ASGIBridge
+from backend.main import app
+from benchmarks.common import percentiles, write_results
+
+# (method, path, body) - cheap endpoints so the bridge dominates
+CASES = [
+    ("GET", "/", b""),
+    ("POST", "/api/tutor/query", json.dumps({"question": " "}).encode()),
+]
+
+
+def via_testclient(client: TestClient, method: str, path: str, body: bytes):
+    """What functions/main.py used to do for every request"""
+    response = client.request(
+        method=method,
+        url=path,
+        headers={"content-type": "application/json"},
+        content=body,
+    )
+    return response.status_code, response.content
+
+
+def via_bridge(bridge: ASGIBridge, method: str, path: str, body: bytes):
+    environ = {
+        "REQUEST_METHOD": method,
+        "PATH_INFO": path,
+        "QUERY_STRING": "",
+        "CONTENT_TYPE": "application/json",
+        "CONTENT_LENGTH": str(len(body)),
+        "wsgi.input": io.BytesIO(body),
+    }
+    setup_testing_defaults(environ)
+    status = []
+    chunks = list(bridge(environ, lambda s, h, exc_info=None: status.append(s)))
+    return int(status[0].split()[0]), b"".join(chunks)
+
+
+def measure(call, requests: int) -> dict:
+    """Per-request latency percentiles in microseconds"""
+    for _ in range(min(100, requests)):
+        call()  # Warm-up
+    samples = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        call()
+        samples.append(time.perf_counter() - start)
+    return percentiles(samples, scale=1e6)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000, help="timed requests per case")
+    parser.add_argument("--output", help="result file (default: benchmarks/results/bridge_overhead-<commit>.json)")
+    args = parser.parse_args()
+
+    client = TestClient(app)
+    bridge = ASGIBridge(app)
+    results = {}
+    for method, path, body in CASES:
+        assert via_testclient(client, method, path, body) == via_bridge(bridge, method, path, body)
+        old = measure(lambda: via_testclient(client, method, path, body), args.requests)
+        new = measure(lambda: via_bridge(bridge, method, path, body), args.requests)
+        results[f"{method} {path}"] = {
+            "testclient_us": old,
+            "asgi_bridge_us": new,
+            "speedup": round(old["mean"] / new["mean"], 2),
+        }
+    path = write_results("bridge_overhead", {"requests": args.requests}, results, args.output)
+    print(json.dumps(results, indent=2))
+    print(f"Results written to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Benchmark helpers - Percentiles, stub configuration and JSON result files
+Results carry the git commit so runs from different commits can be compared
+"""
+import json
+import platform
+import subprocess
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+
+def percentiles(samples: List[float], scale: float = 1.0) -> Dict[str, float]:
+    """Mean and p50/p95/p99 of the samples, multiplied by `scale`"""
+    if not samples:
+        return {"mean": 0.0, "p50": 0.0, "p95": 0.0, "p99": 0.0}
+    ordered = sorted(samples)
+
+    def pick(fraction: float) -> float:
+        index = min(len(ordered) - 1, max(0, int(round(fraction * len(ordered))) - 1))
+        return round(ordered[index] * scale, 3)
+
+    return {
+        "mean": round(sum(ordered) / len(ordered) * scale, 3),
+        "p50": pick(0.50),
+        "p95": pick(0.95),
+        "p99": pick(0.99),
+    }
+
+
+def git_commit() -> Optional[str]:
+    """Short hash of HEAD, or None outside a git checkout"""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True, cwd=Path(__file__).parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def write_results(name: str, params: dict, results: dict, output: Optional[str] = None) -> Path:
+    """Write a result file and return its path.
+    Defaults to benchmarks/results/<name>-<commit>.json."""
+    commit = git_commit()
+    path = Path(output) if output else RESULTS_DIR / f"{name}-{commit or 'local'}.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    document = {
+        "benchmark": name,
+        "commit": commit,
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "params": params,
+        "results": results,
+    }
+    path.write_text(json.dumps(document, indent=2) + "\n")
+    return path
+
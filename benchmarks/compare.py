@@ -0,0 +1,76 @@
+"""
+Compare - Diff two benchmark result files and flag regressions
+
+Run from the repo root:
+    python -m benchmarks.compare benchmarks/results/load_test-abc123.json benchmarks/results/load_test-def456.json
+"""
+import argparse
+import json
+import sys
+from typing import Dict, Iterator, Tuple
+
+# Metric name fragments by direction; other numbers are reported but not judged
+HIGHER_IS_BETTER = ("throughput_rps", "speedup")
+LOWER_IS_BETTER = ("_ms", "_us", "seconds", "errors")
+
+
+def flatten(node, prefix: str = "") -> Iterator[Tuple[str, float]]:
+    """Yield (dotted.path, value) for every numeric leaf"""
+    if isinstance(node, dict):
+        for key, value in node.items():
+            yield from flatten(value, f"{prefix}.{key}" if prefix else str(key))
+    elif isinstance(node, (int, float)) and not isinstance(node, bool):
+        yield prefix, float(node)
+
+
+def regression(path: str, old: float, new: float, threshold: float) -> bool:
+    """True if the metric got worse by more than `threshold` (a fraction)"""
+    if old == 0:
+        return path.endswith("errors") and new > 0
+    change = (new - old) / old
+    if any(part in path for part in HIGHER_IS_BETTER):
+        return change < -threshold
+    if any(part in path for part in LOWER_IS_BETTER):
+        return change > threshold
+    return False
+
+
+def compare(old: dict, new: dict, threshold: float) -> Tuple[list, int]:
+    """Rows of (metric, old, new, change %, flag) and the regression count"""
+    old_metrics: Dict[str, float] = dict(flatten(old["results"]))
+    rows, regressions = [], 0
+    for path, value in flatten(new["results"]):
+        if path not in old_metrics:
+            continue
+        before = old_metrics[path]
+        change = (value - before) / before * 100 if before else 0.0
+        worse = regression(path, before, value, threshold)
+        regressions += worse
+        rows.append((path, before, value, change, "REGRESSION" if worse else ""))
+    return rows, regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Diff two benchmark result files")
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="fractional slowdown that counts as a regression")
+    args = parser.parse_args()
+
+    with open(args.baseline) as f:
+        old = json.load(f)
+    with open(args.candidate) as f:
+        new = json.load(f)
+
+    rows, regressions = compare(old, new, args.threshold)
+    print(f"{old.get('commit')} -> {new.get('commit')}  ({old['benchmark']})")
+    width = max((len(row[0]) for row in rows), default=10)
+    for path, before, after, change, flag in rows:
+        print(f"{path:<{width}}  {before:>12.3f}  {after:>12.3f}  {change:>+8.1f}%  {flag}")
+    print(f"{regressions} regression(s) above {args.threshold:.0%}")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""
+Load Test - Throughput and latency of the API routes against a stub model
+Drives the FastAPI app in process over ASGI, so no server or Gemini key is needed
+
+Run from the repo root:  python -m benchmarks.load_test --concurrency 32 --requests 500
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Tuple
+
+import httpx
+
+from backend.ai_service import ai_service
+from backend.main import app
+from backend.model_providers import StubProvider
+from backend.scheduler import LLMScheduler
+from benchmarks.common import percentiles, write_results
+
+TOPICS = ["photosynthesis", "gravity", "electricity", "water cycle", "evolution", "algebra"]
+QUESTION_TEMPLATES = [
+    "Explain {} using an example from Nairobi",
+    "Why does {} matter for farmers in Uganda?",
+    "How would you teach {} to a Form 2 student?",
+]
+
+ROUTES = ("tutor", "quiz", "summary")
+
+
+def install_stub(provider: StubProvider, concurrency: int, rate_per_minute: float):
+    """Point the shared AIService at the stub, with limits sized for the test"""
+    ai_service.provider = provider
+    ai_service._initialize_model()
+    ai_service.max_concurrency = concurrency
+    ai_service._executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="stub")
+    ai_service.scheduler = LLMScheduler(
+        max_concurrent=concurrency,
+        rate_per_minute=rate_per_minute,
+        burst=concurrency,
+        max_queue=max(100, concurrency * 4),
+    )
+    # The router reads load from the scheduler it was built with
+    ai_service.router.load = ai_service.scheduler.queue_depth
+
+
+def request_factory(route: str, args, rng: random.Random) -> Callable[[], Tuple[str, str, dict]]:
+    """Returns a function producing (method, path, kwargs) for the next request"""
+    questions = [
+        template.format(topic)
+        for topic in TOPICS
+        for template in QUESTION_TEMPLATES
+    ]
+    counter = itertools.count()
+
+    def learner() -> Dict[str, str]:
+        return {"X-Learner-Id": f"bench-{rng.randrange(args.learners)}"}
+
+    def tutor():
+        n = next(counter)
+        # distinct_questions bounds how often the tutor cache can hit
+        question = f"{questions[n % len(questions)]} ({n % args.distinct_questions})"
+        return "POST", "/api/tutor/query", {"json": {"question": question}, "headers": learner()}
+
+    def quiz():
+        payload = {"topic": rng.choice(TOPICS), "num_questions": args.quiz_questions}
+        return "POST", "/api/quiz/generate", {"json": payload, "headers": learner()}
+
+    def summary():
+        return "GET", "/api/progress/summary", {"headers": learner()}
+
+    return {"tutor": tutor, "quiz": quiz, "summary": summary}[route]
+
+
+async def run_route(client: httpx.AsyncClient, route: str, args, rng: random.Random) -> dict:
+    """Send args.requests requests from args.concurrency concurrent workers"""
+    next_request = request_factory(route, args, rng)
+    remaining = itertools.count()
+    latencies: List[float] = []
+    errors = 0
+
+    async def worker():
+        nonlocal errors
+        while next(remaining) < args.requests:
+            method, path, kwargs = next_request()
+            start = time.perf_counter()
+            try:
+                response = await client.request(method, path, **kwargs)
+                ok = response.status_code == 200
+            except httpx.HTTPError:
+                ok = False
+            latencies.append(time.perf_counter() - start)
+            errors += not ok
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - start
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "seconds": round(elapsed, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "latency_ms": percentiles(latencies, scale=1000),
+    }
+
+
+async def run(args) -> dict:
+    provider = StubProvider(latency=args.latency, jitter=args.jitter, seed=args.seed)
+    install_stub(provider, args.model_concurrency, args.rate_per_minute)
+    rng = random.Random(args.seed)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        results = {}
+        for route in args.routes:
+            calls_before = provider.calls
+            results[route] = await run_route(client, route, args, rng)
+            results[route]["model_calls"] = provider.calls - calls_before
+
+    results["service"] = {
+        "tutor_cache": ai_service.tutor_cache.stats(),
+        "scheduler": ai_service.scheduler.stats(),
+        "single_flight": ai_service._inflight.stats(),
+    }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--routes", nargs="+", choices=ROUTES, default=list(ROUTES))
+    parser.add_argument("--requests", type=int, default=500, help="requests per route")
+    parser.add_argument("--concurrency", type=int, default=32, help="concurrent clients")
+    parser.add_argument("--latency", type=float, default=0.05, help="stub model latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="+/- random latency in seconds")
+    parser.add_argument("--model-concurrency", type=int, default=8, help="parallel model calls")
+    parser.add_argument("--rate-per-minute", type=float, default=1e9, help="scheduler rate limit")
+    parser.add_argument("--learners", type=int, default=100, help="distinct X-Learner-Id values")
+    parser.add_argument("--distinct-questions", type=int, default=1_000_000,
+                        help="distinct tutor questions; lower it to exercise the cache")
+    parser.add_argument("--quiz-questions", type=int, default=3, help="num_questions per quiz")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="result file (default: benchmarks/results/load_test-<commit>.json)")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    params = {key: value for key, value in vars(args).items() if key != "output"}
+    path = write_results("load_test", params, results, args.output)
+    print(json.dumps(results, indent=2))
+    print(f"Results written to {path}")
+
+
+if __name__ == "__main__":
+    main()
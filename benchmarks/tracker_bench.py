@@ -0,0 +1,97 @@
+"""
+Tracker Benchmarks - SessionTracker hot paths over large learner histories
+Times track_question, _detect_topic and get_summary per history size
+
+Run from the repo root:  python -m benchmarks.tracker_bench --history 1000 100000
+"""
+import argparse
+import json
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Callable, List
+
+from backend.progress_store import QUESTION, QUIZ
+from backend.session_tracker import TOPIC_KEYWORDS, SessionTracker
+from benchmarks.common import percentiles, write_results
+
+FILLER = ["Explain", "Why does", "How is", "Give an example of", "What happens to"]
+
+
+def make_questions(rng: random.Random, count: int) -> List[str]:
+    """Questions mentioning a random keyword, plus some that match nothing"""
+    keywords = [keyword for keywords in TOPIC_KEYWORDS.values() for keyword in keywords]
+    questions = []
+    for _ in range(count):
+        if rng.random() < 0.2:
+            questions.append(f"{rng.choice(FILLER)} the market price of tea in Kericho?")
+        else:
+            questions.append(f"{rng.choice(FILLER)} {rng.choice(keywords)} work in rural Kenya?")
+    return questions
+
+
+def build_tracker(rng: random.Random, history: int, questions: List[str]) -> SessionTracker:
+    """A tracker that has already seen `history` events over the last year"""
+    start = datetime.now() - timedelta(days=365)
+    events = []
+    for i in range(history):
+        when = start + timedelta(seconds=i * 365 * 86400 / max(1, history))
+        if rng.random() < 0.8:
+            events.append((QUESTION, rng.choice(questions), None, when))
+        else:
+            events.append((QUIZ, rng.choice(list(TOPIC_KEYWORDS)), None, when))
+    tracker = SessionTracker()
+    tracker.replay(events)
+    return tracker
+
+
+def time_per_call(func: Callable[[], object], calls: int, repeats: int) -> dict:
+    """Per-call time in microseconds; each sample is the mean over `calls` calls"""
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _ in range(calls):
+            func()
+        samples.append((time.perf_counter() - start) / calls)
+    return percentiles(samples, scale=1e6)
+
+
+def run(args) -> dict:
+    rng = random.Random(args.seed)
+    questions = make_questions(rng, 1000)
+    results = {}
+    for history in args.history:
+        tracker = build_tracker(rng, history, questions)
+        cycle = iter(questions * (args.calls * args.repeats // len(questions) + 1))
+
+        results[str(history)] = {
+            "track_question_us": time_per_call(
+                lambda: tracker.track_question(next(cycle)), args.calls, args.repeats
+            ),
+            "detect_topic_us": time_per_call(
+                lambda: tracker._detect_topic(rng.choice(questions)), args.calls, args.repeats
+            ),
+            "get_summary_us": time_per_call(tracker.get_summary, args.calls, args.repeats),
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--history", type=int, nargs="+", default=[1_000, 10_000, 100_000],
+                        help="events already tracked before timing")
+    parser.add_argument("--calls", type=int, default=2000, help="calls per sample")
+    parser.add_argument("--repeats", type=int, default=20, help="samples per measurement")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="result file (default: benchmarks/results/tracker_bench-<commit>.json)")
+    args = parser.parse_args()
+
+    results = run(args)
+    params = {key: value for key, value in vars(args).items() if key != "output"}
+    path = write_results("tracker_bench", params, results, args.output)
+    print(json.dumps(results, indent=2))
+    print(f"Results written to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,11 +7,24 @@ const API_BASE_URL = window.location.hostname === 'localhost' || window.location
   ? 'http://127.0.0.1:8000/api'
   : 'https://api-xayzhqp7ua-uc.a.run.app/api';  // Firebase Cloud Function URL
 
+// Stable per-browser learner id so progress is tracked per student
+const LEARNER_ID = (() => {
+  const key = 'edumentor-learner-id';
+  let id = window.localStorage.getItem(key);
+  if (!id) {
+    id = window.crypto && window.crypto.randomUUID
+      ? window.crypto.randomUUID()
+      : `learner-${Date.now()}-${Math.random().toString(36).slice(2)}`;
+    window.localStorage.setItem(key, id);
+  }
+  return id;
+})();
+
 const apiClient = {
   async askTutor(question) {
     const response = await fetch(`${API_BASE_URL}/tutor/query`, {
       method: 'POST',
-      headers: { 'Content-Type': 'application/json' },
+      headers: { 'Content-Type': 'application/json', 'X-Learner-Id': LEARNER_ID },
       body: JSON.stringify({ question }),
     });
     if (!response.ok) {
@@ -23,7 +36,7 @@ const apiClient = {
   async generateQuiz(topic) {
     const response = await fetch(`${API_BASE_URL}/quiz/generate`, {
       method: 'POST',
-      headers: { 'Content-Type': 'application/json' },
+      headers: { 'Content-Type': 'application/json', 'X-Learner-Id': LEARNER_ID },
       body: JSON.stringify({ topic }),
     });
     if (!response.ok) {
@@ -33,7 +46,9 @@ const apiClient = {
   },
 
   async getProgressSummary() {
-    const response = await fetch(`${API_BASE_URL}/progress/summary`);
+    const response = await fetch(`${API_BASE_URL}/progress/summary`, {
+      headers: { 'X-Learner-Id': LEARNER_ID },
+    });
     if (!response.ok) {
       throw new Error('Dashboard data unavailable.');
     }
@@ -15,31 +15,15 @@ sys.path.insert(0, str(Path(__file__).parent))
 # Import the FastAPI app
 from backend.main import app
 
-# Use FastAPI TestClient for synchronous request handling
-from fastapi.testclient import TestClient
-client = TestClient(app)
+# Run FastAPI on one long-lived event loop behind a WSGI adapter
+from backend.asgi_bridge import ASGIBridge
+bridge = ASGIBridge(app)
 
 @https_fn.on_request()
 def api(req: https_fn.Request) -> https_fn.Response:
     """
-    Handle all API requests through FastAPI using TestClient
+    Handle all API requests through FastAPI via the ASGI bridge
     """
-    # Build full URL with query parameters
-    url = req.path
-    if req.query_string:
-        url += f"?{req.query_string.decode()}"
-    
-    # Forward the request to FastAPI
-    response = client.request(
-        method=req.method,
-        url=url,
-        headers=dict(req.headers),
-        content=req.get_data()
-    )
-    
-    # Return the response
-    return https_fn.Response(
-        response=response.content,
-        status=response.status_code,
-        headers=dict(response.headers)
-    )
+    # Hand the raw WSGI environ over; the body is read from the socket as
+    # the app asks for it and the response streams back unbuffered
+    return https_fn.Response.from_app(bridge, req.environ)
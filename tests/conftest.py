@@ -0,0 +1,98 @@
+import threading
+import time
+
+import pytest
+
+from backend.ai_service import AIService
+
+
+class SlowModel:
+    """Stand-in for a Gemini model that blocks like the real SDK"""
+
+    def __init__(self, text: str, delay: float = 0.2):
+        self.text = text
+        self.delay = delay
+        self.calls = 0
+
+    def generate_content(self, prompt, stream=False, **options):
+        self.calls += 1
+        time.sleep(self.delay)
+        if stream:
+            return (
+                type("Chunk", (), {"text": self.text[i:i + 7]})()
+                for i in range(0, len(self.text), 7)
+            )
+        return type("Response", (), {"text": self.text})()
+
+
+class ScriptedModel:
+    """Returns the given replies in order"""
+
+    def __init__(self, *replies):
+        self.replies = list(replies)
+        self.prompts = []
+
+    def generate_content(self, prompt, stream=False, **options):
+        self.prompts.append(prompt)
+        return type("Response", (), {"text": self.replies.pop(0)})()
+
+
+class ScriptedDelayModel:
+    """Sleeps for the next scripted delay (the last one repeats), or raises it if it's an error"""
+
+    answer = "ANSWER: A mango falls because gravity pulls it down.\nFOLLOW_UP_1: What is mass?"
+
+    def __init__(self, *steps):
+        self.steps = list(steps)
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def generate_content(self, prompt, stream=False, **options):
+        with self._lock:
+            step = self.steps[min(self.calls, len(self.steps) - 1)]
+            self.calls += 1
+        if isinstance(step, Exception):
+            raise step
+        time.sleep(step)
+        return type("Response", (), {"text": self.answer})()
+
+
+class Overloaded(RuntimeError):
+    """A transient error the way Gemini reports one"""
+
+    code = 503
+
+
+@pytest.fixture
+def make_service():
+    """Build an AIService that sends every call straight to a fake model"""
+
+    def make(model, **kwargs) -> AIService:
+        service = AIService(**kwargs)
+        service.model = model
+        service.is_configured = True
+        service._initialization_attempted = True
+        return service
+
+    return make
+
+
+@pytest.fixture
+def slow_model():
+    return SlowModel
+
+
+@pytest.fixture
+def scripted_model():
+    return ScriptedModel
+
+
+@pytest.fixture
+def scripted_delay_model():
+    return ScriptedDelayModel
+
+
+@pytest.fixture
+def overloaded():
+    """A fresh 503 error each call"""
+    return lambda: Overloaded("503 The model is overloaded")
@@ -0,0 +1,114 @@
+import io
+import json
+from contextlib import asynccontextmanager
+from wsgiref.util import setup_testing_defaults
+
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+
+from backend.asgi_bridge import ASGIBridge
+from backend.main import app
+
+
+def make_environ(method="GET", path="/", body=b"", query="", headers=None):
+    environ = {
+        "REQUEST_METHOD": method,
+        "PATH_INFO": path,
+        "QUERY_STRING": query,
+        "CONTENT_LENGTH": str(len(body)) if body else "",
+        "wsgi.input": io.BytesIO(body),
+    }
+    for name, value in (headers or {}).items():
+        key = name.upper().replace("-", "_")
+        environ[key if key == "CONTENT_TYPE" else f"HTTP_{key}"] = value
+    setup_testing_defaults(environ)
+    return environ
+
+
+def call(bridge, environ):
+    captured = {}
+
+    def start_response(status, headers, exc_info=None):
+        captured["status"] = status
+        captured["headers"] = dict(headers)
+
+    chunks = list(bridge(environ, start_response))
+    return captured["status"], captured["headers"], chunks
+
+
+def test_bridge_round_trips_request_and_response():
+    bridge = ASGIBridge(app)
+    body = json.dumps({"question": "  "}).encode()
+    status, _, chunks = call(bridge, make_environ(
+        "POST", "/api/tutor/query", body, headers={"Content-Type": "application/json"},
+    ))
+    assert status.startswith("400")
+
+    status, headers, chunks = call(bridge, make_environ("GET", "/"))
+    assert status == "200 OK"
+    assert headers["content-type"] == "application/json"
+    assert json.loads(b"".join(chunks))["status"] == "ok"
+
+
+def test_bridge_passes_query_headers_and_large_bodies():
+    echo = FastAPI()
+
+    @echo.post("/echo")
+    async def echo_request(request: Request):
+        body = await request.body()
+        return {
+            "q": request.query_params["q"],
+            "learner": request.headers["x-learner-id"],
+            "size": len(body),
+        }
+
+    bridge = ASGIBridge(echo, chunk_size=1024)
+    body = b"x" * 5000
+    status, _, chunks = call(bridge, make_environ(
+        "POST", "/echo", body, query="q=caf%C3%A9", headers={"X-Learner-Id": "learner-a"},
+    ))
+    assert status == "200 OK"
+    assert json.loads(b"".join(chunks)) == {"q": "café", "learner": "learner-a", "size": 5000}
+
+
+def test_bridge_streams_chunks_as_sent():
+    streaming = FastAPI()
+
+    @streaming.get("/stream")
+    async def stream():
+        async def events():
+            for i in range(3):
+                yield f"chunk {i}\n"
+        return StreamingResponse(events(), media_type="text/plain")
+
+    status, _, chunks = call(ASGIBridge(streaming), make_environ("GET", "/stream"))
+    assert status == "200 OK"
+    assert chunks == [b"chunk 0\n", b"chunk 1\n", b"chunk 2\n"]
+
+
+def test_bridge_returns_500_when_app_fails():
+    async def broken(scope, receive, send):
+        raise ValueError("boom")
+
+    status, _, chunks = call(ASGIBridge(broken), make_environ("GET", "/"))
+    assert status.startswith("500")
+    assert chunks == [b"Internal Server Error"]
+
+
+def test_bridge_runs_app_startup_hooks_before_the_first_request():
+    started = []
+
+    async def startup(app):
+        started.append(True)
+        yield
+
+    app_with_lifespan = FastAPI(lifespan=asynccontextmanager(startup))
+
+    @app_with_lifespan.get("/started")
+    async def is_started():
+        return {"started": bool(started)}
+
+    status, _, chunks = call(ASGIBridge(app_with_lifespan), make_environ(path="/started"))
+
+    assert status == "200 OK"
+    assert json.loads(b"".join(chunks)) == {"started": True}
@@ -0,0 +1,96 @@
+import asyncio
+
+from backend import ai_service as ai_service_module
+from backend.ai_service import AIService
+from backend.cache_warmer import CacheWarmer, PopularitySnapshot
+from backend.model_providers import StubProvider
+from backend.session_tracker import LearnerTrackers
+
+
+def make_trackers() -> LearnerTrackers:
+    trackers = LearnerTrackers()
+    for learner in ("a", "b", "c"):
+        tracker = trackers.get(learner)
+        tracker.track_question("Why do objects fall?")
+        tracker.track_quiz("gravity")
+    trackers.get("a").track_question("What is a solar panel?")
+    trackers.get("b").track_question("Why do objects fall")  # Same question once normalized
+    return trackers
+
+
+def test_warm_up_fills_caches_for_popular_topics_within_budget(tmp_path):
+    provider = StubProvider(latency=0)
+    service = AIService(provider=provider)
+    warmer = CacheWarmer(
+        service, make_trackers(), PopularitySnapshot(tmp_path / "popularity.json"),
+        top_topics=1, quiz_questions=5, max_calls=10,
+    )
+
+    stats = asyncio.run(warmer.warm())
+
+    assert stats == {"calls": 2, "budget": 10, "tutor": 1, "quiz": 1, "skipped": 0}
+    assert provider.calls == 2
+    asyncio.run(service.generate_tutor_response("why do objects fall"))
+    assert service.tutor_cache.stats()["hits"] == 1
+    assert service.question_bank.sample("Gravity", 5) is not None
+
+    # Already warm: a second pass spends nothing
+    asyncio.run(warmer.warm())
+    assert provider.calls == 2
+
+
+def test_budget_keeps_the_most_popular_items(tmp_path):
+    provider = StubProvider(latency=0)
+    warmer = CacheWarmer(
+        AIService(provider=provider), make_trackers(), PopularitySnapshot(tmp_path / "p.json"),
+        top_topics=5, quiz_questions=5, max_calls=1,
+    )
+
+    stats = asyncio.run(warmer.warm())
+
+    assert stats["calls"] == provider.calls == 1
+    assert stats["tutor"] == 1 and stats["skipped"] >= 1
+
+
+def test_budget_counts_real_calls_including_retries(
+    make_service, scripted_delay_model, overloaded, tmp_path, monkeypatch
+):
+    monkeypatch.setattr(ai_service_module, "GEMINI_RETRY_BASE_DELAY", 0)
+    model = scripted_delay_model(overloaded())  # Every call fails, so every item retries
+    service = make_service(model)
+    warmer = CacheWarmer(
+        service, make_trackers(), PopularitySnapshot(tmp_path / "p.json"),
+        top_topics=5, quiz_questions=0, max_calls=4,
+    )
+
+    stats = asyncio.run(warmer.warm())
+
+    # Two planned tutor calls, but each one retries: the budget caps real calls
+    assert model.calls == stats["calls"] == 4
+    assert stats["tutor"] == 0
+
+
+def test_snapshot_lets_a_fresh_instance_warm_before_any_traffic(tmp_path):
+    snapshot = PopularitySnapshot(tmp_path / "popularity.json")
+    CacheWarmer(AIService(provider=StubProvider(latency=0)), make_trackers(), snapshot).save_snapshot()
+
+    service = AIService(provider=StubProvider(latency=0))
+    fresh = CacheWarmer(service, LearnerTrackers(), snapshot, top_topics=1, quiz_questions=0)
+    plan = fresh.plan(fresh.popularity())
+
+    assert plan == [("tutor", "Why do objects fall?", 1)]
+    asyncio.run(fresh.warm())
+    assert len(service.tutor_cache) == 1
+
+
+def test_students_do_not_join_a_background_warm_up_call():
+    service = AIService(provider=StubProvider(latency=0.2))
+
+    async def run():
+        warming = asyncio.create_task(service.warm_tutor_answer("Why do objects fall?"))
+        await asyncio.sleep(0.05)
+        await service.generate_tutor_response("Why do objects fall?")
+        await warming
+
+    asyncio.run(run())
+    assert service._inflight.coalesced == 0  # The student got an interactive call of their own
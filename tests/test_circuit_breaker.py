@@ -0,0 +1,45 @@
+import time
+
+from backend.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+from backend.model_registry import ModelRegistry
+
+
+def test_breaker_opens_after_repeated_failures():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+    breaker.record_failure()
+    assert breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert not breaker.allow_request()
+
+
+def test_half_open_allows_one_trial_then_closes_on_success():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.01)
+    breaker.record_failure()
+    time.sleep(0.02)
+    assert breaker.allow_request()
+    assert breaker.state == HALF_OPEN
+    assert not breaker.allow_request()  # Only one trial at a time
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    assert breaker.allow_request()
+
+
+def test_failed_trial_reopens_breaker():
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=0.01)
+    for _ in range(3):
+        breaker.record_failure()
+    time.sleep(0.02)
+    assert breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.state == OPEN
+
+
+def test_registry_persists_last_working_model(tmp_path):
+    path = tmp_path / "registry.json"
+    ModelRegistry(path).record("models/gemini-2.0-flash")
+
+    reloaded = ModelRegistry(path)
+    assert reloaded.last_working_model() == "models/gemini-2.0-flash"
+    assert reloaded.is_fresh()
+    assert not ModelRegistry(tmp_path / "missing.json").is_fresh()
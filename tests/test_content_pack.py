@@ -0,0 +1,49 @@
+import asyncio
+import json
+
+from backend.ai_service import AIService
+from backend.content_pack import CONTENT_PACK_SOURCE, ContentPack, write_pack
+from backend.model_providers import StubProvider
+from backend.session_tracker import TOPIC_CLASSIFIER, TOPIC_KEYWORDS
+
+
+def test_pack_round_trips_records_by_normalized_topic(tmp_path):
+    path = tmp_path / "pack.bin"
+    records = {
+        f"Topic {n}": {"answer": f"Answer {n}", "follow_up_suggestions": [], "quiz": []}
+        for n in range(50)
+    }
+    write_pack(path, records)
+
+    pack = ContentPack(path)
+    assert len(pack) == 50
+    assert pack.get("topic 7")["answer"] == "Answer 7"
+    assert pack.get("  TOPIC 42 ")["answer"] == "Answer 42"
+    assert pack.get("Topic 50") is None
+
+    assert len(ContentPack(tmp_path / "missing.bin")) == 0
+
+
+def test_shipped_pack_covers_every_topic_and_matches_its_source():
+    with open(CONTENT_PACK_SOURCE, "r", encoding="utf-8") as f:
+        source = json.load(f)
+    pack = ContentPack()
+
+    for topic in list(TOPIC_KEYWORDS) + [TOPIC_CLASSIFIER.default]:
+        entry = pack.get(topic)
+        assert entry is not None, topic
+        assert entry["answer"] == source[topic]["answer"]
+        assert len(entry["quiz"]) >= 3
+
+
+def test_fallbacks_serve_pack_content_for_the_detected_topic():
+    service = AIService(provider=StubProvider(latency=0, error_rate=1.0))
+
+    answer = asyncio.run(service.generate_tutor_response("Why does a mango fall to the ground?"))
+    assert "overview of Gravity" in answer["answer"]
+    assert len(answer["follow_up_suggestions"]) == 2
+
+    quiz = asyncio.run(service.generate_quiz("solar power", num_questions=4))
+    electricity = {item["prompt"] for item in service.content_pack.get("Electricity")["quiz"]}
+    assert len(quiz) == 4
+    assert {question["prompt"] for question in quiz} <= electricity
@@ -0,0 +1,164 @@
+import asyncio
+import time
+
+import pytest
+
+from backend import ai_service as ai_service_module
+from backend import deadlines
+from backend.deadlines import DeadlineExceeded, DeadlineMiddleware, deadline
+from backend.prompts import tutor_prompt
+
+
+def test_hung_model_call_is_cut_off_at_the_request_deadline(make_service, scripted_delay_model):
+    service = make_service(scripted_delay_model(1.0))
+
+    async def run():
+        with deadline(0.3):
+            start = time.perf_counter()
+            result = await service.generate_tutor_response("Why does a mango fall?")
+            return result, time.perf_counter() - start
+
+    result, elapsed = asyncio.run(run())
+    assert elapsed < 0.6
+    assert "unavailable" in result["answer"]  # Fallback instead of a hung request
+
+
+def test_only_transient_errors_are_retried(make_service, scripted_delay_model, overloaded):
+    flaky = scripted_delay_model(overloaded(), 0)
+    answer = asyncio.run(make_service(flaky).generate_tutor_response("What is gravity?"))
+    assert answer["answer"].startswith("A mango falls")
+    assert flaky.calls == 2
+
+    broken = scripted_delay_model(ValueError("400 Invalid argument"))
+    answer = asyncio.run(make_service(broken).generate_tutor_response("What is gravity?"))
+    assert "unavailable" in answer["answer"]
+    assert broken.calls == 1
+
+
+def test_hedged_request_wins_when_the_first_call_stalls(make_service, scripted_delay_model, monkeypatch):
+    monkeypatch.setattr(ai_service_module, "GEMINI_HEDGE", True)
+    monkeypatch.setattr(ai_service_module, "GEMINI_HEDGE_MIN_DELAY", 0.05)
+    model = scripted_delay_model(1.0, 0)
+    service = make_service(model)
+    for _ in range(5):
+        service.router.observe(None, 0.01)
+
+    async def run():
+        start = time.perf_counter()
+        result = await service.generate_tutor_response("What is gravity?")
+        return result, time.perf_counter() - start
+
+    result, elapsed = asyncio.run(run())
+    assert result["answer"].startswith("A mango falls")
+    assert elapsed < 0.5
+    assert model.calls == 2
+    # The hedge's slot is handed back; the stalled primary keeps one until its thread is free
+    assert service.scheduler.active == 1
+
+
+def half_open_breaker(service):
+    breaker = service._breaker(None)
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure()
+    breaker.opened_at -= breaker.reset_timeout  # Cool-down over: next call is the trial
+    return breaker
+
+
+def test_abandoned_trial_call_does_not_wedge_the_breaker(make_service, scripted_delay_model):
+    service = make_service(scripted_delay_model(1.0))
+    breaker = half_open_breaker(service)
+    prompt = tutor_prompt("What is gravity?")
+
+    async def expired():
+        with deadline(0):
+            await service._generate_with_failover(prompt)
+
+    try:
+        asyncio.run(expired())
+    except DeadlineExceeded:
+        pass
+    assert breaker.allow_request()  # The deadline didn't claim the trial
+    breaker.release()
+
+    async def cancelled():
+        task = asyncio.create_task(service._generate_with_failover(prompt))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    asyncio.run(cancelled())
+    assert breaker.allow_request()  # The cancelled trial handed its slot back
+
+
+def test_impatient_caller_does_not_cut_off_a_shared_call(make_service, scripted_delay_model):
+    model = scripted_delay_model(0.3)
+    service = make_service(model)
+
+    async def ask(seconds):
+        with deadline(seconds):
+            return await service.generate_tutor_response("Why does a mango fall?")
+
+    async def run():
+        impatient = asyncio.create_task(ask(0.1))
+        await asyncio.sleep(0.01)  # The impatient request leads the shared call
+        return await asyncio.gather(impatient, ask(5))
+
+    impatient, patient = asyncio.run(run())
+    assert "unavailable" in impatient["answer"]
+    assert patient["answer"].startswith("A mango falls")
+    assert model.calls == 1
+
+
+def test_deadline_cut_timeouts_do_not_open_the_breaker(make_service, scripted_delay_model):
+    service = make_service(scripted_delay_model(0.3))
+    breaker = service._breaker(None)
+    prompt = tutor_prompt("Why does a mango fall?")
+
+    async def ask():
+        with deadline(0.05):
+            await service._generate_with_failover(prompt)
+
+    for _ in range(breaker.failure_threshold + 1):
+        with pytest.raises(TimeoutError):
+            asyncio.run(ask())
+    # The model was never given its full timeout, so it isn't blamed
+    assert breaker.snapshot() == {"state": "closed", "failures": 0}
+
+
+def test_timed_out_call_keeps_its_slot_until_its_thread_is_free(
+    make_service, scripted_delay_model, monkeypatch
+):
+    monkeypatch.setattr(ai_service_module, "GEMINI_CALL_TIMEOUT", 0.05)
+    service = make_service(scripted_delay_model(0.3))
+    prompt = tutor_prompt("Why does a mango fall?")
+
+    async def run():
+        async with service.scheduler.slot():
+            with pytest.raises(TimeoutError):
+                await service._generate_with_failover(prompt)
+        held = service.scheduler.active  # The SDK call is still blocking a pool thread
+        await asyncio.sleep(0.4)
+        return held, service.scheduler.active
+
+    assert asyncio.run(run()) == (1, 0)
+
+
+def test_middleware_sets_deadline_from_header():
+    seen = []
+
+    async def app(scope, receive, send):
+        seen.append(deadlines.remaining())
+
+    middleware = DeadlineMiddleware(app, seconds=20)
+
+    async def request(headers):
+        await middleware({"type": "http", "headers": headers}, None, None)
+
+    asyncio.run(request([]))
+    asyncio.run(request([(b"x-request-timeout", b"2.5")]))
+    asyncio.run(request([(b"x-request-timeout", b"soon")]))
+
+    assert 19 < seen[0] <= 20
+    assert 2 < seen[1] <= 2.5
+    assert 19 < seen[2] <= 20
+    assert deadlines.remaining() is None
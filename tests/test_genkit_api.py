@@ -35,3 +35,34 @@ def test_progress_summary(client):
     assert response.status_code == 200
     data = response.json()
     assert data["streakDays"] >= 0
+
+
+def test_tutor_stream_emits_done_event(client):
+    response = client.post("/api/tutor/stream", json={"question": "Explain gravity"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert "content-encoding" not in response.headers  # Streams are never buffered for compression
+    assert "event: token" in response.text
+    assert response.text.rstrip().split("\n\n")[-1].startswith("event: done")
+
+
+def test_tutor_stream_validation(client):
+    response = client.post("/api/tutor/stream", json={"question": ""})
+    assert response.status_code == 400
+
+
+def test_progress_summary_is_per_learner(client):
+    client.post(
+        "/api/quiz/generate",
+        json={"topic": "gravity"},
+        headers={"X-Learner-Id": "learner-a"},
+    )
+    a = client.get("/api/progress/summary", headers={"X-Learner-Id": "learner-a"}).json()
+    b = client.get("/api/progress/summary", headers={"X-Learner-Id": "learner-b"}).json()
+    assert a["totalQuizzes"] == 1
+    assert b["totalQuizzes"] == 0
+
+
+def test_invalid_learner_id_rejected(client):
+    response = client.get("/api/progress/summary", headers={"X-Learner-Id": "bad id!"})
+    assert response.status_code == 400
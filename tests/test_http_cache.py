@@ -0,0 +1,105 @@
+import zlib
+
+from fastapi.testclient import TestClient
+
+from backend import compression
+from backend.ai_service import ai_service
+from backend.compression import accepted_encodings
+from backend.http_cache import etag_matches
+from backend.main import app
+from backend.session_tracker import trackers
+
+client = TestClient(app)
+
+
+def test_summary_revalidates_with_etag_until_progress_changes():
+    headers = {"X-Learner-Id": "etag-learner"}
+    first = client.get("/api/progress/summary", headers=headers)
+    etag = first.headers["ETag"]
+    assert first.headers["Cache-Control"] == "private, no-cache"
+
+    again = client.get("/api/progress/summary", headers={**headers, "If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.content == b""
+    assert again.headers["ETag"] == etag
+
+    trackers.get("etag-learner").track_question("What is gravity?")
+    changed = client.get("/api/progress/summary", headers={**headers, "If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.json()["totalQuestions"] == 1
+    assert changed.headers["ETag"] != etag
+
+    assert etag_matches(f'"a", W/{etag}', etag)
+    assert not etag_matches(None, etag)
+
+
+def test_get_quiz_is_cacheable_at_the_edge_unless_it_is_a_fallback(monkeypatch):
+    ai_service.question_bank.add("Levers", [
+        {"prompt": f"Lever question {n}?", "choices": None, "answer": "A", "explanation": None}
+        for n in range(3)
+    ])
+    response = client.get("/api/quiz/topics/Levers", params={"num_questions": 3})
+    assert response.status_code == 200
+    assert len(response.json()["questions"]) == 3
+    assert "s-maxage=" in response.headers["Cache-Control"]
+    assert response.headers["Cache-Control"].startswith("public")
+
+    async def broken_model(*args, **kwargs):
+        raise RuntimeError("503 The model is overloaded")
+
+    # A banked topic doesn't make a fallback for a bigger quiz cacheable
+    monkeypatch.setattr(ai_service, "_request_quiz_chunked", broken_model)
+    response = client.get("/api/quiz/topics/Levers", params={"num_questions": 5})
+    assert response.status_code == 200
+    assert response.headers["Cache-Control"] == "no-store"
+
+    assert client.get("/api/quiz/topics/%20%20").status_code == 400
+    assert client.get("/api/quiz/topics/Levers", params={"num_questions": 0}).status_code == 422
+    assert client.get("/api/quiz/generate").status_code == 405  # Not taken for a topic
+
+
+def test_responses_are_compressed_for_clients_that_accept_it():
+    response = client.get("/openapi.json", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["Vary"]
+    assert response.json()["info"]["title"] == "EduMentor API"
+
+    response = client.get("/openapi.json", headers={"Accept-Encoding": "br"})
+    assert response.headers.get("Content-Encoding") == ("br" if compression.brotli else None)
+
+    response = client.get("/openapi.json", headers={"Accept-Encoding": "identity"})
+    assert "Content-Encoding" not in response.headers
+    assert response.content.startswith(b"{")  # Plain JSON body
+
+    small = client.get("/", headers={"Accept-Encoding": "gzip"})
+    assert len(small.content) < compression.COMPRESSION_MIN_SIZE
+    assert "Content-Encoding" not in small.headers
+
+    assert accepted_encodings("gzip;q=0.5, br;q=0, deflate") == {"gzip", "deflate"}
+
+
+class FakeBrotli:
+    """Stands in for the optional brotli package; raw deflate underneath"""
+
+    class Compressor:
+        def __init__(self, quality):
+            self._zlib = zlib.compressobj(quality, zlib.DEFLATED, -zlib.MAX_WBITS)
+
+        def process(self, data):
+            return self._zlib.compress(data)
+
+        def flush(self):
+            return self._zlib.flush(zlib.Z_SYNC_FLUSH)
+
+        def finish(self):
+            return self._zlib.flush(zlib.Z_FINISH)
+
+
+def test_brotli_is_preferred_when_available(monkeypatch):
+    monkeypatch.setattr(compression, "brotli", FakeBrotli)
+    plain = client.get("/openapi.json", headers={"Accept-Encoding": "identity"}).content
+
+    with client.stream("GET", "/openapi.json", headers={"Accept-Encoding": "gzip, br"}) as response:
+        assert response.headers["Content-Encoding"] == "br"
+        body = b"".join(response.iter_raw())
+    assert zlib.decompress(body, -zlib.MAX_WBITS) == plain
@@ -0,0 +1,58 @@
+import threading
+
+from fastapi.testclient import TestClient
+
+from backend.main import app
+from backend.metrics import MetricsRegistry
+
+
+def test_counters_and_histograms_render_in_prometheus_format():
+    registry = MetricsRegistry()
+    calls = registry.counter("calls_total", "Calls", ("kind",))
+    latency = registry.histogram("latency_seconds", "Latency", ("model",), buckets=(0.1, 1.0))
+
+    calls.labels('tu"tor').inc()
+    calls.labels('tu"tor').inc(2)
+    for value in (0.05, 0.5, 5.0):
+        latency.labels("flash").observe(value)
+
+    text = registry.render()
+    assert "# TYPE calls_total counter" in text
+    assert 'calls_total{kind="tu\\"tor"} 3' in text
+    assert 'latency_seconds_bucket{model="flash",le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{model="flash",le="1"} 2' in text
+    assert 'latency_seconds_bucket{model="flash",le="+Inf"} 3' in text
+    assert 'latency_seconds_count{model="flash"} 3' in text
+    assert 'latency_seconds_sum{model="flash"} 5.55' in text
+
+
+def test_counter_updates_from_many_threads_are_not_lost():
+    registry = MetricsRegistry()
+    counter = registry.counter("events_total", "Events").labels()
+
+    def work():
+        for _ in range(10000):
+            counter.inc()
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert counter.value() == 80000
+
+
+def test_metrics_endpoint_reports_requests_and_tracker_sizes():
+    client = TestClient(app)
+    client.get("/")
+    client.get("/api/progress/summary", headers={"X-Learner-Id": "metrics-learner"})
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert (
+        'edumentor_http_request_duration_seconds_count{method="GET",handler="health_check",status="200"}'
+        in response.text
+    )
+    assert 'edumentor_tracker_entries{kind="learners"}' in response.text
@@ -0,0 +1,145 @@
+import asyncio
+
+from backend.ai_service import AIService
+from backend.model_providers import (
+    CassetteMissError,
+    CassetteProvider,
+    GeminiModel,
+    StubProvider,
+)
+from backend.prompts import CHARS_PER_TOKEN, quiz_prompt, tutor_prompt
+
+
+async def collect_stream(service, question):
+    return [event async for event in service.stream_tutor_response(question)]
+
+
+def test_stub_provider_output_goes_through_the_real_parsers():
+    service = AIService(provider=StubProvider(latency=0))
+
+    answer = asyncio.run(service.generate_tutor_response("Why does rain fall?"))
+    assert answer["answer"].startswith("Think of a boda-boda rider")
+    assert len(answer["follow_up_suggestions"]) == 2
+
+    quiz = asyncio.run(service.generate_quiz("Gravity", num_questions=7))
+    assert len(quiz) == 7
+    assert len({q["prompt"] for q in quiz}) == 7
+    assert all(q["answer"].startswith("Core concept") for q in quiz)
+
+    events = asyncio.run(collect_stream(service, "What is inertia?"))
+    assert [kind for kind, _ in events].count("token") > 1
+    assert events[-1][1]["follow_up_suggestions"]
+
+
+def test_stub_provider_injects_errors_and_service_fails_over():
+    provider = StubProvider(latency=0, failing_models=("stub-flash",))
+    service = AIService(provider=provider)
+
+    answer = asyncio.run(service.generate_tutor_response("What is a lever?"))
+
+    assert answer["answer"].startswith("Think of a boda-boda rider")
+    assert service.model_name == "stub-pro"
+    assert provider.calls == 2
+
+
+def test_cassette_records_then_replays_without_the_model(tmp_path):
+    path = tmp_path / "cassette.json"
+    stub = StubProvider(latency=0)
+    recorder = AIService(provider=CassetteProvider(path, "record", inner=stub))
+    recorded_answer = asyncio.run(recorder.generate_tutor_response("What is friction?"))
+    recorded_quiz = asyncio.run(recorder.generate_quiz("Cells", num_questions=3))
+    recorded_stream = asyncio.run(collect_stream(recorder, "What is a circuit?"))
+    calls = stub.calls
+
+    replay = CassetteProvider(path, "replay")
+    player = AIService(provider=replay)
+    assert asyncio.run(player.generate_tutor_response("What is friction?")) == recorded_answer
+    assert asyncio.run(player.generate_quiz("Cells", num_questions=3)) == recorded_quiz
+    assert asyncio.run(collect_stream(player, "What is a circuit?"))[-1] == recorded_stream[-1]
+    assert stub.calls == calls
+    assert len(replay.cassette) == 3
+
+
+def test_replay_miss_raises_and_service_falls_back(tmp_path):
+    provider = CassetteProvider(tmp_path / "empty.json", "replay")
+    model = provider.get_model("replay")
+    try:
+        model.generate_content("Unrecorded prompt")
+        assert False, "expected a cassette miss"
+    except CassetteMissError:
+        pass
+
+    service = AIService(provider=provider)
+    fallback = asyncio.run(service.generate_tutor_response("What is density?"))
+    assert fallback["answer"]
+
+
+class RecordingStub(StubProvider):
+    def __init__(self):
+        super().__init__(latency=0)
+        self.requests = []
+
+    def respond(self, model_name, prompt, system_instruction=None, structured=False):
+        self.requests.append((prompt, system_instruction))
+        return super().respond(model_name, prompt, system_instruction, structured)
+
+
+def test_prompts_send_static_instructions_separately_and_limit_output():
+    provider = RecordingStub()
+    service = AIService(provider=provider)
+
+    asyncio.run(service.generate_tutor_response("Why is the sky blue?"))
+    asyncio.run(service.generate_quiz("Magnets", num_questions=2))
+
+    (tutor_text, tutor_system), (quiz_text, quiz_system) = provider.requests
+    assert tutor_text == "Student Question: Why is the sky blue?"
+    assert tutor_system == tutor_prompt("").system
+    assert "Magnets" in quiz_text and "Magnets" not in quiz_system
+    assert quiz_system == quiz_prompt("", 1).system
+
+    model = provider.get_model("stub-flash")
+    response = model.generate_content(
+        tutor_text, system_instruction=tutor_system, max_output_tokens=5
+    )
+    assert len(response.text) == 5 * CHARS_PER_TOKEN
+
+
+class FakeGenerativeModel:
+    def __init__(self, name, system_instruction=None, cached=None):
+        self.name = name
+        self.system_instruction = system_instruction
+        self.cached = cached
+
+    @classmethod
+    def from_cached_content(cls, cached):
+        return cls(cached["model"], cached=cached)
+
+    def generate_content(self, prompt, generation_config=None, stream=False):
+        return (self, prompt, generation_config)
+
+
+class FakeGenai:
+    GenerativeModel = FakeGenerativeModel
+
+    def __init__(self):
+        self.caches = []
+        self.caching = type("caching", (), {"CachedContent": self})
+
+    def create(self, model, system_instruction, ttl):
+        self.caches.append(system_instruction)
+        return {"model": model, "system_instruction": system_instruction}
+
+
+def test_gemini_model_context_caches_long_system_instructions():
+    genai = FakeGenai()
+    model = GeminiModel("models/gemini-2.5-flash", genai, cache_min_tokens=100, cache_ttl=60)
+    long_instruction = "x" * 400
+
+    first, _, config = model.generate_content("Q", system_instruction=long_instruction, max_output_tokens=64)
+    second, _, _ = model.generate_content("Other Q", system_instruction=long_instruction)
+    short, _, _ = model.generate_content("Q", system_instruction="Be brief.")
+
+    assert config == {"max_output_tokens": 64}
+    assert first is second and first.cached is not None
+    assert genai.caches == [long_instruction]
+    assert short.cached is None and short.system_instruction == "Be brief."
@@ -0,0 +1,82 @@
+import asyncio
+import time
+
+import pytest
+
+from backend.ai_service import AIService
+from backend.model_providers import StubProvider
+from backend.model_router import FAST, MODEL_ROUTER_ENABLED, STRONG, ModelRouter, complexity
+
+SIMPLE = "What is gravity?"
+COMPLEX = (
+    "A boda-boda accelerates from rest to 20 m/s in 5 s. Calculate its acceleration "
+    "and then the distance it covers, step by step."
+)
+
+
+class ModelLoggingStub(StubProvider):
+    """Stub that remembers which model answered each call"""
+
+    def __init__(self, **kwargs):
+        super().__init__(latency=0, **kwargs)
+        self.used = []
+
+    def respond(self, model_name, prompt, system_instruction=None, structured=False):
+        self.used.append(model_name)
+        return super().respond(model_name, prompt, system_instruction, structured)
+
+
+def test_complexity_separates_simple_from_multi_step_math():
+    assert complexity(SIMPLE) == 0
+    assert complexity("How does photosynthesis work in cassava plants?") == 0
+    assert complexity(COMPLEX) >= 3
+    assert complexity("Differentiate x^2 + 3x and explain why the slope changes.") >= 3
+
+    router = ModelRouter(enabled=True)
+    assert router.route("tutor", COMPLEX) is None  # No strong model configured
+    router.configure(["models/gemini-2.5-flash", "models/gemini-2.5-pro"])
+    assert router.route("tutor", SIMPLE) == FAST
+    assert router.route("tutor", COMPLEX) == STRONG
+    assert router.route("quiz_batch", "Water cycle", COMPLEX) == STRONG
+
+
+def test_slo_guard_downgrades_while_strong_tier_is_slow_or_queue_is_long():
+    queued = [0]
+    router = ModelRouter(
+        load=lambda: queued[0], enabled=True, latency_slo=2.0, latency_window=0.2, max_queue=4,
+    )
+    router.configure(["stub-flash", "stub-pro"])
+
+    for _ in range(5):
+        router.observe("stub-pro", 3.0)
+    router.observe("stub-flash", 30.0)  # Fast tier latency doesn't matter
+    assert router.route("tutor", COMPLEX) == FAST
+
+    time.sleep(0.25)  # Slow samples expire, so pro gets traffic again
+    assert router.route("tutor", COMPLEX) == STRONG
+
+    queued[0] = 5
+    assert router.route("tutor", COMPLEX) == FAST
+    assert router.stats()["routes"]["tutor"]["reasons"] == {"complex": 1, "load": 1, "slo": 1}
+
+
+@pytest.mark.skipif(not MODEL_ROUTER_ENABLED, reason="MODEL_ROUTER_ENABLED=0")
+def test_service_sends_each_question_to_its_tier_without_switching_models():
+    provider = ModelLoggingStub()
+    service = AIService(provider=provider)
+
+    asyncio.run(service.generate_tutor_response(SIMPLE))
+    asyncio.run(service.generate_tutor_response(COMPLEX))
+    asyncio.run(service.generate_tutor_response("Why does rain fall?"))
+
+    assert provider.used == ["stub-flash", "stub-pro", "stub-flash"]
+    assert service.model_name == "stub-flash"
+    routes = service.model_status()["routing"]["routes"]["tutor"]
+    assert (routes[FAST], routes[STRONG]) == (2, 1)
+
+    # A failing strong tier still fails over to the fast one
+    failing = ModelLoggingStub(failing_models=("stub-pro",))
+    service = AIService(provider=failing)
+    answer = asyncio.run(service.generate_tutor_response(COMPLEX))
+    assert answer["answer"].startswith("Think of a boda-boda rider")
+    assert failing.used == ["stub-pro", "stub-flash"]
@@ -17,3 +17,30 @@ def test_quiz_response_shape():
     assert "questions" in data
     for question in data["questions"]:
         assert "prompt" in question
+
+
+def test_batch_quiz_response_shape():
+    response = client.post(
+        "/api/quiz/generate-batch",
+        json={"topics": [{"topic": "gravity"}, {"topic": "cells", "num_questions": 2}]},
+    )
+    assert response.status_code == 200
+    quizzes = response.json()["quizzes"]
+    assert [quiz["topic"] for quiz in quizzes] == ["gravity", "cells"]
+    for quiz in quizzes:
+        assert all("prompt" in question for question in quiz["questions"])
+
+
+def test_batch_quiz_requires_topics():
+    response = client.post("/api/quiz/generate-batch", json={"topics": [{"topic": " "}]})
+    assert response.status_code == 400
+
+
+def test_quiz_question_count_is_capped():
+    response = client.post("/api/quiz/generate", json={"topic": "algebra", "num_questions": 500})
+    assert response.status_code == 422
+
+
+def test_overlong_topic_is_rejected():
+    response = client.post("/api/quiz/generate", json={"topic": "gravity " * 100})
+    assert response.status_code == 422
@@ -0,0 +1,27 @@
+import time
+
+from backend.response_cache import TTLCache, normalize_text
+
+
+def test_normalize_text_ignores_case_spacing_and_punctuation():
+    assert normalize_text("  Explain   Gravity?? ") == "explain gravity"
+    assert normalize_text("explain gravity") == "explain gravity"
+
+
+def test_lru_eviction():
+    cache = TTLCache(max_size=2, ttl_seconds=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # "b" is now least recently used
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.stats()["evictions"] == 1
+
+
+def test_entries_expire_after_ttl():
+    cache = TTLCache(max_size=4, ttl_seconds=0.01)
+    cache.set("a", 1)
+    time.sleep(0.02)
+    assert cache.get("a") is None
+    assert cache.stats()["misses"] == 1
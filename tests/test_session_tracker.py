@@ -0,0 +1,171 @@
+import sqlite3
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from backend.progress_store import SQLiteProgressStore
+from backend.event_log import QuestionLog
+from backend.session_tracker import (
+    LEARNER_IDLE_SECONDS,
+    MEMORY_LEARNER_IDLE_SECONDS,
+    LearnerTrackers,
+    SessionTracker,
+)
+
+
+def test_learners_have_separate_progress():
+    trackers = LearnerTrackers(num_shards=4)
+    trackers.get("amina").track_question("What is gravity?")
+    trackers.get("amina").track_quiz("gravity")
+    trackers.get("kofi").track_question("What is a cell?")
+
+    assert trackers.get("amina").get_summary()["totalQuizzes"] == 1
+    assert trackers.get("kofi").get_summary()["totalQuizzes"] == 0
+    assert trackers.get("kofi").get_summary()["totalQuestions"] == 1
+    assert len(trackers) == 2
+
+
+def test_idle_learners_are_evicted():
+    trackers = LearnerTrackers(num_shards=1, idle_seconds=0.01)
+    trackers.get("amina").track_question("What is gravity?")
+    time.sleep(0.02)
+    trackers.get("kofi")
+
+    assert [learner for learner, _ in trackers] == ["kofi"]
+    assert trackers.get("amina").get_summary()["totalQuestions"] == 0
+
+
+def test_idle_learners_are_evicted_when_only_returning_learners_visit():
+    trackers = LearnerTrackers(num_shards=1, idle_seconds=0.01)
+    trackers.get("amina")
+    trackers.get("kofi")
+    time.sleep(0.02)
+    trackers.get("kofi")  # No new learner, but the shard is still swept
+
+    assert [learner for learner, _ in trackers] == ["kofi"]
+
+
+def test_learners_are_kept_much_longer_without_a_durable_store(tmp_path):
+    assert LearnerTrackers().idle_seconds == MEMORY_LEARNER_IDLE_SECONDS
+    store = SQLiteProgressStore(tmp_path / "progress.db")
+    assert LearnerTrackers(store=store).idle_seconds == LEARNER_IDLE_SECONDS
+    store.close()
+
+
+def test_sqlite_store_restores_progress_after_restart(tmp_path):
+    path = tmp_path / "progress.db"
+    store = SQLiteProgressStore(path, flush_interval=60)
+    trackers = LearnerTrackers(num_shards=2, store=store)
+    amina = trackers.get("amina")
+    amina.track_question("Why does gravity pull mangoes down?")
+    amina.track_quiz("gravity")
+    expected = amina.get_summary()
+    store.close()
+
+    # A fresh instance reads the same database
+    restarted = LearnerTrackers(num_shards=2, store=SQLiteProgressStore(path))
+    assert restarted.get("amina").get_summary() == expected
+    assert restarted.get("kofi").get_summary()["totalQuestions"] == 0
+
+
+def test_sqlite_store_batches_writes(tmp_path):
+    store = SQLiteProgressStore(tmp_path / "progress.db", flush_interval=60)
+    tracker = SessionTracker("amina", store)
+    for i in range(50):
+        tracker.track_question(f"Question {i} about energy")
+    # Nothing is written until the buffer is flushed
+    assert store._reader.execute("SELECT COUNT(*) FROM question_events").fetchone()[0] == 0
+    store.flush()
+    assert store._reader.execute("SELECT COUNT(*) FROM question_events").fetchone()[0] == 50
+    assert store._reader.execute("SELECT COUNT(*) FROM activity_days").fetchone()[0] == 1
+    store.close()
+
+
+class LockedConnection:
+    """A writer connection whose BEGIN fails, as when another process holds the lock"""
+
+    in_transaction = False
+
+    def __init__(self, conn):
+        self._conn = conn
+
+    def execute(self, sql, *args):
+        if sql == "BEGIN":
+            raise sqlite3.OperationalError("database is locked")
+        return self._conn.execute(sql, *args)
+
+    def close(self):
+        self._conn.close()
+
+
+def test_sqlite_store_keeps_failed_batches_and_refuses_writes_once_closed(tmp_path):
+    store = SQLiteProgressStore(tmp_path / "progress.db", flush_interval=60)
+    tracker = SessionTracker("amina", store)
+    tracker.track_question("What is energy?")
+
+    store._writer = LockedConnection(store._writer)
+    with pytest.raises(sqlite3.OperationalError, match="locked"):  # Not a ROLLBACK error
+        store.flush()
+    assert len(store._pending) == 1  # Kept for the next flush
+
+    store._writer = store._writer._conn
+    store.close()  # Writes the kept batch
+    with pytest.raises(sqlite3.ProgrammingError):
+        tracker.track_quiz("energy")
+
+    reopened = SQLiteProgressStore(tmp_path / "progress.db")
+    assert [kind for kind, *_ in reopened.load("amina")] == ["question"]
+    reopened.close()
+
+
+def test_summary_is_maintained_incrementally():
+    tracker = SessionTracker()
+    start = datetime(2026, 3, 1)
+    # Days 1, 2 and 4 active; day 3 is filled in late, joining the runs
+    tracker.replay([
+        ("question", "What is gravity?", None, start),
+        ("question", "Why do cells divide?", None, start + timedelta(days=1)),
+        ("quiz", "gravity", None, start + timedelta(days=3)),
+    ])
+    assert tracker.get_streak_days() == 1
+    tracker.replay([("question", "What is energy?", None, start + timedelta(days=2))])
+
+    summary = tracker.get_summary()
+    assert summary["streakDays"] == 4
+    assert summary["masteredTopics"] == ["Gravity"]
+    assert summary["reviewTopics"] == ["Cell Biology", "Electricity"]
+    assert summary["totalQuestions"] == 3
+    assert summary["totalQuizzes"] == 1
+    assert summary["engagementScore"] == 15 + 10 + 15 + 8
+
+
+def test_sizes_count_what_the_tracker_holds():
+    tracker = SessionTracker()
+    tracker.track_question("Why does a mango fall?", "physics")
+    tracker.track_question("What is a cell?", "biology")
+
+    assert tracker.sizes() == {"questions": 2, "topics": 2, "activeDays": 1}
+
+
+def test_question_log_keeps_only_recent_questions():
+    log = QuestionLog(capacity=3)
+    start = datetime(2026, 1, 1)
+    for i in range(5):
+        log.append(f"question {i}", "Gravity", start + timedelta(minutes=i))
+
+    assert len(log) == 3
+    assert [question for question, _, _ in log] == ["question 2", "question 3", "question 4"]
+    assert all(topic == "Gravity" for _, topic, _ in log)
+
+
+def test_summary_counts_questions_beyond_history_size():
+    tracker = SessionTracker()
+    tracker.question_log = QuestionLog(capacity=2)
+    for _ in range(5):
+        tracker.track_question("Why do objects fall?")
+
+    summary = tracker.get_summary()
+    assert summary["totalQuestions"] == 5
+    assert len(tracker.questions_asked) == 2
+    assert tracker.questions_asked[-1]["detected_topic"] == "Gravity"
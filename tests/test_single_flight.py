@@ -0,0 +1,99 @@
+import asyncio
+
+import pytest
+
+from backend.single_flight import SingleFlight
+
+
+def test_concurrent_calls_share_one_result():
+    flight = SingleFlight()
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "answer"
+
+    async def run():
+        return await asyncio.gather(*(flight.do("k", work) for _ in range(40)))
+
+    results = asyncio.run(run())
+    assert results == ["answer"] * 40
+    assert len(calls) == 1
+    assert flight.stats() == {"inFlight": 0, "started": 1, "coalesced": 39}
+
+
+def test_errors_reach_every_waiter():
+    flight = SingleFlight()
+
+    async def work():
+        await asyncio.sleep(0.01)
+        raise ValueError("quota exceeded")
+
+    async def run():
+        return await asyncio.gather(
+            *(flight.do("k", work) for _ in range(3)), return_exceptions=True
+        )
+
+    results = asyncio.run(run())
+    assert all(isinstance(r, ValueError) for r in results)
+
+
+def test_cancelled_waiter_does_not_cancel_others():
+    flight = SingleFlight()
+
+    async def work():
+        await asyncio.sleep(0.05)
+        return 42
+
+    async def run():
+        leaving = asyncio.ensure_future(flight.do("k", work))
+        staying = asyncio.ensure_future(flight.do("k", work))
+        await asyncio.sleep(0.01)
+        leaving.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leaving
+        return await staying
+
+    assert asyncio.run(run()) == 42
+
+
+def test_shared_call_cancelled_when_last_waiter_leaves():
+    flight = SingleFlight()
+    finished = []
+
+    async def work():
+        await asyncio.sleep(0.05)
+        finished.append(1)
+
+    async def run():
+        waiter = asyncio.ensure_future(flight.do("k", work))
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        await asyncio.sleep(0.08)
+
+    asyncio.run(run())
+    assert finished == []
+    assert flight.in_flight() == 0
+
+
+def test_caller_arriving_while_the_shared_call_is_cancelled_starts_a_new_one():
+    flight = SingleFlight()
+
+    async def work():
+        try:
+            await asyncio.sleep(0.05)
+        except asyncio.CancelledError:
+            await asyncio.sleep(0.02)  # Slow to unwind, like a call cleaning up
+            raise
+        return "answer"
+
+    async def run():
+        waiter = asyncio.ensure_future(flight.do("k", work))
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        await asyncio.sleep(0)  # The shared call is now being cancelled
+        return await flight.do("k", work)
+
+    assert asyncio.run(run()) == "answer"
+    assert flight.stats()["started"] == 2
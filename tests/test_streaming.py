@@ -0,0 +1,53 @@
+import random
+
+from backend.ai_service import AIService
+from backend.streaming import TutorStreamParser, sse_event
+
+RESPONSE = (
+    "Sure, here you go!\n"
+    "ANSWER: A matatu braking hard throws  passengers forward.\n"
+    "That is inertia in action.  \n"
+    "\n"
+    "FOLLOW_UP_1: What is momentum?\n"
+    "FOLLOW_UP_2: Why do seatbelts help?\n"
+)
+
+
+def stream(text: str, sizes) -> tuple:
+    parser = TutorStreamParser()
+    out, i = [], 0
+    for size in sizes:
+        out.append(parser.feed(text[i:i + size]))
+        i += size
+    out.append(parser.feed(text[i:]))
+    out.append(parser.close())
+    return "".join(out), parser
+
+
+def test_stream_matches_batch_parser_for_any_chunking():
+    expected = AIService()._parse_response(RESPONSE, "What is inertia?")
+    rng = random.Random(7)
+    for _ in range(200):
+        sizes = [rng.randint(1, 5) for _ in range(len(RESPONSE))]
+        answer, parser = stream(RESPONSE, sizes)
+        assert answer == expected["answer"]
+        assert parser.follow_ups == expected["follow_up_suggestions"]
+
+
+def test_marker_split_across_chunks_is_not_emitted():
+    parser = TutorStreamParser()
+    assert parser.feed("ANS") == ""
+    assert parser.feed("WER: Lake") == "Lake"
+    assert parser.feed(" Victoria\nFOLLOW_") == " Victoria"
+    assert parser.feed("UP_1: Why?") == ""
+    assert parser.close() == ""
+    assert parser.follow_ups == ["Why?"]
+
+
+def test_response_without_markers_is_emitted_whole():
+    answer, _ = stream("Plain answer\nwith two lines", [3, 3, 3])
+    assert answer == "Plain answer\nwith two lines"
+
+
+def test_sse_event_format():
+    assert sse_event("token", {"text": "hi"}) == 'event: token\ndata: {"text": "hi"}\n\n'
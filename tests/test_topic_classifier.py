@@ -0,0 +1,30 @@
+from backend.session_tracker import TOPIC_KEYWORDS
+from backend.topic_classifier import TopicClassifier
+
+classifier = TopicClassifier(TOPIC_KEYWORDS)
+
+
+def test_earlier_topics_win_regardless_of_position():
+    # "energy" is listed under Electricity before Energy
+    assert classifier.classify("What is kinetic energy?") == "Electricity"
+    # Photosynthesis outranks Gravity even though "mass" comes first
+    assert classifier.classify("Does mass matter to a plant?") == "Photosynthesis"
+
+
+def test_keywords_match_at_word_starts_only():
+    assert classifier.classify("Why do plants need light?") == "Photosynthesis"
+    assert classifier.classify("That was an excellent lesson") == "General STEM"
+
+
+def test_multi_word_and_prefix_keywords():
+    assert classifier.classify("How big is the solar system?") == "Electricity"
+    astronomy_first = TopicClassifier({"Astronomy": ["solar system"], "Electricity": ["solar"]})
+    assert astronomy_first.classify("How big is the solar system?") == "Astronomy"
+    assert astronomy_first.classify("Solar panels in villages") == "Electricity"
+
+
+def test_large_vocabulary():
+    vocabulary = {f"Topic {i}": [f"term{i}x{j}" for j in range(10)] for i in range(500)}
+    large = TopicClassifier(vocabulary)
+    assert large.classify("A question about TERM417x3 and term499x9") == "Topic 417"
+    assert large.classify("nothing relevant") == "General STEM"